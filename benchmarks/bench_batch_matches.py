@@ -0,0 +1,82 @@
+"""
+Benchmark batched watchpoint matching: per-point loop vs batch.match_matrix().
+
+What this does:
+- Builds F synthetic CAP feeds with A alerts each and loads them into a GeometryStore.
+- Scatters P watchpoints over Australia.
+- Times three ways of producing the P × M match matrix:
+    * `per_point`     — one find_matches-style call per watchpoint (grid query + exact test)
+    * `batch_python`  — match_matrix(use_numpy=False)
+    * `batch_numpy`   — the NumPy kernel on its own (skipped if NumPy is not installed)
+    * `batch_auto`    — match_matrix(), which uses NumPy from batch.NUMPY_MIN_POINTS watchpoints
+- Checks all methods agree.
+
+Run:
+    python benchmarks/bench_batch_matches.py --feeds 5 --alerts 40 --points 2000 --vertices 1000
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+
+from synthetic import load_integration, make_cap_feed
+
+load_integration()
+from cap_alerts import batch  # noqa: E402
+from cap_alerts.geometry import GeometryStore, build_areas  # noqa: E402
+from cap_alerts.parser import parse_feed  # noqa: E402
+
+def build(feeds: int, alerts: int, vertices: int) -> GeometryStore:
+    results = []
+    for i in range(feeds):
+        parsed = parse_feed(make_cap_feed(alerts=alerts, vertices=vertices, seed=i), "cap")
+        for a in parsed["alerts"]:
+            a["identifier"] = f"{i}:{a['identifier']}"
+        results.append({"feed": {"url": f"https://feeds.example/{i}.xml"}, "slug": f"feed_{i}", "alerts": parsed["alerts"]})
+    store = GeometryStore()
+    store.update(results, build_areas(store.pending(results)))
+    return store
+
+def per_point(store: GeometryStore, points, geoms) -> list[list[bool]]:
+    col = {id(g): m for m, g in enumerate(geoms)}
+    rows = []
+    for lat, lon, rk in points:
+        row = [False] * len(geoms)
+        for _, _, g in store.query(lat, lon, rk):
+            if g.matches(lat, lon, rk):
+                row[col[id(g)]] = True
+        rows.append(row)
+    return rows
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Batched watchpoint × alert matching")
+    ap.add_argument("--feeds", type=int, default=5)
+    ap.add_argument("--alerts", type=int, default=40)
+    ap.add_argument("--vertices", type=int, default=1000)
+    ap.add_argument("--points", type=int, default=2000)
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    args = ap.parse_args()
+    store = build(args.feeds, args.alerts, args.vertices)
+    geoms = [g for _, _, g in store.iter_entries()]
+    rng = random.Random(11)
+    points = [(rng.uniform(-44.0, -10.0), rng.uniform(113.0, 154.0), args.radius_km) for _ in range(args.points)]
+    methods = {
+        "per_point": lambda: per_point(store, points, geoms),
+        "batch_python": lambda: batch.match_matrix(points, geoms, use_numpy=False),
+    }
+    if batch.np is not None:
+        methods["batch_numpy"] = lambda: batch._match_matrix_numpy(points, geoms)
+    methods["batch_auto"] = lambda: batch.match_matrix(points, geoms)
+    answers = {}
+    for name, fn in methods.items():
+        t0 = time.perf_counter()
+        answers[name] = fn()
+        ms = (time.perf_counter() - t0) * 1000.0
+        print(json.dumps({"method": name, "points": len(points), "areas": len(geoms), "ms": round(ms, 2)}))
+    ref = answers["per_point"]
+    print(json.dumps({"identical_matches": all(a == ref for a in answers.values()),
+                      "total_matches": sum(map(sum, ref))}))
+
+if __name__ == "__main__":
+    main()
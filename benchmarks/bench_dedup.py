@@ -0,0 +1,158 @@
+"""
+Benchmark cross-feed deduplication with mirrored feeds.
+
+What this does:
+- Builds M mirror feeds that carry the same A alerts (as language variants and aggregators do),
+  plus one feed of its own.
+- Compares memory held by the parsed records, geometry index size and find_matches time:
+    * `per_feed` — every feed's records stored and indexed separately (before DedupIndex)
+    * `dedup`    — records interned across feeds and only the owning feed's copy indexed
+- Checks both return the same set of matched identifiers.
+- Checks that a transient failure of the owning feed neither moves its alerts to a mirror nor
+  produces added/removed deltas when it fails and when it recovers, and that the alerts a
+  failing feed keeps serving still expire, and are dropped once the feed has failed for longer
+  than the retention period, and that an Update moving an alert's expiry earlier is honoured.
+
+Run:
+    python benchmarks/bench_dedup.py --mirrors 5 --alerts 300 --queries 500
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from synthetic import load_integration, make_cap_feed
+
+load_integration()
+from cap_alerts.dedup import DedupIndex  # noqa: E402
+from cap_alerts.diff import AlertTracker  # noqa: E402
+from cap_alerts.geometry import GeometryStore, build_areas  # noqa: E402
+from cap_alerts.lifecycle import AlertLifecycle  # noqa: E402
+from cap_alerts.parser import parse_feed  # noqa: E402
+
+def load(mirrors: int, alerts: int, vertices: int, dedup: DedupIndex | None) -> list[dict]:
+    results = []
+    for i in range(mirrors + 1):
+        # Feed 0..mirrors-1 are mirrors (same seed); the last feed has its own alerts
+        seed = 1 if i < mirrors else 2
+        parsed = parse_feed(make_cap_feed(alerts=alerts, vertices=vertices, seed=seed), "cap")
+        if seed == 2:
+            for a in parsed["alerts"]:
+                a["identifier"] = "own:" + a["identifier"]
+        if dedup is not None:
+            dedup.intern(parsed["alerts"])
+            # The coordinator re-indexes once per refresh; here once per loaded feed
+            results.append({"feed": {"url": f"https://feeds.example/{i}.xml"}, "slug": f"feed_{i}", "alerts": parsed["alerts"]})
+            dedup.update(results)
+        else:
+            results.append({"feed": {"url": f"https://feeds.example/{i}.xml"}, "slug": f"feed_{i}", "alerts": parsed["alerts"]})
+    return results
+
+def check_owner_failure(alerts: int) -> bool:
+    """Owner feed fails for one refresh and recovers: no deltas, ownership stays put."""
+    lifecycle = AlertLifecycle()
+    dedup = DedupIndex()
+    tracker = AlertTracker()
+    feeds = [{"url": f"https://feeds.example/m{i}.xml"} for i in range(2)]
+    parsed = [parse_feed(make_cap_feed(alerts=alerts, vertices=10, seed=1), "cap")["alerts"] for _ in feeds]
+    ok = [{"feed": f, "slug": f"m{i}", "alerts": a, "features": {}} for i, (f, a) in enumerate(zip(feeds, parsed))]
+    failed = [dict(ok[0], alerts=[], features={"error": "timeout"}), ok[1]]
+    now = time.time()
+    unique = dedup.update(lifecycle.update(ok, now))
+    tracker.update(unique)
+    owned = [len(r["alerts"]) for r in unique]
+    quiet = True
+    for step, results in enumerate((failed, ok), start=1):
+        unique = dedup.update(lifecycle.update(results, now + 30.0 * step))
+        quiet = quiet and not any(tracker.update(unique).counts().values())
+        quiet = quiet and [len(r["alerts"]) for r in unique] == owned
+    return quiet
+
+def check_failed_feed_expiry() -> bool:
+    """A failing feed's kept alerts expire on time (with a removed delta) and are all dropped
+    after the retention period."""
+    now = time.time()
+    lifecycle = AlertLifecycle(tick=30.0, retention=3600.0)
+    dedup = DedupIndex()
+    alerts = parse_feed(make_cap_feed(alerts=3, vertices=10, seed=2), "cap")["alerts"]
+    alerts[0]["expires"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now + 60.0))
+    feed = {"url": "https://feeds.example/expiring.xml"}
+    failed = {"feed": feed, "slug": "expiring", "alerts": [], "features": {"error": "timeout"}}
+    tracker = AlertTracker()
+    tracker.update(dedup.update(lifecycle.update([{"feed": feed, "slug": "expiring", "alerts": alerts, "features": {}}], now)))
+    removed = []
+
+    def identifiers(at: float) -> list[str]:
+        unique = dedup.update(lifecycle.update([failed], at))
+        removed.append(tracker.update(unique).counts()["removed"])
+        return [a["identifier"] for r in unique for a in r["alerts"]]
+
+    kept = identifiers(now + 30.0)
+    expired = identifiers(now + 120.0)
+    lapsed = identifiers(now + 86400.0)
+    return kept == [a["identifier"] for a in alerts] and expired == kept[1:] and lapsed == [] and removed == [0, 1, 2]
+
+def check_expiry_moved_earlier() -> bool:
+    """An Update re-issuing an alert with an earlier expiry evicts it at the new time, with no refetch."""
+    now = time.time()
+    lifecycle = AlertLifecycle(tick=30.0)
+    feed = {"url": "https://feeds.example/updated.xml"}
+    alert = parse_feed(make_cap_feed(alerts=1, vertices=10, seed=3), "cap")["alerts"][0]
+
+    def expires(dt: float) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now + dt))
+
+    first = [{"feed": feed, "slug": "updated", "alerts": [dict(alert, expires=expires(3600.0))], "features": {}}]
+    update = [{"feed": feed, "slug": "updated", "alerts": [dict(alert, msgType="Update", expires=expires(60.0))], "features": {}}]
+    lifecycle.update(first, now)
+    kept = lifecycle.update(update, now + 30.0)
+    # Same results object: only the timer wheel can trigger the eviction
+    evicted = lifecycle.update(update, now + 120.0)
+    return len(kept[0]["alerts"]) == 1 and evicted[0]["alerts"] == []
+
+def run(name: str, args: argparse.Namespace, points: list[tuple[float, float]]) -> list[set]:
+    dedup = DedupIndex() if name == "dedup" else None
+    gc.collect()
+    tracemalloc.start()
+    results = load(args.mirrors, args.alerts, args.vertices, dedup)
+    records_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    indexed = dedup.update(results) if dedup is not None else results
+    store = GeometryStore()
+    store.update(indexed, build_areas(store.pending(indexed)))
+    t0 = time.perf_counter()
+    answers = []
+    for la, lo in points:
+        answers.append({a["identifier"] for _, a, g in store.query(la, lo, args.radius_km) if g.matches(la, lo, args.radius_km)})
+    per_query_ms = (time.perf_counter() - t0) * 1000.0 / len(points)
+    print(json.dumps({
+        "method": name,
+        "feeds": len(results),
+        "records": sum(len(r["alerts"]) for r in results),
+        "indexed_areas": sum(1 for _ in store.iter_entries()),
+        "records_mb": round(records_mb, 2),
+        "ms_per_query": round(per_query_ms, 4),
+    }))
+    return answers
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Cross-feed dedup: memory and find_matches work")
+    ap.add_argument("--mirrors", type=int, default=5)
+    ap.add_argument("--alerts", type=int, default=300)
+    ap.add_argument("--vertices", type=int, default=40)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    args = ap.parse_args()
+    rng = random.Random(7)
+    points = [(rng.uniform(-44.0, -10.0), rng.uniform(113.0, 154.0)) for _ in range(args.queries)]
+    before = run("per_feed", args, points)
+    after = run("dedup", args, points)
+    print(json.dumps({"identical_matches": before == after, "owner_failure_quiet": check_owner_failure(args.alerts),
+                      "failed_feed_expiry_ok": check_failed_feed_expiry(),
+                      "expiry_moved_earlier_ok": check_expiry_moved_earlier()}))
+
+if __name__ == "__main__":
+    main()
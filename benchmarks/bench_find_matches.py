@@ -0,0 +1,167 @@
+"""
+Benchmark find_matches: linear scan vs the spatial grid index in GeometryStore.
+
+What this does:
+- Builds F synthetic CAP feeds with A alerts each (small polygons spread over Australia).
+- Runs Q random point/radius queries three ways:
+    * `legacy_linear`  — the original loop and util functions: re-parse every polygon string per query
+    * `store_linear`   — pre-parsed geometry, but still every alert per query
+    * `store_indexed`  — GeometryStore.query() candidates from the grid, then the exact test
+- Checks that two feeds reusing an identifier for different polygons each keep their own
+  geometry (the cache is per feed).
+- Checks the two store methods return the same matches and reports mean time per query. The
+  legacy loop measured distance to the polygon's centroid, the store measures it to the
+  boundary, so the number of queries where they disagree is reported rather than checked.
+
+Run:
+    python benchmarks/bench_find_matches.py --feeds 20 --alerts 250 --queries 500
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+
+from synthetic import load_integration, make_cap_feed
+
+load_integration()
+from cap_alerts.geometry import GeometryStore, build_areas, distance_km, parse_circle, parse_polygon  # noqa: E402
+from cap_alerts.parser import parse_feed  # noqa: E402
+
+def point_in_polygon(polygon: str, plat: float, plon: float) -> bool:
+    """util.point_in_polygon as shipped before the geometry store."""
+    pts = parse_polygon(polygon)
+    inside = False
+    n = len(pts)
+    if n >= 3:
+        j = n - 1
+        for i in range(n):
+            yi, xi = pts[i]
+            yj, xj = pts[j]
+            cond = ((xi > plon) != (xj > plon)) and (plat < (yj - yi) * (plon - xi) / ((xj - xi) if (xj - xi) != 0 else 1e-12) + yi)
+            if cond:
+                inside = not inside
+            j = i
+    return inside
+
+def centroid_and_radius(polygon: str):
+    """util.centroid_and_radius as shipped before the geometry store."""
+    pts = parse_polygon(polygon)
+    if not pts:
+        return (0.0, 0.0, 1000.0)
+    clat = sum(p[0] for p in pts)/len(pts)
+    clon = sum(p[1] for p in pts)/len(pts)
+    max_km = 0.0
+    for p in pts:
+        dk = distance_km(clat, clon, p[0], p[1])
+        if dk > max_km:
+            max_km = dk
+    return (clat, clon, max_km*1000.0)
+
+def legacy_find(results: list[dict], lat: float, lon: float, radius_km: float) -> list[str]:
+    out = []
+    for r in results:
+        for a in r["alerts"]:
+            hit = False
+            poly = a.get("polygon") or ""
+            circ = a.get("circle") or ""
+            if poly:
+                if point_in_polygon(poly, lat, lon):
+                    hit = True
+                else:
+                    clat, clon, _ = centroid_and_radius(poly)
+                    hit = distance_km(lat, lon, clat, clon) <= radius_km
+            elif circ and (c := parse_circle(circ)):
+                hit = distance_km(lat, lon, c[0], c[1]) <= c[2] + radius_km
+            if hit:
+                out.append(a["identifier"])
+    return out
+
+def store_linear(store: GeometryStore, lat: float, lon: float, radius_km: float) -> list[str]:
+    return [a["identifier"] for _, a, g in store.iter_entries() if g.matches(lat, lon, radius_km)]
+
+def store_indexed(store: GeometryStore, lat: float, lon: float, radius_km: float) -> list[str]:
+    return [a["identifier"] for _, a, g in store.query(lat, lon, radius_km) if g.matches(lat, lon, radius_km)]
+
+def check_shared_identifier() -> bool:
+    """Two feeds, one identifier, different polygons: each point matches only its own feed."""
+    results = [
+        {"feed": {"url": f"https://feeds.example/{name}.xml"}, "slug": name,
+         "alerts": [{"identifier": "1", "polygon": f"0,{lo} 0,{lo + 1} 1,{lo + 1} 1,{lo} 0,{lo}"}]}
+        for name, lo in (("a", 0.0), ("b", 10.0))
+    ]
+    store = GeometryStore()
+    ok = True
+    for _ in range(2):
+        pending = store.pending(results)
+        # The second refresh must find both areas cached
+        ok = ok and len(pending) == (2 if not len(store) else 0)
+        store.update(results, build_areas(pending))
+        for lon, slug in ((0.5, "a"), (10.5, "b")):
+            ok = ok and [r["slug"] for r, _a, _g in store.query(0.5, lon)] == [slug]
+    return ok
+
+def check_removed_feed() -> bool:
+    """A feed dropped from the results leaves the index, the entries and the cache."""
+    results = [
+        {"feed": {"url": f"https://feeds.example/{name}.xml"}, "slug": name,
+         "alerts": [{"identifier": name, "polygon": f"0,{lo} 0,{lo + 1} 1,{lo + 1} 1,{lo} 0,{lo}"}]}
+        for name, lo in (("a", 0.0), ("b", 10.0))
+    ]
+    store = GeometryStore()
+    store.update(results, build_areas(store.pending(results)))
+    store.update(results[:1], {})
+    return (store.query(0.5, 10.5) == [] and [r["slug"] for r, _a, _g in store.iter_entries()] == ["a"]
+            and len(store) == 1)
+
+def build(feeds: int, alerts: int, vertices: int) -> tuple[list[dict], GeometryStore]:
+    results = []
+    for i in range(feeds):
+        parsed = parse_feed(make_cap_feed(alerts=alerts, vertices=vertices, seed=i), "cap")
+        for a in parsed["alerts"]:
+            # Distinct identifiers across feeds
+            a["identifier"] = f"{i}:{a['identifier']}"
+        results.append({"feed": {"url": f"https://feeds.example/{i}.xml"}, "slug": f"feed_{i}", "alerts": parsed["alerts"]})
+    store = GeometryStore()
+    t0 = time.perf_counter()
+    store.update(results, build_areas(store.pending(results)))
+    print(json.dumps({"build_ms": round((time.perf_counter() - t0) * 1000.0, 1), "areas": len(store)}))
+    return results, store
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="find_matches: linear scan vs spatial index")
+    ap.add_argument("--feeds", type=int, default=20)
+    ap.add_argument("--alerts", type=int, default=250)
+    ap.add_argument("--vertices", type=int, default=40)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    args = ap.parse_args()
+    print(json.dumps({"shared_identifier_ok": check_shared_identifier(), "removed_feed_ok": check_removed_feed()}))
+    results, store = build(args.feeds, args.alerts, args.vertices)
+    rng = random.Random(7)
+    points = [(rng.uniform(-44.0, -10.0), rng.uniform(113.0, 154.0)) for _ in range(args.queries)]
+    methods = {
+        "legacy_linear": lambda la, lo: legacy_find(results, la, lo, args.radius_km),
+        "store_linear": lambda la, lo: store_linear(store, la, lo, args.radius_km),
+        "store_indexed": lambda la, lo: store_indexed(store, la, lo, args.radius_km),
+    }
+    answers = {}
+    for name, fn in methods.items():
+        # The legacy loop is slow; a sample of the queries is enough
+        pts = points[: max(1, len(points) // 10)] if name == "legacy_linear" else points
+        t0 = time.perf_counter()
+        answers[name] = [fn(la, lo) for la, lo in pts]
+        per_query_ms = (time.perf_counter() - t0) * 1000.0 / len(pts)
+        print(json.dumps({"method": name, "alerts": len(store), "queries": len(pts), "ms_per_query": round(per_query_ms, 4)}))
+    n = len(answers["legacy_linear"])
+    same = answers["store_linear"] == answers["store_indexed"]
+    differ = sum(a != b for a, b in zip(answers["legacy_linear"], answers["store_linear"]))
+    print(json.dumps({
+        "identical_matches": same,
+        "legacy_centroid_disagreements": differ,
+        "legacy_queries_compared": n,
+        "mean_matches": round(sum(map(len, answers["store_indexed"])) / len(points), 2),
+    }))
+
+if __name__ == "__main__":
+    main()
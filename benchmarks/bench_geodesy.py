@@ -0,0 +1,147 @@
+"""
+Benchmark the distance kernels: accuracy and throughput.
+
+What this does:
+- Error: for latitude bands 0–85° and spans of 1–2,000 km, compares against Vincenty's
+  inverse formula on WGS84 (the reference):
+    * `legacy`    — the previous equirectangular distance with a 6th-order Taylor cosine
+    * `haversine` — geodesy.haversine_km (great circle on the mean-radius sphere)
+  Also reports the legacy error relative to the sphere, i.e. the projection error alone.
+- Throughput (µs per distance):
+    * scalar legacy vs haversine vs within_km() (latitude-gap rejection first)
+    * one point to many (Ring radius / centroid checks): per-call loop vs farthest_km()
+      vs distances_km(), pure Python and NumPy
+
+Run:
+    python benchmarks/bench_geodesy.py --samples 2000 --batch 5000
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import random
+import time
+
+from synthetic import load_integration
+
+load_integration()
+from cap_alerts import geodesy  # noqa: E402
+from cap_alerts.geodesy import distances_km, farthest_km, haversine_km, within_km  # noqa: E402
+
+PI = 3.141592653589793
+
+def legacy_distance_km(lat1, lon1, lat2, lon2) -> float:
+    # geometry.distance_km before geodesy.py, kept verbatim for comparison
+    def cos_approx(x):
+        x2 = x * x
+        x4 = x2 * x2
+        x6 = x4 * x2
+        return 1.0 - x2/2.0 + x4/24.0 - x6/720.0
+    lat1r = lat1 * PI / 180.0
+    lat2r = lat2 * PI / 180.0
+    lon1r = lon1 * PI / 180.0
+    lon2r = lon2 * PI / 180.0
+    x = (lon2r - lon1r) * cos_approx((lat1r + lat2r) * 0.5)
+    y = (lat2r - lat1r)
+    return (x*x + y*y) ** 0.5 * 6371.0088
+
+def vincenty_km(lat1, lon1, lat2, lon2) -> float | None:
+    """Vincenty inverse on WGS84; None if it does not converge (near-antipodal)."""
+    a, f = 6378137.0, 1 / 298.257223563
+    b = (1 - f) * a
+    L = math.radians(lon2 - lon1)
+    U1 = math.atan((1 - f) * math.tan(math.radians(lat1)))
+    U2 = math.atan((1 - f) * math.tan(math.radians(lat2)))
+    sinU1, cosU1, sinU2, cosU2 = math.sin(U1), math.cos(U1), math.sin(U2), math.cos(U2)
+    lam = L
+    for _ in range(200):
+        sin_l, cos_l = math.sin(lam), math.cos(lam)
+        sin_s = math.hypot(cosU2 * sin_l, cosU1 * sinU2 - sinU1 * cosU2 * cos_l)
+        if sin_s == 0:
+            return 0.0
+        cos_s = sinU1 * sinU2 + cosU1 * cosU2 * cos_l
+        sigma = math.atan2(sin_s, cos_s)
+        sin_a = cosU1 * cosU2 * sin_l / sin_s
+        cos2a = 1 - sin_a * sin_a
+        cos2sm = cos_s - 2 * sinU1 * sinU2 / cos2a if cos2a else 0.0
+        C = f / 16 * cos2a * (4 + f * (4 - 3 * cos2a))
+        prev = lam
+        lam = L + (1 - C) * f * sin_a * (sigma + C * sin_s * (cos2sm + C * cos_s * (-1 + 2 * cos2sm * cos2sm)))
+        if abs(lam - prev) < 1e-12:
+            break
+    else:
+        return None
+    u2 = cos2a * (a * a - b * b) / (b * b)
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    ds = B * sin_s * (cos2sm + B / 4 * (cos_s * (-1 + 2 * cos2sm * cos2sm) - B / 6 * cos2sm * (-3 + 4 * sin_s * sin_s) * (-3 + 4 * cos2sm * cos2sm)))
+    return b * A * (sigma - ds) / 1000.0
+
+def destination(rng: random.Random, lat: float, lon: float, km: float) -> tuple[float, float]:
+    """A point `km` away (on the sphere) in a random direction."""
+    brg = rng.uniform(0, 2 * math.pi)
+    d = km / 6371.0088
+    p1, l1 = math.radians(lat), math.radians(lon)
+    p2 = math.asin(math.sin(p1) * math.cos(d) + math.cos(p1) * math.sin(d) * math.cos(brg))
+    l2 = l1 + math.atan2(math.sin(brg) * math.sin(d) * math.cos(p1), math.cos(d) - math.sin(p1) * math.sin(p2))
+    return math.degrees(p2), (math.degrees(l2) + 540.0) % 360.0 - 180.0
+
+def timed(fn, reps: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1e6 / reps
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Distance kernels: error vs WGS84 and throughput")
+    ap.add_argument("--samples", type=int, default=2000, help="point pairs per latitude band and span")
+    ap.add_argument("--batch", type=int, default=5000, help="points in the one-to-many case")
+    args = ap.parse_args()
+    rng = random.Random(3)
+
+    for band in (0.0, 30.0, 45.0, 60.0, 75.0, 85.0):
+        for span in (1.0, 10.0, 100.0, 500.0, 2000.0):
+            worst = {"legacy": 0.0, "haversine": 0.0, "legacy_vs_sphere": 0.0}
+            for _ in range(args.samples):
+                lat = rng.uniform(band - 2.0, min(89.0, band + 2.0)) * rng.choice((1, -1))
+                lon = rng.uniform(-179.0, 179.0)
+                lat2, lon2 = destination(rng, lat, lon, span)
+                if abs(lon2 - lon) > 180.0:
+                    continue  # the legacy formula has no antimeridian handling; not a fair comparison
+                ref = vincenty_km(lat, lon, lat2, lon2)
+                if not ref:
+                    continue
+                hv = haversine_km(lat, lon, lat2, lon2)
+                lg = legacy_distance_km(lat, lon, lat2, lon2)
+                worst["legacy"] = max(worst["legacy"], abs(lg - ref) / ref)
+                worst["haversine"] = max(worst["haversine"], abs(hv - ref) / ref)
+                worst["legacy_vs_sphere"] = max(worst["legacy_vs_sphere"], abs(lg - hv) / hv)
+            print(json.dumps({"lat_band": band, "span_km": span, **{f"max_rel_err_{k}": round(v, 6) for k, v in worst.items()}}))
+
+    pairs = [(rng.uniform(-44, -10), rng.uniform(113, 154), rng.uniform(-44, -10), rng.uniform(113, 154)) for _ in range(args.batch)]
+    print(json.dumps({
+        "case": "scalar",
+        "legacy_us": round(timed(lambda: [legacy_distance_km(*p) for p in pairs], len(pairs)), 3),
+        "haversine_us": round(timed(lambda: [haversine_km(*p) for p in pairs], len(pairs)), 3),
+        "within_km_10km_us": round(timed(lambda: [within_km(*p, 10.0) for p in pairs], len(pairs)), 3),
+    }))
+
+    lats = [p[2] for p in pairs]
+    lons = [p[3] for p in pairs]
+    row = {
+        "case": "one_to_many",
+        "points": len(pairs),
+        "legacy_loop_us": round(timed(lambda: max(legacy_distance_km(-30.0, 140.0, la, lo) for la, lo in zip(lats, lons)), len(pairs)), 3),
+        "haversine_loop_us": round(timed(lambda: max(haversine_km(-30.0, 140.0, la, lo) for la, lo in zip(lats, lons)), len(pairs)), 3),
+    }
+    np_mod = geodesy.np
+    geodesy.np = None
+    row["farthest_km_python_us"] = round(timed(lambda: farthest_km(-30.0, 140.0, lats, lons), len(pairs)), 3)
+    row["distances_km_python_us"] = round(timed(lambda: distances_km(-30.0, 140.0, lats, lons), len(pairs)), 3)
+    geodesy.np = np_mod
+    if np_mod is not None:
+        row["farthest_km_numpy_us"] = round(timed(lambda: farthest_km(-30.0, 140.0, lats, lons), len(pairs)), 3)
+        row["distances_km_numpy_us"] = round(timed(lambda: distances_km(-30.0, 140.0, lats, lons), len(pairs)), 3)
+    print(json.dumps(row))
+
+if __name__ == "__main__":
+    main()
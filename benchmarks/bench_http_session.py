@@ -0,0 +1,114 @@
+"""
+Benchmark per-refresh connection setup: new ClientSession per refresh vs one pooled session.
+
+What this does:
+- Starts a local aiohttp server serving N small CAP documents (one path per "feed").
+- Simulates R coordinator refreshes that fetch every feed concurrently.
+- Mode `per_refresh` opens a fresh `aiohttp.ClientSession()` each refresh (previous behaviour).
+- Mode `pooled` reuses one long-lived session with a per-host pooled connector and DNS cache,
+  as Home Assistant's shared client session does.
+- Uses aiohttp tracing to sum the time spent creating connections and counts new connections.
+
+Run:
+    python benchmarks/bench_http_session.py --feeds 40 --refreshes 10
+
+Output is a single JSON object per mode on stdout.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+from aiohttp import web
+
+CAP_DOC = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">'
+    '<identifier>bench-1</identifier><sent>2026-01-27T00:00:00+10:00</sent>'
+    '<info><event>Bushfire</event><severity>Severe</severity><headline>Bench</headline>'
+    '<area><areaDesc>Bench</areaDesc><polygon>-33.0,151.0 -33.1,151.1 -33.2,151.0 -33.0,151.0</polygon></area>'
+    '</info></alert>'
+)
+
+async def _start_server(port: int) -> web.AppRunner:
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=CAP_DOC, content_type="application/xml")
+    app = web.Application()
+    app.router.add_get("/feed/{n}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+def _trace_config(stats: dict) -> aiohttp.TraceConfig:
+    tc = aiohttp.TraceConfig()
+
+    async def on_start(session, ctx, params):
+        ctx.t0 = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        stats["connections"] += 1
+        stats["connect_s"] += time.perf_counter() - ctx.t0
+
+    tc.on_connection_create_start.append(on_start)
+    tc.on_connection_create_end.append(on_end)
+    return tc
+
+def _pooled_session(stats: dict) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=8, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, trace_configs=[_trace_config(stats)])
+
+async def _refresh(sess: aiohttp.ClientSession, urls: list[str]) -> None:
+    async def one(url: str) -> None:
+        async with sess.get(url) as resp:
+            await resp.read()
+    await asyncio.gather(*(one(u) for u in urls))
+
+async def run(mode: str, feeds: int, refreshes: int, port: int) -> dict:
+    urls = [f"http://localhost:{port}/feed/{n}" for n in range(feeds)]
+    stats = {"connections": 0, "connect_s": 0.0}
+    wall = []
+    pooled = _pooled_session(stats) if mode == "pooled" else None
+    try:
+        for _ in range(refreshes):
+            t0 = time.perf_counter()
+            if pooled is not None:
+                await _refresh(pooled, urls)
+            else:
+                async with aiohttp.ClientSession(trace_configs=[_trace_config(stats)]) as sess:
+                    await _refresh(sess, urls)
+            wall.append(time.perf_counter() - t0)
+    finally:
+        if pooled is not None:
+            await pooled.close()
+    return {
+        "mode": mode,
+        "feeds": feeds,
+        "refreshes": refreshes,
+        "new_connections": stats["connections"],
+        # Summed across concurrent connections, so it can exceed wall time
+        "connect_ms_per_refresh": round(stats["connect_s"] * 1000.0 / refreshes, 3),
+        "wall_ms_per_refresh": round(sum(wall) * 1000.0 / refreshes, 3),
+        # First refresh always pays setup; steady state is what matters for 5-minute polling
+        "steady_wall_ms_per_refresh": round(sum(wall[1:]) * 1000.0 / max(1, refreshes - 1), 3),
+    }
+
+async def main_async(args: argparse.Namespace) -> None:
+    runner = await _start_server(args.port)
+    try:
+        for mode in ("per_refresh", "pooled"):
+            print(json.dumps(await run(mode, args.feeds, args.refreshes, args.port)))
+    finally:
+        await runner.cleanup()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--feeds", type=int, default=40)
+    ap.add_argument("--refreshes", type=int, default=10)
+    ap.add_argument("--port", type=int, default=8765)
+    asyncio.run(main_async(ap.parse_args()))
+
+if __name__ == "__main__":
+    main()
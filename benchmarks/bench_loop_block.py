@@ -0,0 +1,71 @@
+"""
+Measure event-loop block time while feeds are parsed inline, in a thread pool or in a process pool.
+
+What this does:
+- Generates N synthetic CAP feeds of the given size (see synthetic.py).
+- Parses them concurrently from a coroutine, the way the coordinator does on a refresh:
+    * `inline`  — `parse_feed` called directly in the coroutine (behaviour before worker pools)
+    * `thread`  — `workers.decode_and_parse` in a ThreadPoolExecutor (HA's default executor)
+    * `process` — `workers.decode_and_parse` in a spawn-based ProcessPoolExecutor
+- Reports total and worst event-loop lag from `workers.LoopBlockMonitor`, plus wall time.
+
+Run:
+    python benchmarks/bench_loop_block.py --feeds 8 --size-mb 2
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from synthetic import cap_feed_of_size, load_integration
+
+load_integration()
+from cap_alerts.parser import parse_feed  # noqa: E402
+from cap_alerts.workers import LoopBlockMonitor, decode_and_parse  # noqa: E402
+
+async def run(mode: str, bodies: list[bytes]) -> dict:
+    loop = asyncio.get_running_loop()
+    pool = None
+    if mode == "thread":
+        pool = ThreadPoolExecutor(max_workers=4)
+    elif mode == "process":
+        pool = ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("spawn"))
+        # Warm the workers so process start-up is not counted against parsing
+        await asyncio.gather(*(loop.run_in_executor(pool, decode_and_parse, b"[]", "utf-8", "json") for _ in range(4)))
+
+    async def one(body: bytes) -> int:
+        if pool is None:
+            return len(parse_feed(body.decode("utf-8"), "cap")["alerts"])
+        job = await loop.run_in_executor(pool, decode_and_parse, body, "utf-8", "cap", None)
+        return len(job["parsed"]["alerts"])
+
+    t0 = time.perf_counter()
+    async with LoopBlockMonitor() as mon:
+        counts = await asyncio.gather(*(one(b) for b in bodies))
+    wall = time.perf_counter() - t0
+    if pool is not None:
+        pool.shutdown()
+    return {
+        "mode": mode,
+        "feeds": len(bodies),
+        "records": sum(counts),
+        "wall_ms": round(wall * 1000.0, 1),
+        "loop_block_total_ms": round(mon.total_ms, 1),
+        "loop_block_max_ms": round(mon.max_ms, 1),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Event-loop block time: inline vs worker-pool parsing")
+    ap.add_argument("--feeds", type=int, default=8)
+    ap.add_argument("--size-mb", type=float, default=2.0)
+    ap.add_argument("--modes", default="inline,thread,process")
+    args = ap.parse_args()
+    bodies = [cap_feed_of_size(int(args.size_mb * 1024 * 1024), seed=i).encode("utf-8") for i in range(args.feeds)]
+    for mode in args.modes.split(","):
+        print(json.dumps(asyncio.run(run(mode, bodies))))
+
+if __name__ == "__main__":
+    main()
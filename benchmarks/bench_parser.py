@@ -0,0 +1,115 @@
+"""
+Compare the streaming CAP parser against the previous xmltodict whole-document parser.
+
+What this does:
+- Generates synthetic CAP feeds of roughly 1 MB, 10 MB and 50 MB (see synthetic.py).
+- Times `parser.parse_cap_xml` and the legacy xmltodict implementation on each.
+- Measures peak Python heap allocation with tracemalloc (separate run, so timing is not skewed).
+- Checks both produce the same records, also on a multilingual feed (several <info> blocks per
+  alert, where only the first block's areas become records).
+
+Run:
+    python benchmarks/bench_parser.py [--sizes 1,10,50] [--repeat 3]
+
+Requires `xmltodict` for the legacy comparison. Output is one JSON object per size and parser.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from synthetic import cap_feed_of_size, load_integration, make_cap_feed
+
+load_integration()
+from cap_alerts.parser import parse_cap_xml, _norm_item  # noqa: E402
+
+def legacy_parse_cap_xml(text: str) -> dict:
+    """The xmltodict-based parser as shipped before the streaming rewrite."""
+    import xmltodict
+    doc = xmltodict.parse(text)
+    alerts = []
+    def ensure_list(x):
+        if x is None:
+            return []
+        return x if isinstance(x, list) else [x]
+    root = doc
+    if 'alert' in root:
+        alert_list = ensure_list(root['alert'])
+    else:
+        alert_list = []
+        for k, v in root.items():
+            if isinstance(v, dict) and 'alert' in v:
+                alert_list = ensure_list(v['alert'])
+                break
+    for a in alert_list:
+        identifier = (a.get('identifier') or '')
+        sent = (a.get('sent') or '')
+        info_list = ensure_list(a.get('info'))
+        if not info_list:
+            alerts.append(_norm_item(identifier=identifier, sent=sent))
+            continue
+        info = info_list[0]
+        common = dict(identifier=identifier, sent=sent, headline=info.get('headline') or '', event=info.get('event') or '',
+                      severity=info.get('severity') or '', urgency=info.get('urgency') or '', link=info.get('web') or '')
+        area_list = ensure_list(info.get('area'))
+        if not area_list:
+            alerts.append(_norm_item(**common))
+            continue
+        for area in area_list:
+            alerts.append(_norm_item(areaDesc=area.get('areaDesc') or '', polygon=area.get('polygon') or '', circle=area.get('circle') or '', **common))
+    return {'alerts': alerts}
+
+PARSERS = {"streaming": parse_cap_xml, "xmltodict": legacy_parse_cap_xml}
+
+def measure(fn, text: str, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        out = fn(text)
+        best = min(best, time.perf_counter() - t0)
+        del out
+    gc.collect()
+    tracemalloc.start()
+    out = fn(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mb = len(text.encode("utf-8")) / (1024 * 1024)
+    return {
+        "seconds": round(best, 4),
+        "mb_per_s": round(mb / best, 2) if best else None,
+        "peak_mb": round(peak / (1024 * 1024), 2),
+        "records": len(out["alerts"]),
+    }
+
+def same_output(text: str) -> bool:
+    # The legacy parser never read <sender>/<msgType>/<references>; compare the fields both produce
+    current = [dict(a, sender="", msgType="", references="") for a in parse_cap_xml(text)["alerts"]]
+    return current == legacy_parse_cap_xml(text)["alerts"]
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Streaming vs xmltodict CAP parser")
+    ap.add_argument("--sizes", default="1,10,50", help="Comma-separated feed sizes in MB")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    for size_mb in (int(s) for s in args.sizes.split(",")):
+        text = cap_feed_of_size(size_mb * 1024 * 1024)
+        results = {}
+        for name, fn in PARSERS.items():
+            try:
+                results[name] = measure(fn, text, args.repeat)
+            except ImportError:
+                continue
+            print(json.dumps({"size_mb": size_mb, "parser": name, **results[name]}))
+        if len(results) == 2:
+            print(json.dumps({"size_mb": size_mb, "identical_output": same_output(text)}))
+    try:
+        multi = make_cap_feed(alerts=50, areas_per_alert=2, vertices=20, languages=3)
+        print(json.dumps({"case": "multi_info", "identical_output": same_output(multi)}))
+    except ImportError:
+        pass
+
+if __name__ == "__main__":
+    main()
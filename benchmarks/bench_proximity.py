@@ -0,0 +1,107 @@
+"""
+Benchmark point-to-polygon proximity on dense alert polygons.
+
+What this does:
+- Builds P traced-perimeter polygons of V vertices and scatters Q query points around each,
+  outside the polygon and up to a few radii from its bounding box.
+- Times, per query (µs):
+    * `centroid`    — haversine to the ring's vertex-average centroid (the previous fallback)
+    * `brute_force` — great-circle cross-track distance to every edge (the reference)
+    * `within_km`   — Ring.within_km(): latitude-gap rejection, edge pruning, early exit
+    * `nearest`     — AreaGeometry.proximity(): nearest edge distance and bearing
+- Checks within_km() against the reference (any disagreement must sit within `--slack-m` of
+  the radius) and reports the worst distance error of nearest() and how many queries the
+  centroid test got wrong.
+
+Run:
+    python benchmarks/bench_proximity.py --polygons 10 --vertices 3000 10000 --queries 200 --radius-km 10
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import random
+import time
+
+from synthetic import load_integration, perimeter_ring, polygon_text
+
+load_integration()
+from cap_alerts.geodesy import EARTH_RADIUS_KM, bearing_deg, haversine_km  # noqa: E402
+from cap_alerts.geometry import build_area  # noqa: E402
+
+def segment_km(plat, plon, alat, alon, blat, blon) -> float:
+    """Great-circle distance from P to the arc A–B (cross-track, clamped to the endpoints)."""
+    d13 = haversine_km(alat, alon, plat, plon) / EARTH_RADIUS_KM
+    d12 = haversine_km(alat, alon, blat, blon) / EARTH_RADIUS_KM
+    if d12 == 0.0:
+        return d13 * EARTH_RADIUS_KM
+    rel = math.radians(bearing_deg(alat, alon, plat, plon) - bearing_deg(alat, alon, blat, blon))
+    if math.cos(rel) <= 0.0:
+        return d13 * EARTH_RADIUS_KM
+    xt = math.asin(max(-1.0, min(1.0, math.sin(d13) * math.sin(rel))))
+    at = math.acos(max(-1.0, min(1.0, math.cos(d13) / math.cos(xt))))
+    if at >= d12:
+        return haversine_km(blat, blon, plat, plon)
+    return abs(xt) * EARTH_RADIUS_KM
+
+def brute_force_km(pts, plat, plon) -> float:
+    return min(segment_km(plat, plon, *pts[i - 1], *pts[i]) for i in range(1, len(pts)))
+
+def timed(fn, queries) -> tuple[list, float]:
+    t0 = time.perf_counter()
+    out = [fn(la, lo) for la, lo in queries]
+    return out, (time.perf_counter() - t0) * 1e6 / max(1, len(queries))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Point-to-polygon distance: centroid vs true boundary distance")
+    ap.add_argument("--polygons", type=int, default=10)
+    ap.add_argument("--vertices", type=int, nargs="+", default=[3000, 10000])
+    ap.add_argument("--queries", type=int, default=200, help="query points per polygon")
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    ap.add_argument("--slack-m", type=float, default=5.0, help="allowed disagreement band around the radius")
+    args = ap.parse_args()
+    rk = args.radius_km
+    for vertices in args.vertices:
+        rng = random.Random(9)
+        totals = {"centroid": 0.0, "brute_force": 0.0, "within_km": 0.0, "nearest": 0.0}
+        n = wrong_centroid = wrong_within = within_hits = 0
+        worst_err_m = 0.0
+        for _ in range(args.polygons):
+            pts = perimeter_ring(rng, vertices, radius_deg=rng.uniform(0.1, 0.6))
+            geom = build_area([polygon_text(pts)], [])
+            ring = geom.rings[0]
+            pad = 3.0 * rk / 111.0
+            queries = []
+            while len(queries) < args.queries:
+                la = rng.uniform(ring.min_lat - pad, ring.max_lat + pad)
+                lo = rng.uniform(ring.min_lon - pad, ring.max_lon + pad)
+                if not ring.contains(la, lo):
+                    queries.append((la, lo))
+            ref, us = timed(lambda la, lo: brute_force_km(pts, la, lo), queries)
+            totals["brute_force"] += us
+            cen, us = timed(lambda la, lo: haversine_km(la, lo, ring.clat, ring.clon) <= rk, queries)
+            totals["centroid"] += us
+            win, us = timed(lambda la, lo: ring.within_km(la, lo, rk), queries)
+            totals["within_km"] += us
+            near, us = timed(geom.proximity, queries)
+            totals["nearest"] += us
+            for d, c, w, (_inside, dist, _brg) in zip(ref, cen, win, near):
+                n += 1
+                within_hits += w
+                wrong_centroid += c != (d <= rk)
+                if w != (d <= rk) and abs(d - rk) * 1000.0 > args.slack_m:
+                    wrong_within += 1
+                worst_err_m = max(worst_err_m, abs(dist - d) * 1000.0)
+        print(json.dumps({
+            "vertices": vertices,
+            "queries": n,
+            "radius_km": rk,
+            **{f"{k}_us": round(v / args.polygons, 2) for k, v in totals.items()},
+            "within": within_hits,
+            "within_km_disagreements": wrong_within,
+            "centroid_disagreements": wrong_centroid,
+            "nearest_max_err_m": round(worst_err_m, 3),
+        }))
+
+if __name__ == "__main__":
+    main()
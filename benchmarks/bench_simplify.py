@@ -0,0 +1,65 @@
+"""
+Benchmark Douglas–Peucker simplification of dense alert polygons.
+
+What this does:
+- Builds P traced-perimeter polygons of V vertices (fire/flood style, a few metres of noise).
+- For each tolerance (metres), simplifies every ring at build time and reports:
+    * vertex reduction and build time
+    * time per containment test, exact ring vs simplified ring with the error-band fallback
+    * how many tests fell back to the exact ring
+- Checks every test against the exact ring; any mismatch is reported.
+
+Run:
+    python benchmarks/bench_simplify.py --polygons 20 --vertices 3000 --points 20000 --tolerances 10 50 200
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+
+from synthetic import load_integration, perimeter_ring, polygon_text
+
+load_integration()
+from cap_alerts.geometry import _crossings, build_area  # noqa: E402
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Polygon simplification: vertex reduction and containment-test speed")
+    ap.add_argument("--polygons", type=int, default=20)
+    ap.add_argument("--vertices", type=int, default=3000)
+    ap.add_argument("--points", type=int, default=20000)
+    ap.add_argument("--tolerances", type=float, nargs="+", default=[10.0, 50.0, 200.0])
+    args = ap.parse_args()
+    rng = random.Random(5)
+    polygons = [polygon_text(perimeter_ring(rng, args.vertices)) for _ in range(args.polygons)]
+    for tol in args.tolerances:
+        t0 = time.perf_counter()
+        rings = [build_area([p], [], tol).rings[0] for p in polygons]
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        # Query points inside each ring's bounding box, so the bbox early exit does not hide the work
+        queries = []
+        for _ in range(args.points):
+            r = rng.choice(rings)
+            queries.append((r, rng.uniform(r.min_lat, r.max_lat), rng.uniform(r.min_lon, r.max_lon)))
+        t0 = time.perf_counter()
+        exact = [_crossings(r.coords, la, lo) for r, la, lo in queries]
+        t_exact = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fast = [r.contains(la, lo) for r, la, lo in queries]
+        t_fast = time.perf_counter() - t0
+        vertices = sum(len(r) for r in rings)
+        kept = sum(r.fast_len for r in rings)
+        print(json.dumps({
+            "tolerance_m": tol,
+            "vertices": vertices,
+            "simplified_vertices": kept,
+            "reduction": round(1.0 - kept / vertices, 3),
+            "build_ms": round(build_ms, 1),
+            "exact_us_per_test": round(t_exact * 1e6 / len(queries), 2),
+            "simplified_us_per_test": round(t_fast * 1e6 / len(queries), 2),
+            "band_fallbacks": sum(r.fallbacks for r in rings),
+            "mismatches": sum(1 for a, b in zip(exact, fast) if a != b),
+        }))
+
+if __name__ == "__main__":
+    main()
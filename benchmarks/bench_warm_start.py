@@ -0,0 +1,132 @@
+"""
+Benchmark startup: cold start (fetch + parse every feed) vs warm start from a snapshot.
+
+What this does:
+- Serves N synthetic CAP feeds from a local aiohttp server with a fixed per-request latency,
+  spread over H loopback addresses so the per-host cap behaves as with real feed hosts.
+- `cold`: what setup waited for before — fetch every feed under the coordinator's global and
+  per-host limits, parse it in a thread, build geometry and fill the GeometryStore/AlertStore.
+- `warm`: read the snapshot file written after the cold run, decode it and fill the same stores.
+  This is the time until entities have data; the network refresh then runs in the background.
+- Reports both times and the snapshot size for each feed count.
+
+Run:
+    python benchmarks/bench_warm_start.py --feeds 1 20 100 --latency-ms 150
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+from synthetic import load_integration, make_cap_feed
+
+load_integration()
+from cap_alerts.alert_store import AlertStore  # noqa: E402
+from cap_alerts.const import MAX_CONCURRENT_FETCHES, MAX_FETCHES_PER_HOST  # noqa: E402
+from cap_alerts.geometry import GeometryStore, build_areas  # noqa: E402
+from cap_alerts.snapshot import build_snapshot, restore_snapshot  # noqa: E402
+from cap_alerts.workers import decode_and_parse  # noqa: E402
+
+async def _start_server(docs: dict[str, bytes], hosts: int, port: int, latency: float) -> list[web.AppRunner]:
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.Response(body=docs[request.match_info["n"]], content_type="application/xml")
+    runners = []
+    for h in range(hosts):
+        app = web.Application()
+        app.router.add_get("/feed/{n}", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, f"127.0.0.{h + 1}", port).start()
+        runners.append(runner)
+    return runners
+
+async def cold_start(feeds: list[dict]) -> tuple[list[dict], dict, GeometryStore, AlertStore]:
+    global_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    http_cache: dict[str, dict] = {}
+
+    async def one(sess: aiohttp.ClientSession, f: dict) -> dict:
+        host = f["url"].split("/")[2]
+        async with host_limits.setdefault(host, asyncio.Semaphore(MAX_FETCHES_PER_HOST)), global_limit:
+            async with sess.get(f["url"]) as resp:
+                body = await resp.read()
+                etag = resp.headers.get("ETag")
+        job = await asyncio.to_thread(decode_and_parse, body, "utf-8", "cap", None)
+        http_cache[f["url"]] = {"etag": etag, "last_modified": None, "body_hash": job["body_hash"], "max_age": None}
+        return {"feed": f, "slug": f["name"], "alerts": job["parsed"]["alerts"], "features": job["parsed"]["features"]}
+
+    async with aiohttp.ClientSession() as sess:
+        results = list(await asyncio.gather(*(one(sess, f) for f in feeds)))
+    geometry = GeometryStore()
+    geometry.update(results, await asyncio.to_thread(build_areas, geometry.pending(results)))
+    alerts = AlertStore()
+    alerts.update(results)
+    return results, http_cache, geometry, alerts
+
+def warm_start(path: str, feeds: list[dict]) -> tuple[list[dict], GeometryStore, AlertStore]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    results, _http_cache, areas = restore_snapshot(data, [f["url"] for f in feeds])
+    geometry = GeometryStore()
+    geometry.preload(areas)
+    geometry.update(results, {})
+    alerts = AlertStore()
+    alerts.update(results)
+    return results, geometry, alerts
+
+async def run(n: int, args: argparse.Namespace) -> dict:
+    docs = {}
+    feeds = []
+    for i in range(n):
+        text = make_cap_feed(alerts=args.alerts, vertices=args.vertices, seed=i).replace("urn:bench:alert:", f"urn:bench:{i}:alert:")
+        docs[str(i)] = text.encode("utf-8")
+        feeds.append({"name": f"feed_{i}", "url": f"http://127.0.0.{i % args.hosts + 1}:{args.port}/feed/{i}", "format": "cap"})
+    runners = await _start_server(docs, args.hosts, args.port, args.latency_ms / 1000.0)
+    try:
+        t0 = time.perf_counter()
+        results, http_cache, geometry, alerts = await cold_start(feeds)
+        cold_ms = (time.perf_counter() - t0) * 1000.0
+    finally:
+        for r in runners:
+            await r.cleanup()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(build_snapshot(results, http_cache, geometry, time.time()), fh, separators=(",", ":"))
+        size = os.path.getsize(path)
+        t0 = time.perf_counter()
+        warm_results, warm_geometry, warm_alerts = warm_start(path, feeds)
+        warm_ms = (time.perf_counter() - t0) * 1000.0
+    same = len(warm_alerts) == len(alerts) and len(warm_geometry) == len(geometry) and all(w["features"].get("stale") for w in warm_results)
+    return {
+        "feeds": n,
+        "alerts": len(alerts),
+        "cold_ms": round(cold_ms, 1),
+        "warm_ms": round(warm_ms, 1),
+        "snapshot_kb": round(size / 1024.0, 1),
+        "restored_ok": same,
+    }
+
+async def main_async(args: argparse.Namespace) -> None:
+    for n in args.feeds:
+        print(json.dumps(await run(n, args)))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Cold start vs warm start from snapshot")
+    ap.add_argument("--feeds", type=int, nargs="+", default=[1, 20, 100])
+    ap.add_argument("--alerts", type=int, default=30)
+    ap.add_argument("--vertices", type=int, default=60)
+    ap.add_argument("--hosts", type=int, default=4)
+    ap.add_argument("--latency-ms", type=float, default=150.0)
+    ap.add_argument("--port", type=int, default=8766)
+    asyncio.run(main_async(ap.parse_args()))
+
+if __name__ == "__main__":
+    main()
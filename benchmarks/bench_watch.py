@@ -0,0 +1,120 @@
+"""
+Benchmark standing watchpoint matching against a full re-test per refresh.
+
+What this does:
+- Loads A synthetic alerts and registers W watchpoints.
+- Simulates R refreshes; each replaces C alerts (C << A) with new ones.
+- Compares per-refresh time of:
+    * `rescan` — every watchpoint tested against every alert area (what a timed
+      find_matches / template loop does)
+    * `engine` — WatchEngine.update(), which tests only the changed areas
+- Checks both give the same final match sets.
+- Then moves one tracked watchpoint along a GPS-like track (`--fixes` fixes, a few metres to
+  ~100 m apart) and compares per-fix time of:
+    * `find_matches` — a fresh grid query plus exact tests at every fix
+    * `move`         — WatchEngine.move() (movement threshold, previous matches first with
+      hysteresis, candidates cached per coarse cell)
+
+Run:
+    python benchmarks/bench_watch.py --alerts 2000 --watchpoints 200 --changed 10 --refreshes 20 --fixes 2000
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+
+from synthetic import load_integration, make_cap_feed
+
+load_integration()
+from cap_alerts.geometry import GeometryStore, build_areas  # noqa: E402
+from cap_alerts.parser import parse_feed  # noqa: E402
+from cap_alerts.watch import WatchEngine, Watchpoint  # noqa: E402
+
+URL = "https://feeds.example/cap.xml"
+
+def rescan(store: GeometryStore, points: list[Watchpoint]) -> dict[str, set]:
+    return {
+        wp.id: {a["identifier"] for _r, a, g in store.iter_entries() if g.matches(wp.lat, wp.lon, wp.radius_km)}
+        for wp in points
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Watchpoint matching: changed alerts only vs full re-test")
+    ap.add_argument("--alerts", type=int, default=2000)
+    ap.add_argument("--watchpoints", type=int, default=200)
+    ap.add_argument("--changed", type=int, default=10)
+    ap.add_argument("--refreshes", type=int, default=20)
+    ap.add_argument("--vertices", type=int, default=40)
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    ap.add_argument("--fixes", type=int, default=2000)
+    args = ap.parse_args()
+    rng = random.Random(11)
+    alerts = parse_feed(make_cap_feed(alerts=args.alerts, vertices=args.vertices, seed=1), "cap")["alerts"]
+    spare = parse_feed(make_cap_feed(alerts=args.changed * args.refreshes, vertices=args.vertices, seed=2), "cap")["alerts"]
+    for n, a in enumerate(spare):
+        a["identifier"] = f"new:{n}"
+    points = [Watchpoint(f"wp{i}", rng.uniform(-44.0, -10.0), rng.uniform(113.0, 154.0), args.radius_km) for i in range(args.watchpoints)]
+
+    store = GeometryStore()
+    engine = WatchEngine()
+    results = [{"feed": {"url": URL}, "slug": "feed", "alerts": alerts}]
+    store.update(results, build_areas(store.pending(results)))
+    for wp in points:
+        engine.place(wp, store)
+    engine.update(results, store)
+
+    t_rescan = t_engine = 0.0
+    events = 0
+    for i in range(args.refreshes):
+        alerts = alerts[args.changed:] + spare[i * args.changed:(i + 1) * args.changed]
+        results = [{"feed": {"url": URL}, "slug": "feed", "alerts": alerts}]
+        store.update(results, build_areas(store.pending(results)))
+        t0 = time.perf_counter()
+        expected = rescan(store, points)
+        t_rescan += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        delta = engine.update(results, store)
+        t_engine += time.perf_counter() - t0
+        events += len(delta.matched) + len(delta.unmatched)
+    got = {wp.id: {a["identifier"] for a in engine.matches(wp.id)} for wp in points}
+    for method, total in (("rescan", t_rescan), ("engine", t_engine)):
+        print(json.dumps({
+            "method": method,
+            "alerts": len(alerts),
+            "watchpoints": len(points),
+            "changed_per_refresh": args.changed,
+            "ms_per_refresh": round(total * 1000.0 / args.refreshes, 3),
+        }))
+    print(json.dumps({"events": events, "identical_matches": got == expected}))
+
+    # A phone reporting every few seconds while driving through the alert-dense area
+    lat, lon = -33.8, 151.0
+    track = []
+    for _ in range(args.fixes):
+        step = rng.choice((0.00002, 0.0002, 0.001))
+        lat += rng.uniform(-step, step)
+        lon += rng.uniform(0.0, step)
+        track.append((lat, lon))
+    t0 = time.perf_counter()
+    for la, lo in track:
+        [a for _r, a, g in store.query(la, lo, args.radius_km) if g.matches(la, lo, args.radius_km)]
+    t_query = time.perf_counter() - t0
+    mover = Watchpoint("phone", track[0][0], track[0][1], args.radius_km, "person.phone")
+    engine.place(mover, store)
+    t0 = time.perf_counter()
+    flips = 0
+    for la, lo in track:
+        delta = engine.move("phone", la, lo, store)
+        flips += len(delta.matched) + len(delta.unmatched)
+    t_move = time.perf_counter() - t0
+    for method, total in (("find_matches", t_query), ("move", t_move)):
+        print(json.dumps({"method": method, "alerts": len(alerts), "fixes": len(track), "us_per_fix": round(total * 1e6 / len(track), 2)}))
+    print(json.dumps({"events": flips, **engine.stats()}))
+    # Removing the feed (e.g. from the options) ends every match it held
+    store.update([], {})
+    engine.update([], store)
+    print(json.dumps({"removed_feed_cleared": all(engine.match_count(wp.id) == 0 for wp in engine.watchpoints())}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Offline micro-benchmark suite for the parser and geometry hot paths, with machine-readable output.
+
+What this does:
+- Builds synthetic CAP, Atom and JSON feeds (see synthetic.py) with configurable alert count,
+  areas per alert and vertices per polygon. No network access.
+- Times each case, auto-calibrating the inner loop to at least `--min-time` seconds per round,
+  and reports the best and median of `--repeat` rounds per operation:
+    * parse_feed[cap|atom|json]  — one whole feed
+    * parse_polygon, parse_ring  — one polygon string
+    * point_in_polygon           — string in, parses then tests (the original util API)
+    * ring_contains              — pre-parsed ring test as used by find_matches
+    * centroid_and_radius        — one polygon string
+    * distance_km                — one call
+    * distances_km               — one point to every vertex of the polygon (geodesy batch)
+    * geometry_store_build       — GeometryStore.update() for every feed
+    * find_matches[linear|indexed] — the service loop for one query point
+- Writes one JSON document (`--output`), and optionally compares against an earlier one
+  (`--compare`), exiting non-zero when a case is slower than `--threshold`.
+
+Run:
+    python benchmarks/run_suite.py --output bench.json
+    python benchmarks/run_suite.py --compare bench.json --threshold 0.15
+    python benchmarks/run_suite.py --alerts 500 --areas 2 --vertices 200 --filter parse_feed
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from synthetic import load_integration, make_feed
+
+load_integration()
+from cap_alerts.geometry import (  # noqa: E402
+    GeometryStore, build_areas, centroid_and_radius, distance_km, parse_polygon, parse_ring, point_in_polygon,
+)
+from cap_alerts.geodesy import distances_km  # noqa: E402
+from cap_alerts.parser import parse_feed  # noqa: E402
+
+SUITE_FORMAT = 1
+FORMATS = ("cap", "atom", "json")
+
+def measure(fn, min_time: float, repeat: int) -> dict:
+    """Per-call timings in microseconds: best and median over `repeat` calibrated rounds."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 24:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - t0) / number)
+    return {
+        "best_us": round(min(rounds) * 1e6, 3),
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+        "number": number,
+        "rounds": len(rounds),
+    }
+
+def build_cases(args: argparse.Namespace) -> dict:
+    """name -> zero-argument callable. Inputs are built here, outside the timed region."""
+    cases = {}
+    feeds = {fmt: make_feed(fmt, alerts=args.alerts, areas_per_alert=args.areas, vertices=args.vertices) for fmt in FORMATS}
+    for fmt, text in feeds.items():
+        cases[f"parse_feed[{fmt}]"] = lambda text=text, fmt=fmt: parse_feed(text, fmt)
+
+    parsed = parse_feed(feeds["cap"], "cap")
+    polygon = parsed["alerts"][0]["polygon"]
+    ring = parse_ring(polygon)
+    inside = (ring.clat, ring.clon)
+    cases["parse_polygon"] = lambda: parse_polygon(polygon)
+    cases["parse_ring"] = lambda: parse_ring(polygon)
+    cases["point_in_polygon"] = lambda: point_in_polygon(polygon, *inside)
+    cases["ring_contains"] = lambda: ring.contains(*inside)
+    cases["centroid_and_radius"] = lambda: centroid_and_radius(polygon)
+    cases["distance_km"] = lambda: distance_km(-33.87, 151.21, -37.81, 144.96)
+    lats, lons = list(ring.coords[0::2]), list(ring.coords[1::2])
+    cases["distances_km"] = lambda: distances_km(-33.87, 151.21, lats, lons)
+
+    results = []
+    for i in range(args.feeds):
+        alerts = parse_feed(make_feed("cap", alerts=args.alerts, areas_per_alert=args.areas, vertices=args.vertices, seed=i + 1), "cap")["alerts"]
+        for a in alerts:
+            a["identifier"] = f"{i}:{a['identifier']}"
+        results.append({"feed": {"url": f"https://feeds.example/{i}.xml"}, "slug": f"feed_{i}", "alerts": alerts})
+
+    def store_build():
+        s = GeometryStore()
+        s.update(results, build_areas(s.pending(results)))
+        return s
+
+    cases["geometry_store_build"] = store_build
+    store = store_build()
+    rng = random.Random(7)
+    points = [(rng.uniform(-44.0, -10.0), rng.uniform(113.0, 154.0)) for _ in range(256)]
+    radius = args.radius_km
+    cursor = [0]
+
+    def next_point():
+        cursor[0] = (cursor[0] + 1) % len(points)
+        return points[cursor[0]]
+
+    def find_linear():
+        lat, lon = next_point()
+        return [a for _, a, g in store.iter_entries() if g.matches(lat, lon, radius)]
+
+    def find_indexed():
+        # Same loop as the find_matches service handler
+        lat, lon = next_point()
+        return [a for _, a, g in store.query(lat, lon, radius) if g.matches(lat, lon, radius)]
+
+    cases["find_matches[linear]"] = find_linear
+    cases["find_matches[indexed]"] = find_indexed
+    return cases
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Cases present in both runs whose median is more than `threshold` slower than the baseline."""
+    base = {r["name"]: r for r in baseline.get("results") or []}
+    if baseline.get("params") != current.get("params"):
+        print("warning: baseline was run with different parameters", file=sys.stderr)
+    report = []
+    for r in current["results"]:
+        b = base.get(r["name"])
+        if not b or not b.get("median_us"):
+            continue
+        ratio = r["median_us"] / b["median_us"]
+        report.append({"name": r["name"], "baseline_us": b["median_us"], "current_us": r["median_us"], "ratio": round(ratio, 3), "regression": ratio > 1.0 + threshold})
+    return report
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Parser and geometry micro-benchmarks")
+    ap.add_argument("--alerts", type=int, default=100, help="alerts per feed")
+    ap.add_argument("--areas", type=int, default=1, help="areas per alert")
+    ap.add_argument("--vertices", type=int, default=50, help="vertices per polygon")
+    ap.add_argument("--feeds", type=int, default=10, help="feeds in the geometry store for find_matches")
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--filter", default="", help="only run cases whose name contains this")
+    ap.add_argument("--output", help="write the JSON results here")
+    ap.add_argument("--compare", help="earlier JSON results to compare against")
+    ap.add_argument("--threshold", type=float, default=0.15, help="slowdown ratio counted as a regression")
+    args = ap.parse_args()
+
+    cases = build_cases(args)
+    results = []
+    for name, fn in cases.items():
+        if args.filter and args.filter not in name:
+            continue
+        row = {"name": name, **measure(fn, args.min_time, args.repeat)}
+        results.append(row)
+        print(json.dumps(row), file=sys.stderr)
+    doc = {
+        "format": SUITE_FORMAT,
+        "created": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "params": {k: getattr(args, k) for k in ("alerts", "areas", "vertices", "feeds", "radius_km")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(doc, fh, indent=2)
+    else:
+        print(json.dumps(doc, indent=2))
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            report = compare(doc, json.load(fh), args.threshold)
+        for row in report:
+            print(json.dumps(row))
+        if any(row["regression"] for row in report):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Synthetic CAP / Atom / JSON feed generator for offline benchmarks.
+
+Feeds are deterministic for a given seed so runs are comparable between releases.
+
+Example:
+    from synthetic import make_cap_feed, cap_feed_of_size
+    text = make_cap_feed(alerts=200, areas_per_alert=2, vertices=500)
+    text = cap_feed_of_size(10 * 1024 * 1024)
+    text = make_feed("atom", alerts=200, areas_per_alert=2, vertices=50)
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import random
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTEGRATION_DIR = os.path.join(ROOT, "custom_components", "cap_alerts")
+
+SEVERITIES = ("Extreme", "Severe", "Moderate", "Minor", "Unknown")
+EVENTS = ("Bushfire", "Flood", "Storm", "Heatwave", "Tsunami")
+
+def load_integration():
+    """Make `cap_alerts.<module>` importable without running the HA-dependent package __init__."""
+    if "cap_alerts" not in sys.modules:
+        pkg = types.ModuleType("cap_alerts")
+        pkg.__path__ = [INTEGRATION_DIR]
+        sys.modules["cap_alerts"] = pkg
+    return sys.modules["cap_alerts"]
+
+def ring(rng: random.Random, vertices: int, *, lat: float | None = None, lon: float | None = None, radius_deg: float | None = None) -> list[tuple[float, float]]:
+    """Closed, roughly circular ring of `vertices` points (first point repeated at the end)."""
+    clat = lat if lat is not None else rng.uniform(-44.0, -10.0)
+    clon = lon if lon is not None else rng.uniform(113.0, 154.0)
+    r = radius_deg if radius_deg is not None else rng.uniform(0.05, 1.5)
+    pts = []
+    n = max(3, vertices - 1)
+    for i in range(n):
+        a = 2.0 * math.pi * i / n
+        k = r * rng.uniform(0.7, 1.0)
+        pts.append((round(clat + k * math.sin(a), 5), round(clon + k * math.cos(a), 5)))
+    pts.append(pts[0])
+    return pts
+
+def perimeter_ring(rng: random.Random, vertices: int, *, lat: float | None = None, lon: float | None = None, radius_deg: float = 0.3, noise_m: float = 5.0) -> list[tuple[float, float]]:
+    """Dense traced boundary (fire/flood perimeter style): a smooth lobed outline sampled at
+    `vertices` points with a few metres of noise, closed like ring()."""
+    clat = lat if lat is not None else rng.uniform(-44.0, -10.0)
+    clon = lon if lon is not None else rng.uniform(113.0, 154.0)
+    lobes = [(rng.randint(2, 9), rng.uniform(0.02, 0.12), rng.uniform(0.0, 2.0 * math.pi)) for _ in range(3)]
+    noise = noise_m / 111320.0
+    kx = math.cos(math.radians(clat))
+    pts = []
+    n = max(3, vertices - 1)
+    for i in range(n):
+        a = 2.0 * math.pi * i / n
+        k = radius_deg * (1.0 + sum(amp * math.sin(f * a + ph) for f, amp, ph in lobes))
+        pts.append((
+            round(clat + k * math.sin(a) + rng.uniform(-noise, noise), 6),
+            round(clon + (k * math.cos(a) + rng.uniform(-noise, noise)) / kx, 6),
+        ))
+    pts.append(pts[0])
+    return pts
+
+def polygon_text(pts: list[tuple[float, float]]) -> str:
+    return " ".join(f"{la},{lo}" for la, lo in pts)
+
+def _alert_fields(rng: random.Random, i: int) -> dict:
+    return {
+        "identifier": f"urn:bench:alert:{i}",
+        "sender": "bench@example.org",
+        "sent": f"2026-01-27T{i % 24:02d}:00:00+10:00",
+        "event": EVENTS[i % len(EVENTS)],
+        "severity": SEVERITIES[i % len(SEVERITIES)],
+        "urgency": "Immediate",
+        "headline": f"Synthetic alert {i}",
+    }
+
+def make_cap_feed(alerts: int = 100, areas_per_alert: int = 1, vertices: int = 50, seed: int = 1, languages: int = 1) -> str:
+    """CAP feed; with `languages` > 1 every alert gets that many <info> blocks, each with its own areas."""
+    rng = random.Random(seed)
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', '<feed xmlns:cap="urn:oasis:names:tc:emergency:cap:1.2">']
+    for i in range(alerts):
+        f = _alert_fields(rng, i)
+        out.append(
+            '<alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">'
+            f'<identifier>{f["identifier"]}</identifier><sender>{f["sender"]}</sender><sent>{f["sent"]}</sent>'
+            '<status>Actual</status><msgType>Alert</msgType><scope>Public</scope>'
+        )
+        for k in range(languages):
+            tag = f" ({k})" if k else ""
+            out.append(
+                f'<info><event>{f["event"]}</event><urgency>{f["urgency"]}</urgency><severity>{f["severity"]}</severity>'
+                f'<certainty>Likely</certainty><headline>{f["headline"]}{tag}</headline><web>https://example.org/{i}</web>'
+            )
+            for j in range(areas_per_alert):
+                out.append(f'<area><areaDesc>Area {i}.{j}{tag}</areaDesc><polygon>{polygon_text(ring(rng, vertices))}</polygon></area>')
+            out.append('</info>')
+        out.append('</alert>')
+    out.append('</feed>')
+    return "\n".join(out)
+
+def make_atom_feed(alerts: int = 100, vertices: int = 50, seed: int = 1, areas_per_alert: int = 1) -> str:
+    """Atom carries one polygon per entry, so extra areas become extra entries with the same id."""
+    rng = random.Random(seed)
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:georss="http://www.georss.org/georss">', '<title>Bench</title>']
+    for i in range(alerts):
+        f = _alert_fields(rng, i)
+        for j in range(areas_per_alert):
+            out.append(
+                f'<entry><id>{f["identifier"]}</id><updated>{f["sent"]}</updated><title>{f["headline"]}</title>'
+                f'<link href="https://example.org/{i}"/><summary>Area {i}.{j}</summary>'
+                f'<georss:polygon>{polygon_text(ring(rng, vertices))}</georss:polygon></entry>'
+            )
+    out.append('</feed>')
+    return "\n".join(out)
+
+def make_json_feed(alerts: int = 100, vertices: int = 50, seed: int = 1, areas_per_alert: int = 1) -> str:
+    """One GeoJSON Polygon per item; extra areas become extra items with the same id."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(alerts):
+        f = _alert_fields(rng, i)
+        for j in range(areas_per_alert):
+            pts = ring(rng, vertices)
+            items.append({
+                "id": f["identifier"], "sent": f["sent"], "headline": f["headline"], "event": f["event"],
+                "severity": f["severity"], "urgency": f["urgency"], "areaDesc": f"Area {i}.{j}",
+                "geometry": {"type": "Polygon", "coordinates": [[[lo, la] for la, lo in pts]]},
+            })
+    return json.dumps({"alerts": items})
+
+def make_feed(fmt: str, alerts: int = 100, areas_per_alert: int = 1, vertices: int = 50, seed: int = 1) -> str:
+    """Synthetic feed in `fmt` ("cap", "atom" or "json"), as parse_feed() expects it."""
+    makers = {"cap": make_cap_feed, "atom": make_atom_feed, "json": make_json_feed}
+    return makers[fmt](alerts=alerts, areas_per_alert=areas_per_alert, vertices=vertices, seed=seed)
+
+def cap_feed_of_size(target_bytes: int, vertices: int = 200, seed: int = 1) -> str:
+    """CAP feed of roughly `target_bytes` characters, built from `vertices`-point polygons."""
+    probe = make_cap_feed(alerts=10, vertices=vertices, seed=seed)
+    per_alert = max(1, len(probe) // 10)
+    return make_cap_feed(alerts=max(1, target_bytes // per_alert), vertices=vertices, seed=seed)
@@ -1,19 +1,36 @@
 from __future__ import annotations
 import logging
-from typing import List, Dict, Any
-from homeassistant.core import HomeAssistant, ServiceCall
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Tuple
+from homeassistant.core import Event, HomeAssistant, ServiceCall, SupportsResponse, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from .const import DOMAIN, EVENT_PIP_RESULT, EVENT_MATCHES, ISSUE_DISCLAIMER_REQUIRED
-from .util import point_in_polygon, centroid_and_radius, distance_km, parse_circle
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
+from .const import DOMAIN, EVENT_PIP_RESULT, EVENT_MATCHES, EVENT_BATCH_MATCHES, MAX_BATCH_MATCHES, ISSUE_DISCLAIMER_REQUIRED
+from .const import SNAPSHOT_STORE_VERSION, SNAPSHOT_STORE_KEY, WATCH_STORE_VERSION, WATCH_STORE_KEY, DEFAULT_WATCH_RADIUS_KM
+from .batch import match_matrix
+from .geometry import GeometryStore
+from .alert_store import AlertStore
+from .dedup import DedupIndex
+from .summary import parse_time, strip_geometry
+from .watch import Watchpoint, WatchDelta, WatchEngine, watch_events
+from .util import point_in_polygon, centroid_and_radius
 from .util import async_load_acceptance, compute_disclaimer_hash, raise_issue, verify_acceptance_signature
-from .util import point_in_polygon, centroid_and_radius, distance_km, parse_circle
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
+    # Pre-parsed alert geometry, filled by the coordinator on each refresh
+    hass.data[DOMAIN].setdefault('geometry', GeometryStore())
+    # Indexed alerts and per-feed summaries, also filled once per refresh
+    hass.data[DOMAIN].setdefault('alerts', AlertStore())
+    # Cross-feed index of mirrored alerts
+    hass.data[DOMAIN].setdefault('dedup', DedupIndex())
+    # Registered watchpoints and their standing matches
+    watch: WatchEngine = hass.data[DOMAIN].setdefault('watch', WatchEngine())
     # Enforce disclaimer acceptance and tamper detection
     acceptance = await async_load_acceptance(hass)
     current_hash = compute_disclaimer_hash()
@@ -26,6 +43,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Create Repairs issue and abort setup
         raise_issue(hass, ISSUE_DISCLAIMER_REQUIRED, translation_key="disclaimer_required", placeholders={"link": "https://github.com/twcau/CAP-au-for-home-assistant/blob/main/LEGAL-DISCLAIMER.md"}, fixable=True)
         return False
+    watch_store = Store(hass, WATCH_STORE_VERSION, WATCH_STORE_KEY)
+    if not len(watch):
+        # Registered before the first refresh, which then seeds their matches without events
+        for item in ((await watch_store.async_load()) or {}).get('watchpoints', []):
+            try:
+                wp = Watchpoint.from_dict(item)
+            except (KeyError, TypeError, ValueError):
+                continue
+            _locate(hass, wp)
+            watch.place(wp, hass.data[DOMAIN]['geometry'])
+    _track_watch_entities(hass)
+    entry.async_on_unload(lambda: _untrack_watch_entities(hass))
+    # Options (feeds, scan intervals, parse executor, diagnostic sensors, simplification) are read at setup
+    entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     async def handle_pip(call: ServiceCall):
@@ -54,32 +85,93 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         radius_km = float(call.data.get('radius_km', 10.0))
         feed_slugs = call.data.get('feed_slugs') or []
         matches: List[Dict[str, Any]] = []
-        cache = hass.data[DOMAIN].get('last_data', [])
-        for r in cache:
-            if feed_slugs and r.get('slug') not in feed_slugs:
-                continue
-            alerts = r.get('alerts') or []
-            for a in alerts:
-                hit = False
-                poly = a.get('polygon') or ''
-                circ = a.get('circle') or ''
-                if poly:
-                    if point_in_polygon(poly, lat, lon):
-                        hit = True
-                    else:
-                        clat, clon, _ = centroid_and_radius(poly)
-                        if distance_km(lat, lon, clat, clon) <= radius_km:
-                            hit = True
-                elif circ:
-                    c = parse_circle(circ)
-                    if c:
-                        clat, clon, cr_km = c
-                        if distance_km(lat, lon, clat, clon) <= (cr_km + radius_km):
-                            hit = True
-                if hit:
-                    matches.append({'feed': r.get('feed'), 'slug': r.get('slug'), 'alert': a})
+        # Geometry is pre-parsed once per refresh by the coordinator
+        store: GeometryStore = hass.data[DOMAIN]['geometry']
+        dedup: DedupIndex = hass.data[DOMAIN]['dedup']
+        # The spatial index narrows the search to alerts whose bounding box is within radius_km;
+        # mirrored alerts are indexed once, under the first feed that carries them
+        for r, a, geom in _carried_by(store.query(lat, lon, radius_km), dedup, feed_slugs):
+            if geom.matches(lat, lon, radius_km):
+                inside, dist, bearing = geom.proximity(lat, lon)
+                matches.append({
+                    'feed': r.get('feed'), 'slug': r.get('slug'), 'feeds': dedup.feeds_for(a) or [r.get('slug')], 'alert': a,
+                    'inside': inside, 'distance_km': round(dist, 3),
+                    'bearing': round(bearing, 1) if bearing is not None else None,
+                })
         hass.bus.fire(EVENT_MATCHES, {'lat': lat, 'lon': lon, 'radius_km': radius_km, 'count': len(matches), 'matches': matches[:50]})
 
+    async def handle_find_matches_batch(call: ServiceCall):
+        default_radius = float(call.data.get('radius_km', 10.0))
+        feed_slugs = call.data.get('feed_slugs') or []
+        points, labels = _resolve_watchpoints(hass, call.data.get('watchpoints') or [], default_radius)
+        store: GeometryStore = hass.data[DOMAIN]['geometry']
+        entries = list(_carried_by(store.iter_entries(), hass.data[DOMAIN]['dedup'], feed_slugs))
+        # One vectorised pass over all watchpoints × active alert areas
+        matrix = match_matrix(points, [g for _r, _a, g in entries])
+        hits = [[m for m, hit in enumerate(row) if hit] for row in matrix]
+        # Only alerts listed for some watchpoint are returned, so the payload follows the matches, not all active alerts
+        used = sorted(set().union(*(idx[:MAX_BATCH_MATCHES] for idx in hits)))
+        col = {m: n for n, m in enumerate(used)}
+        alerts = [{'slug': r.get('slug'), 'identifier': a.get('identifier'), 'headline': a.get('headline'), 'severity': a.get('severity')} for r, a, _g in (entries[m] for m in used)]
+        results = []
+        for label, (lat, lon, rk), idx in zip(labels, points, hits):
+            results.append({'id': label, 'lat': lat, 'lon': lon, 'radius_km': rk, 'count': len(idx), 'matches': [col[m] for m in idx[:MAX_BATCH_MATCHES]]})
+        payload: Dict[str, Any] = {'watchpoints': results, 'alerts': alerts}
+        if call.data.get('matrix'):
+            payload['matrix'] = [[row[m] for m in used] for row in matrix]
+        hass.bus.fire(EVENT_BATCH_MATCHES, {'watchpoints': results, 'alerts': alerts})
+        if call.return_response:
+            return payload
+        return None
+
+    async def handle_get_alerts(call: ServiceCall):
+        # Full alert records on demand; entity attributes only carry a summary
+        severities = call.data.get('severity') or []
+        if isinstance(severities, str):
+            severities = [severities]
+        store: AlertStore = hass.data[DOMAIN]['alerts']
+        dedup: DedupIndex = hass.data[DOMAIN]['dedup']
+        entries = store.select(
+            call.data.get('feed_slugs'), severities, call.data.get('identifier'), call.data.get('event'),
+            _time_range(call.data.get('sent_after'), call.data.get('sent_before')),
+            _time_range(call.data.get('expires_after'), call.data.get('expires_before')),
+        )
+        keep_geometry = call.data.get('include_geometry', False)
+        alerts = [
+            dict(a if keep_geometry else strip_geometry(a), slug=r.get('slug'), feeds=dedup.feeds_for(a) or [r.get('slug')])
+            for r, a in entries
+        ]
+        limit = int(call.data.get('limit', 0) or 0)
+        return {'count': len(alerts), 'alerts': alerts[:limit] if limit > 0 else alerts}
+
+    async def handle_add_watchpoint(call: ServiceCall):
+        entity_id = call.data.get('entity_id')
+        lat, lon = call.data.get('lat'), call.data.get('lon')
+        wp_id = call.data.get('id') or entity_id or f"{lat},{lon}"
+        wp = Watchpoint(
+            str(wp_id),
+            float(lat) if lat is not None else None,
+            float(lon) if lon is not None else None,
+            float(call.data.get('radius_km', DEFAULT_WATCH_RADIUS_KM)),
+            entity_id,
+        )
+        _locate(hass, wp)
+        # Adding (or replacing) a watchpoint reports what it matches right away
+        _fire_watch(hass, watch.place(wp, hass.data[DOMAIN]['geometry']))
+        await watch_store.async_save({'watchpoints': [p.as_dict() for p in watch.watchpoints()]})
+        _track_watch_entities(hass)
+        if call.return_response:
+            return {'watchpoint': wp.as_dict(), 'count': watch.match_count(wp.id), 'alerts': watch.matches(wp.id)}
+        return None
+
+    async def handle_remove_watchpoint(call: ServiceCall):
+        if watch.remove(str(call.data.get('id'))):
+            await watch_store.async_save({'watchpoints': [p.as_dict() for p in watch.watchpoints()]})
+            _track_watch_entities(hass)
+
+    async def handle_list_watchpoints(call: ServiceCall):
+        return {'watchpoints': [dict(wp.as_dict(), count=watch.match_count(wp.id), alerts=watch.matches(wp.id)) for wp in watch.watchpoints()]}
+
     async def handle_create_zones_for_feed(call: ServiceCall):
         feed_slug = call.data.get('feed_slug')
         max_zones = int(call.data.get('max_zones', 10))
@@ -87,40 +179,161 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         icon = call.data.get('icon','mdi:alert')
         include_circles = bool(call.data.get('include_circles', True))
         created = 0
-        cache = hass.data[DOMAIN].get('last_data', [])
-        for r in cache:
-            if r.get('slug') != feed_slug:
+        store: GeometryStore = hass.data[DOMAIN]['geometry']
+        for idx, (_r, _a, geom) in enumerate(_carried_by(store.iter_entries(), hass.data[DOMAIN]['dedup'], [feed_slug]), start=1):
+            if created >= max_zones:
+                break
+            if geom.rings:
+                lat, lon, radius_m = geom.clat, geom.clon, geom.radius_m
+            elif include_circles and geom.circles:
+                lat, lon, radius_m = geom.circles[0][0], geom.circles[0][1], geom.circles[0][2] * 1000.0
+            else:
                 continue
-            alerts = r.get('alerts') or []
-            for idx, a in enumerate(alerts, start=1):
-                if created >= max_zones:
-                    break
-                poly = a.get('polygon') or ''
-                circ = a.get('circle') or ''
-                if poly:
-                    lat, lon, radius_m = centroid_and_radius(poly)
-                elif include_circles and circ and (c := parse_circle(circ)):
-                    clat, clon, cr_km = c
-                    lat, lon, radius_m = clat, clon, cr_km * 1000.0
-                else:
-                    continue
-                name = name_template.format(slug=feed_slug, n=idx)
-                await hass.services.async_call('zone','create',{
-                    'name': name,
-                    'icon': icon,
-                    'latitude': lat,
-                    'longitude': lon,
-                    'radius': radius_m
-                }, blocking=True)
-                created += 1
+            name = name_template.format(slug=feed_slug, n=idx)
+            await hass.services.async_call('zone','create',{
+                'name': name,
+                'icon': icon,
+                'latitude': lat,
+                'longitude': lon,
+                'radius': radius_m
+            }, blocking=True)
+            created += 1
         _LOGGER.debug("create_zones_for_feed: created %s zones for %s", created, feed_slug)
 
     hass.services.async_register(DOMAIN, 'point_in_polygon', handle_pip)
     hass.services.async_register(DOMAIN, 'create_zone_from_polygon', handle_zone_from_polygon)
     hass.services.async_register(DOMAIN, 'find_matches', handle_find_matches)
     hass.services.async_register(DOMAIN, 'create_zones_for_feed', handle_create_zones_for_feed)
+    hass.services.async_register(DOMAIN, 'get_alerts', handle_get_alerts, supports_response=SupportsResponse.ONLY)
+    hass.services.async_register(DOMAIN, 'find_matches_batch', handle_find_matches_batch, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, 'add_watchpoint', handle_add_watchpoint, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, 'remove_watchpoint', handle_remove_watchpoint)
+    hass.services.async_register(DOMAIN, 'list_watchpoints', handle_list_watchpoints, supports_response=SupportsResponse.ONLY)
     return True
 
+def _time_range(start: Any, end: Any) -> Tuple[float | None, float | None] | None:
+    """Service time bounds (ISO 8601 strings, datetimes or POSIX seconds) -> (start, end), or None if neither is set."""
+    if start in (None, '') and end in (None, ''):
+        return None
+    return _posix(start), _posix(end)
+
+def _posix(value: Any) -> float | None:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return parse_time(value) if isinstance(value, str) else None
+
+def _carried_by(entries: Iterable[Tuple[dict, dict, Any]], dedup: DedupIndex, feed_slugs: List[str] | None) -> Iterable[Tuple[dict, dict, Any]]:
+    """Keep (feed result, record, geometry) entries carried by any of `feed_slugs`, mirrors included."""
+    if not feed_slugs:
+        return entries
+    return (e for e in entries if dedup.carried_by(e[1], feed_slugs, e[0].get('slug')))
+
+def _resolve_watchpoints(hass: HomeAssistant, items: List[Any], default_radius_km: float) -> Tuple[List[Tuple[float, float, float]], List[str]]:
+    """Turn service watchpoints into (lat, lon, radius_km) plus a label for each.
+
+    Accepts entity ids (`zone.*`, `person.*`, `device_tracker.*` with latitude/longitude
+    attributes) or dicts with `lat`/`lon` (optional `id`, `radius_km`, `entity_id`).
+    Watchpoints without a resolvable location are skipped.
+    """
+    points: List[Tuple[float, float, float]] = []
+    labels: List[str] = []
+    for n, item in enumerate(items):
+        if isinstance(item, str):
+            item = {'entity_id': item}
+        if not isinstance(item, dict):
+            continue
+        lat, lon = item.get('lat'), item.get('lon')
+        label = item.get('id') or item.get('entity_id') or f"watchpoint_{n}"
+        if (lat is None or lon is None) and item.get('entity_id'):
+            state = hass.states.get(item['entity_id'])
+            if state is not None:
+                lat = state.attributes.get('latitude')
+                lon = state.attributes.get('longitude')
+        if lat is None or lon is None:
+            continue
+        try:
+            points.append((float(lat), float(lon), float(item.get('radius_km', default_radius_km))))
+        except (TypeError, ValueError):
+            continue
+        labels.append(label)
+    return points, labels
+
+def _entity_position(hass: HomeAssistant, entity_id: str) -> Tuple[float, float] | None:
+    state = hass.states.get(entity_id)
+    if state is None:
+        return None
+    try:
+        return float(state.attributes['latitude']), float(state.attributes['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _locate(hass: HomeAssistant, wp: Watchpoint) -> None:
+    """Set an entity watchpoint's position from its current state, if it has one."""
+    pos = _entity_position(hass, wp.entity_id) if wp.entity_id else None
+    if pos is not None:
+        wp.lat, wp.lon = pos
+
+@callback
+def _fire_watch(hass: HomeAssistant, delta: WatchDelta) -> None:
+    for event_type, data in watch_events(hass.data[DOMAIN]['watch'], delta):
+        hass.bus.async_fire(event_type, data)
+
+@callback
+def _track_watch_entities(hass: HomeAssistant) -> None:
+    """(Re)subscribe to state changes of the zones/people/trackers used as watchpoints."""
+    _untrack_watch_entities(hass)
+    watch: WatchEngine = hass.data[DOMAIN]['watch']
+    entity_ids = sorted(watch.entity_ids())
+    if not entity_ids:
+        return
+
+    @callback
+    def _moved(event: Event) -> None:
+        entity_id = event.data.get('entity_id')
+        pos = _entity_position(hass, entity_id)
+        if pos is None:
+            # Lost its location (e.g. tracker unavailable): keep the last known position
+            return
+        for wp in watch.watchpoints():
+            if wp.entity_id == entity_id:
+                _fire_watch(hass, watch.move(wp.id, pos[0], pos[1], hass.data[DOMAIN]['geometry']))
+
+    hass.data[DOMAIN]['watch_unsub'] = async_track_state_change_event(hass, entity_ids, _moved)
+
+@callback
+def _untrack_watch_entities(hass: HomeAssistant) -> None:
+    unsub = hass.data.get(DOMAIN, {}).pop('watch_unsub', None)
+    if unsub is not None:
+        unsub()
+
+async def _async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        await _async_reset_shared_stores(hass, entry)
     return unload_ok
+
+async def _async_reset_shared_stores(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the alerts of an unloaded entry; the shared stores survive unloads otherwise."""
+    data = hass.data.get(DOMAIN, {})
+    coordinators = data.get('coordinators', {})
+    coordinators.pop(entry.entry_id, None)
+    if coordinators:
+        # Re-index the remaining entries' results, which prunes the unloaded entry's feeds
+        await next(iter(coordinators.values())).async_republish()
+        return
+    data['geometry'] = GeometryStore()
+    data['alerts'] = AlertStore()
+    data['dedup'] = DedupIndex()
+    data.pop('last_data', None)
+    if 'watch' in data:
+        # Watchpoints stay registered; their matches are re-seeded, without events, by the next setup
+        data['watch'].update([], data['geometry'])
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # Drop the warm-start snapshot written by the coordinator
+    await Store(hass, SNAPSHOT_STORE_VERSION, f"{SNAPSHOT_STORE_KEY}_{entry.entry_id}").async_remove()
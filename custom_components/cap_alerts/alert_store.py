@@ -0,0 +1,187 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Tuple
+from .summary import SEVERITIES, normalize_severity, parse_time, summarize_alerts, merge_summaries
+
+Entry = Tuple[dict, dict]  # (feed result, alert record)
+
+class AlertStore:
+    """Indexed view of the coordinator's latest results, rebuilt once per refresh.
+
+    Per-feed summaries and parsed timestamps are memoised and only recomputed for feeds whose
+    alert list changed (the coordinator hands back the same list object for unchanged feeds). Lookups by slug,
+    identifier, severity and event are dict reads; sent/expires ranges use bisect over sorted
+    timestamps.
+
+    With `unique` results (see dedup.DedupIndex), per-feed lookups and summaries still cover
+    everything each feed carries, while the identifier/severity/event/time indexes and the total
+    hold each mirrored alert once.
+    """
+
+    def __init__(self):
+        # feed url -> (alert list, summary, [(sent, expires) POSIX times per record])
+        self._feeds: Dict[str, Tuple[List[dict], Dict[str, Any], List[Tuple[float | None, float | None]]]] = {}
+        # the same, for the deduplicated alert lists
+        self._unique: Dict[str, Tuple[List[dict], Dict[str, Any], List[Tuple[float | None, float | None]]]] = {}
+        self._results: List[dict] = []
+        self._by_slug: Dict[str, List[dict]] = {}
+        self._slug_alerts: Dict[str, List[Entry]] = {}
+        self._all: List[Entry] = []
+        self._slug_summary: Dict[str, Dict[str, Any]] = {}
+        self._by_identifier: Dict[str, List[Entry]] = {}
+        self._by_severity: Dict[str, List[Entry]] = {}
+        self._by_event: Dict[str, List[Entry]] = {}
+        self._sent: Tuple[List[float], List[Entry]] = ([], [])
+        self._expires: Tuple[List[float], List[Entry]] = ([], [])
+        self._total: Dict[str, Any] = summarize_alerts([])
+
+    def update(self, results: List[dict], unique: List[dict] | None = None) -> None:
+        feeds = {}
+        unique_feeds = {}
+        by_slug: Dict[str, List[dict]] = {}
+        slug_alerts: Dict[str, List[Entry]] = {}
+        all_entries: List[Entry] = []
+        by_identifier: Dict[str, List[Entry]] = {}
+        by_severity: Dict[str, List[Entry]] = {}
+        by_event: Dict[str, List[Entry]] = {}
+        sent: List[Tuple[float, int, Entry]] = []
+        expires: List[Tuple[float, int, Entry]] = []
+        seq = 0
+        for r in results:
+            url = (r.get('feed') or {}).get('url') or r.get('slug')
+            alerts = r.get('alerts') if isinstance(r.get('alerts'), list) else []
+            feeds[url] = _memo(self._feeds, url, alerts)
+            slug = r.get('slug')
+            by_slug.setdefault(slug, []).append(r)
+            slug_alerts.setdefault(slug, []).extend((r, a) for a in alerts)
+        for r in (results if unique is None else unique):
+            url = (r.get('feed') or {}).get('url') or r.get('slug')
+            alerts = r.get('alerts') if isinstance(r.get('alerts'), list) else []
+            unique_feeds[url] = hit = feeds[url] if unique is None else _memo(self._unique, url, alerts)
+            for a, (t_sent, t_expires) in zip(alerts, hit[2]):
+                entry = (r, a)
+                all_entries.append(entry)
+                if a.get('identifier'):
+                    by_identifier.setdefault(a['identifier'], []).append(entry)
+                by_severity.setdefault(normalize_severity(a.get('severity')), []).append(entry)
+                if a.get('event'):
+                    by_event.setdefault(a['event'], []).append(entry)
+                # seq keeps sorting stable and avoids comparing dicts on equal timestamps
+                if t_sent is not None:
+                    sent.append((t_sent, seq, entry))
+                if t_expires is not None:
+                    expires.append((t_expires, seq, entry))
+                seq += 1
+        sent.sort(key=lambda x: (x[0], x[1]))
+        expires.sort(key=lambda x: (x[0], x[1]))
+        self._feeds = feeds
+        self._unique = unique_feeds if unique is not None else {}
+        self._results = results
+        self._by_slug = by_slug
+        self._slug_alerts = slug_alerts
+        self._all = all_entries
+        # Feeds sharing a slug (same host) report the first feed, as the per-feed sensors always have
+        self._slug_summary = {}
+        for slug, rs in by_slug.items():
+            url = (rs[0].get('feed') or {}).get('url') or slug
+            self._slug_summary[slug] = feeds[url][1]
+        self._by_identifier = by_identifier
+        self._by_severity = by_severity
+        self._by_event = by_event
+        self._sent = ([t for t, _, _ in sent], [e for _, _, e in sent])
+        self._expires = ([t for t, _, _ in expires], [e for _, _, e in expires])
+        self._total = merge_summaries(f[1] for f in unique_feeds.values())
+
+    @property
+    def results(self) -> List[dict]:
+        return self._results
+
+    @property
+    def total(self) -> Dict[str, Any]:
+        """Summary across all feeds."""
+        return self._total
+
+    def result_for_slug(self, slug: str) -> dict | None:
+        rs = self._by_slug.get(slug)
+        return rs[0] if rs else None
+
+    def summary_for_slug(self, slug: str) -> Dict[str, Any] | None:
+        return self._slug_summary.get(slug)
+
+    def by_identifier(self, identifier: str) -> List[Entry]:
+        return self._by_identifier.get(identifier, [])
+
+    def by_severity(self, severity: str) -> List[Entry]:
+        return self._by_severity.get(normalize_severity(severity), [])
+
+    def by_event(self, event: str) -> List[Entry]:
+        return self._by_event.get(event, [])
+
+    def sent_between(self, start: float | None = None, end: float | None = None) -> List[Entry]:
+        """Entries with `sent` in [start, end] (POSIX seconds), oldest first."""
+        return _range(self._sent, start, end)
+
+    def expiring_between(self, start: float | None = None, end: float | None = None) -> List[Entry]:
+        """Entries with `expires` in [start, end] (POSIX seconds), soonest first."""
+        return _range(self._expires, start, end)
+
+    def select(self, feed_slugs: Iterable[str] | None = None, severities: Iterable[str] | None = None,
+               identifier: str | None = None, event: str | None = None,
+               sent: Tuple[float | None, float | None] | None = None,
+               expires: Tuple[float | None, float | None] | None = None) -> List[Entry]:
+        """Entries matching every given filter.
+
+        Feed filters start from everything those feeds carry, mirrored alerts included; otherwise
+        the narrowest index (identifier, event, severity, then the sent/expires ranges) is used and
+        each alert appears once. `sent` and `expires` are (start, end) POSIX bounds, either end
+        open. Results are in feed order, except a severity-only query, which returns the most
+        severe first, and a range-only query, which is in time order.
+        """
+        slugs = set(feed_slugs or [])
+        sev = {normalize_severity(s) for s in (severities or [])}
+        if slugs:
+            entries = [e for s in self._slug_alerts if s in slugs for e in self._slug_alerts[s]]
+            if identifier:
+                entries = [e for e in entries if e[1].get('identifier') == identifier]
+        elif identifier:
+            entries = self.by_identifier(identifier)
+        elif event:
+            entries = self.by_event(event)
+        elif sev:
+            entries = [e for s in SEVERITIES if s in sev for e in self._by_severity.get(s, ())]
+            sev = set()
+        elif sent is not None:
+            entries = self.sent_between(*sent)
+            sent = None
+        elif expires is not None:
+            entries = self.expiring_between(*expires)
+            expires = None
+        else:
+            return list(self._all)
+        if event and (identifier or slugs):
+            entries = [e for e in entries if e[1].get('event') == event]
+        if sev:
+            entries = [e for e in entries if normalize_severity(e[1].get('severity')) in sev]
+        if sent is not None:
+            entries = [e for e in entries if _within(parse_time(e[1].get('sent')), *sent)]
+        if expires is not None:
+            entries = [e for e in entries if _within(parse_time(e[1].get('expires')), *expires)]
+        return entries
+
+    def __len__(self) -> int:
+        return self._total['count']
+
+def _memo(cache: Dict[str, Tuple[List[dict], Dict[str, Any], List[Tuple[float | None, float | None]]]], url: str, alerts: List[dict]):
+    hit = cache.get(url)
+    if hit is None or hit[0] is not alerts:
+        hit = (alerts, summarize_alerts(alerts), [(parse_time(a.get('sent')), parse_time(a.get('expires'))) for a in alerts])
+    return hit
+
+def _range(index: Tuple[List[float], List[Entry]], start: float | None, end: float | None) -> List[Entry]:
+    times, entries = index
+    lo = 0 if start is None else bisect_left(times, start)
+    hi = len(times) if end is None else bisect_right(times, end)
+    return entries[lo:hi]
+
+def _within(t: float | None, start: float | None, end: float | None) -> bool:
+    return t is not None and (start is None or t >= start) and (end is None or t <= end)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+from .geodesy import KM_PER_DEG, _np_haversine_km
+from .geometry import AreaGeometry, search_box
+
+try:
+    import numpy as np  # optional; pure-Python fallback below
+except Exception:  # pragma: no cover
+    np = None
+
+Point = Tuple[float, float, float]  # (lat, lon, radius_km)
+
+# Below this many watchpoints the per-area NumPy setup costs more than the pure-Python tests
+# save (see benchmarks/bench_batch_matches.py)
+NUMPY_MIN_POINTS = 64
+
+def match_matrix(points: Sequence[Point], geoms: Sequence[AreaGeometry], use_numpy: bool = True) -> List[List[bool]]:
+    """N×M match matrix: rows are watchpoints, columns are alert areas.
+
+    Same semantics as AreaGeometry.matches(). With NumPy and at least NUMPY_MIN_POINTS
+    watchpoints, each area is tested against every nearby watchpoint at once (vectorised over
+    all ring edges); otherwise each pair is tested in Python after a bounding-box rejection.
+    """
+    if use_numpy and np is not None and len(points) >= NUMPY_MIN_POINTS and geoms:
+        return _match_matrix_numpy(points, geoms)
+    rows = []
+    boxes = [search_box(lat, lon, rk) for lat, lon, rk in points]
+    for (lat, lon, rk), box in zip(points, boxes):
+        row = []
+        for g in geoms:
+            if g.min_lat > box[2] or g.max_lat < box[0] or g.min_lon > box[3] or g.max_lon < box[1]:
+                row.append(False)
+            else:
+                row.append(g.matches(lat, lon, rk))
+        rows.append(row)
+    return rows
+
+def _match_matrix_numpy(points: Sequence[Point], geoms: Sequence[AreaGeometry]) -> List[List[bool]]:
+    pts = np.asarray(points, dtype=float).reshape(-1, 3)
+    plat, plon, prad = pts[:, 0], pts[:, 1], pts[:, 2]
+    boxes = np.asarray([search_box(la, lo, rk) for la, lo, rk in points], dtype=float).reshape(-1, 4)
+    gb = np.asarray([(g.min_lat, g.min_lon, g.max_lat, g.max_lon) for g in geoms], dtype=float)
+    # (points × areas) bounding-box overlap in one pass; only overlapping pairs get the exact test
+    near = (
+        (boxes[:, 0, None] <= gb[None, :, 2]) & (boxes[:, 2, None] >= gb[None, :, 0])
+        & (boxes[:, 1, None] <= gb[None, :, 3]) & (boxes[:, 3, None] >= gb[None, :, 1])
+    )
+    out = np.zeros((len(pts), len(geoms)), dtype=bool)
+    for m in np.nonzero(near.any(axis=0))[0]:
+        g = geoms[m]
+        idx = np.nonzero(near[:, m])[0]
+        la, lo, rk = plat[idx], plon[idx], prad[idx]
+        hit = np.zeros(idx.size, dtype=bool)
+        if g.rings:
+            for ring in g.rings:
+                c = np.frombuffer(ring.coords, dtype=float)
+                if c.size < 6:
+                    continue
+                yi, xi = c[0::2], c[1::2]
+                yj, xj = np.roll(yi, 1), np.roll(xi, 1)
+                dx = xj - xi
+                dx = np.where(dx != 0, dx, 1e-12)
+                # (points × edges) crossing matrix; odd crossings = inside
+                straddle = (xi[None, :] > lo[:, None]) != (xj[None, :] > lo[:, None])
+                below = la[:, None] < (yj - yi)[None, :] * (lo[:, None] - xi[None, :]) / dx[None, :] + yi[None, :]
+                hit |= (np.count_nonzero(straddle & below, axis=1) % 2) == 1
+            kx = np.maximum(1e-6, np.cos(np.radians(la)))[:, None]
+            lim2 = (rk / KM_PER_DEG) ** 2
+            for ring in g.rings:
+                c = np.frombuffer(ring.coords, dtype=float)
+                if c.size < 2:
+                    continue
+                # (points × edges) distance to each edge in the point's local projection, as Ring.within_km
+                yi = c[0::2][None, :] - la[:, None]
+                xi = (c[1::2][None, :] - lo[:, None]) * kx
+                yj, xj = np.roll(yi, 1, axis=1), np.roll(xi, 1, axis=1)
+                dy, dx = yi - yj, xi - xj
+                l2 = dx * dx + dy * dy
+                t = np.clip(-(xj * dx + yj * dy) / np.where(l2 > 0.0, l2, 1.0), 0.0, 1.0)
+                py, px = yj + t * dy, xj + t * dx
+                hit |= (py * py + px * px).min(axis=1) <= lim2
+        else:
+            for clat, clon, cr_km in g.circles:
+                hit |= _np_haversine_km(la, lo, clat, clon) <= (cr_km + rk)
+        out[idx, m] = hit
+    return out.tolist()
+
+def match_lists(points: Sequence[Point], geoms: Sequence[AreaGeometry], use_numpy: bool = True) -> List[List[int]]:
+    """For each watchpoint, the column indices of the areas it matches."""
+    return [[m for m, hit in enumerate(row) if hit] for row in match_matrix(points, geoms, use_numpy)]
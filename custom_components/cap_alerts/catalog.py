@@ -0,0 +1,98 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from .const import DOMAIN, CATALOG_URL, CATALOG_STORE_VERSION, CATALOG_STORE_KEY, CATALOG_REFRESH_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Prebuilt by scripts/update_feed_catalog.py from data/feed_catalog.json
+BUNDLED_INDEX = os.path.join(os.path.dirname(__file__), "catalog_index.json")
+
+def index_from_catalog(catalog: Dict[str, Any]) -> Dict[str, Dict[str, List[dict]]]:
+    """feed_catalog.json -> {country: {region: [feed, ...]}}, countries and regions sorted."""
+    tree: Dict[str, Dict[str, List[dict]]] = {}
+    for f in catalog.get("feeds") or []:
+        if not f.get("url"):
+            continue
+        tree.setdefault(f.get("country") or "Unknown", {}).setdefault(f.get("region") or "General", []).append(f)
+    return {c: {r: tree[c][r] for r in sorted(tree[c])} for c in sorted(tree)}
+
+def _load_bundled() -> Dict[str, Any]:
+    with open(BUNDLED_INDEX, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+class CatalogIndex:
+    """Country → region → source lookups over the feed catalogue, kept in memory for the flow."""
+
+    def __init__(self, countries: Dict[str, Dict[str, List[dict]]], source: str):
+        self._countries = countries
+        self.source = source  # "bundled" or "remote"
+
+    def countries(self) -> List[str]:
+        return list(self._countries)
+
+    def regions(self, country: str) -> List[str]:
+        return list(self._countries.get(country, {}))
+
+    def sources(self, country: str, region: str) -> List[dict]:
+        return self._countries.get(country, {}).get(region, [])
+
+async def async_get_catalog(hass: HomeAssistant) -> CatalogIndex:
+    """Catalogue index, loaded on first use: the last downloaded copy if any, else the bundled one.
+
+    Also starts a background check for a newer catalogue (conditional GET, at most once per
+    CATALOG_REFRESH_INTERVAL), so the flow never waits on the network.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+    index: CatalogIndex | None = data.get("catalog")
+    store = Store(hass, CATALOG_STORE_VERSION, CATALOG_STORE_KEY)
+    cached = None
+    if index is None:
+        cached = await store.async_load()
+        if cached and cached.get("countries"):
+            index = CatalogIndex(cached["countries"], "remote")
+        else:
+            bundled = await hass.async_add_executor_job(_load_bundled)
+            index = CatalogIndex(bundled.get("countries") or {}, "bundled")
+        data["catalog"] = index
+        data["catalog_meta"] = {k: (cached or {}).get(k) for k in ("etag", "last_modified", "checked_at")}
+    meta = data["catalog_meta"]
+    if not data.get("catalog_refreshing") and time.time() - (meta.get("checked_at") or 0) >= CATALOG_REFRESH_INTERVAL:
+        data["catalog_refreshing"] = True
+        hass.async_create_background_task(_async_refresh(hass, store), f"{DOMAIN} catalog refresh")
+    return index
+
+async def _async_refresh(hass: HomeAssistant, store: Store) -> None:
+    data = hass.data[DOMAIN]
+    meta = data["catalog_meta"]
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        sess = async_get_clientsession(hass)
+        async with sess.get(CATALOG_URL, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            meta["checked_at"] = time.time()
+            if resp.status == 304:
+                # Unchanged; checked_at is kept in memory only, so a restart costs one more 304
+                return
+            resp.raise_for_status()
+            catalog = await resp.json(content_type=None)
+            meta["etag"] = resp.headers.get("ETag")
+            meta["last_modified"] = resp.headers.get("Last-Modified")
+        countries = index_from_catalog(catalog)
+        if countries:
+            data["catalog"] = CatalogIndex(countries, "remote")
+            await store.async_save({**meta, "countries": countries})
+    except Exception as exc:  # offline or bad payload: keep what we have
+        _LOGGER.debug("Feed catalogue refresh failed: %s", exc)
+    finally:
+        data["catalog_refreshing"] = False
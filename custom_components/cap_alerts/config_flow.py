@@ -1,11 +1,13 @@
 from __future__ import annotations
-import aiohttp
 import voluptuous as vol
 from typing import Any
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from .const import DOMAIN, CONF_FEEDS, CATALOG_URL
+from .catalog import async_get_catalog
+from .const import DOMAIN, CONF_FEEDS, CONF_SCAN_INTERVALS, MIN_SCAN_INTERVAL
+from .const import CONF_PARSE_EXECUTOR, PARSE_EXECUTOR_THREAD, PARSE_EXECUTOR_PROCESS, CONF_DIAGNOSTIC_SENSORS
+from .const import CONF_SIMPLIFY_TOLERANCE, MAX_SIMPLIFY_TOLERANCE
 from .util import compute_disclaimer_hash, async_save_acceptance
 from .util import build_acceptance_signature
 from .util import disclaimer_path
@@ -58,24 +60,16 @@ class CAPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return await self.async_step_manual()
 
     async def async_step_catalog(self, user_input: dict[str, Any] | None = None) -> FlowResult:
-        feeds: list[dict] = []
-        try:
-            async with aiohttp.ClientSession() as sess:
-                async with sess.get(CATALOG_URL, timeout=10) as resp:
-                    data = await resp.json(content_type=None)
-                    feeds = data.get("feeds", [])
-        except Exception:
-            feeds = []
-        countries = sorted({f.get("country","?") for f in feeds})
-        schema = vol.Schema({vol.Required("country"): vol.In(countries)})
+        # Bundled/cached index in memory; a newer catalogue is fetched in the background
+        self._catalog = await async_get_catalog(self.hass)
+        schema = vol.Schema({vol.Required("country"): vol.In(self._catalog.countries())})
         if user_input is None:
             return self.async_show_form(step_id="catalog", data_schema=schema)
-        self._feeds = feeds
         self._country = user_input["country"]
         return await self.async_step_catalog_region()
 
     async def async_step_catalog_region(self, user_input=None):
-        regions = sorted({f["region"] for f in self._feeds if f.get("country") == self._country})
+        regions = self._catalog.regions(self._country)
         schema = vol.Schema({vol.Required("region"): vol.In(regions)})
         if user_input is None:
             return self.async_show_form(step_id="catalog_region", data_schema=schema)
@@ -83,7 +77,7 @@ class CAPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return await self.async_step_catalog_source()
 
     async def async_step_catalog_source(self, user_input=None):
-        sources = [f for f in self._feeds if f.get("country") == self._country and f.get("region") == self._region]
+        sources = self._catalog.sources(self._country, self._region)
         names = [f"{f['name']} ({f['format']})" for f in sources]
         schema = vol.Schema({vol.Required("source"): vol.In(names)})
         if user_input is None:
@@ -124,7 +118,12 @@ class CAPOptionsFlow(config_entries.OptionsFlow):
                              vol.Optional("name"): str,
                              vol.Optional("url"): str,
                              vol.Optional("format", default="cap"): vol.In(["cap","atom","json"]),
-                             vol.Optional("reset_failures_for"): vol.In(slugs)})
+                             vol.Optional("reset_failures_for"): vol.In(slugs),
+                             vol.Optional("interval_for"): vol.In([f.get('url','') for f in feeds]),
+                             vol.Optional("scan_interval"): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                             vol.Optional(CONF_PARSE_EXECUTOR, default=self.entry.options.get(CONF_PARSE_EXECUTOR, PARSE_EXECUTOR_THREAD)): vol.In([PARSE_EXECUTOR_THREAD, PARSE_EXECUTOR_PROCESS]),
+                             vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=self.entry.options.get(CONF_DIAGNOSTIC_SENSORS, False)): bool,
+                             vol.Optional(CONF_SIMPLIFY_TOLERANCE, default=self.entry.options.get(CONF_SIMPLIFY_TOLERANCE, 0)): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_SIMPLIFY_TOLERANCE))})
         if user_input is None:
             return self.async_show_form(step_id="init", data_schema=schema)
         new_feed = {k:user_input[k] for k in ("name","url","format") if k in user_input and user_input[k]}
@@ -139,4 +138,18 @@ class CAPOptionsFlow(config_entries.OptionsFlow):
             self.hass.data.setdefault(DOMAIN, {})
             self.hass.data[DOMAIN].setdefault('failures', {})
             self.hass.data[DOMAIN]['failures'][reset_slug] = 0
-        return self.async_create_entry(title="Options updated", data={CONF_FEEDS: feeds})
+        # Per-feed polling override; 0 returns the feed to adaptive polling
+        intervals = dict(self.entry.options.get(CONF_SCAN_INTERVALS, {}))
+        interval_url = user_input.get("interval_for")
+        if interval_url and "scan_interval" in user_input:
+            if user_input["scan_interval"]:
+                intervals[interval_url] = max(MIN_SCAN_INTERVAL, user_input["scan_interval"])
+            else:
+                intervals.pop(interval_url, None)
+        return self.async_create_entry(title="Options updated", data={
+            CONF_FEEDS: feeds,
+            CONF_SCAN_INTERVALS: intervals,
+            CONF_PARSE_EXECUTOR: user_input.get(CONF_PARSE_EXECUTOR, PARSE_EXECUTOR_THREAD),
+            CONF_DIAGNOSTIC_SENSORS: bool(user_input.get(CONF_DIAGNOSTIC_SENSORS, False)),
+            CONF_SIMPLIFY_TOLERANCE: int(user_input.get(CONF_SIMPLIFY_TOLERANCE, 0)),
+        })
@@ -1,11 +1,46 @@
 DOMAIN = "cap_alerts"
 CONF_FEEDS = "feeds"  # list of {name, url, format}
+CONF_SCAN_INTERVALS = "scan_intervals"  # options: {feed url: seconds} per-feed polling override
 DEFAULT_SCAN_INTERVAL = 300  # seconds (5 minutes)
+MIN_SCAN_INTERVAL = 60  # floor for per-feed overrides
+MAX_SCAN_INTERVAL = 1800  # backoff ceiling for feeds that stay unchanged
+URGENT_SCAN_INTERVAL = 60  # while a feed has active Severe/Extreme alerts
+CONF_PARSE_EXECUTOR = "parse_executor"  # options: where feed parsing runs
+PARSE_EXECUTOR_THREAD = "thread"  # HA's shared thread pool (default)
+PARSE_EXECUTOR_PROCESS = "process"  # separate process pool; uses several cores for large feeds
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"  # options: add per-feed fetch/parse metric sensors
+CONF_SIMPLIFY_TOLERANCE = "simplify_tolerance_m"  # options: polygon simplification error in metres (0 = off)
+MAX_SIMPLIFY_TOLERANCE = 5000  # metres
+SCHEDULER_TICK = 30  # seconds between scheduler checks; only due feeds are fetched
+FETCH_TIMEOUT = 20  # seconds per feed request
+MAX_CONCURRENT_FETCHES = 8  # feeds fetched in parallel per refresh
+MAX_FETCHES_PER_HOST = 2  # e.g. many catalogue feeds share cap-sources.s3.amazonaws.com
 CATALOG_URL = "https://raw.githubusercontent.com/twcau/CAP-au-for-home-assistant/main/data/feed_catalog.json"
+CATALOG_STORE_VERSION = 1
+CATALOG_STORE_KEY = f"{DOMAIN}_catalog"  # last downloaded catalogue index with its ETag
+CATALOG_REFRESH_INTERVAL = 86400  # seconds between conditional GETs of CATALOG_URL
+# Warm-start snapshot of the last good results, validators and parsed geometry
+SNAPSHOT_STORE_VERSION = 1
+SNAPSHOT_STORE_KEY = f"{DOMAIN}_snapshot"
+SNAPSHOT_SAVE_DELAY = 60  # seconds; coalesces writes while feeds keep changing
+# Registered watchpoints (see watch.py)
+WATCH_STORE_VERSION = 1
+WATCH_STORE_KEY = f"{DOMAIN}_watchpoints"
+DEFAULT_WATCH_RADIUS_KM = 10.0
+WATCH_MIN_MOVE_KM = 0.05  # smaller position changes of a tracked watchpoint are not re-tested
+WATCH_HYSTERESIS_KM = 0.25  # a matched alert only unmatches once the watchpoint is this far beyond the radius
+WATCH_CELL_DEG = 0.05  # candidate areas are looked up once per cell of this size while a watchpoint moves
 ATTR_ALERTS = 'alerts'
 ATTR_FEATURES = 'features'
 EVENT_PIP_RESULT = f"{DOMAIN}.point_in_polygon_result"
 EVENT_MATCHES = f"{DOMAIN}.matches"
+EVENT_BATCH_MATCHES = f"{DOMAIN}.batch_matches"
+MAX_BATCH_MATCHES = 50  # matches listed per watchpoint by find_matches_batch (count is always full)
+EVENT_ALERT_ADDED = f"{DOMAIN}.alert_added"
+EVENT_ALERT_UPDATED = f"{DOMAIN}.alert_updated"
+EVENT_ALERT_REMOVED = f"{DOMAIN}.alert_removed"
+EVENT_WATCHPOINT_MATCH = f"{DOMAIN}.watchpoint_match"
+EVENT_WATCHPOINT_UNMATCH = f"{DOMAIN}.watchpoint_unmatch"
 
 # Disclaimer acceptance storage and enforcement
 ACCEPTANCE_STORE_VERSION = 1
@@ -15,6 +50,7 @@ ACCEPTANCE_PEPPER = "cap_alerts_pepper_v1_2026_01_27"
 ISSUE_DISCLAIMER_REQUIRED = "disclaimer_required"
 ISSUE_FEED_DISABLED_PREFIX = "feed_disabled_"
 MAX_FEED_FAILURES = 5
+FAILED_FEED_RETENTION = 21600  # seconds a failing or disabled feed keeps serving its last alerts
 ISSUE_FEED_NO_GEOMETRY_PREFIX = "feed_no_geometry_"
 ISSUE_FEED_NO_CONTENT_PREFIX = "feed_no_content_"
 EMPTY_ALERTS_THRESHOLD = 3
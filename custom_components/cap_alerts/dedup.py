@@ -0,0 +1,121 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+from .summary import parse_time
+
+# (identifier, sender, sent as POSIX seconds or the raw string, n-th area record of that alert)
+DedupKey = Tuple[str, str, object, int]
+
+def dedup_keys(alerts: List[dict]) -> List[DedupKey | None]:
+    """Per-record keys on identifier + sender + sent; None for records without an identifier.
+
+    `sent` is compared as a timestamp, so mirrors that re-serialise the offset ('Z' vs '+00:00')
+    still match. Multi-area alerts give one key per area record.
+    """
+    seen: Dict[Tuple[str, str, object], int] = {}
+    keys: List[DedupKey | None] = []
+    for a in alerts:
+        ident = (a.get('identifier') or '').strip()
+        if not ident:
+            keys.append(None)
+            continue
+        sent = a.get('sent') or ''
+        t = parse_time(sent)
+        base = (ident, (a.get('sender') or '').strip().lower(), t if t is not None else sent.strip())
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        keys.append((*base, n))
+    return keys
+
+class DedupIndex:
+    """Cross-feed index of alert records, so mirrored alerts are stored, matched and announced once.
+
+    The first feed (in configured order) carrying an alert owns it; `update()` returns the
+    results with every other feed's copies removed, and remembers which feeds carried each
+    alert. `intern()` swaps a freshly parsed record for the owner's identical record, so
+    mirrors share one dict in memory.
+
+    A feed whose fetch failed is handed in with its last alerts by AlertLifecycle (already
+    filtered for expiry and cancellation), so it keeps ownership and a transient error does
+    not hand its alerts to a mirror and back.
+    """
+
+    def __init__(self):
+        # key -> canonical record
+        self._records: Dict[DedupKey, dict] = {}
+        # key -> slugs of the feeds carrying it, owner first
+        self._carriers: Dict[DedupKey, List[str]] = {}
+        # id(canonical record) -> key
+        self._key_of: Dict[int, DedupKey] = {}
+        # feed url -> (alert list seen, keys, unique alert list handed out)
+        self._feeds: Dict[str, Tuple[List[dict], List[DedupKey | None], List[dict]]] = {}
+        self.duplicates = 0
+
+    def update(self, results: List[dict]) -> List[dict]:
+        """Results with duplicate records dropped from all but the owning feed.
+
+        A feed keeps the same unique list object while neither it nor any other feed changed
+        ownership, so downstream identity-based caches still skip it.
+        """
+        records: Dict[DedupKey, dict] = {}
+        carriers: Dict[DedupKey, List[str]] = {}
+        feeds = {}
+        unique_results = []
+        duplicates = 0
+        for r in results:
+            url = (r.get('feed') or {}).get('url') or r.get('slug')
+            alerts = r.get('alerts') if isinstance(r.get('alerts'), list) else []
+            prev = self._feeds.get(url)
+            keys = prev[1] if prev is not None and prev[0] is alerts else dedup_keys(alerts)
+            kept = []
+            for key, a in zip(keys, alerts):
+                if key is None:
+                    kept.append(a)
+                    continue
+                owners = carriers.get(key)
+                if owners is None:
+                    records[key] = a
+                    carriers[key] = [r.get('slug')]
+                    kept.append(a)
+                else:
+                    duplicates += 1
+                    if r.get('slug') not in owners:
+                        owners.append(r.get('slug'))
+            if len(kept) == len(alerts):
+                kept = alerts
+            elif prev is not None and len(prev[2]) == len(kept) and all(x is y for x, y in zip(prev[2], kept)):
+                kept = prev[2]
+            feeds[url] = (alerts, keys, kept)
+            unique_results.append(r if kept is r.get('alerts') else dict(r, alerts=kept))
+        self._records = records
+        self._carriers = carriers
+        self._key_of = {id(a): k for k, a in records.items()}
+        self._feeds = feeds
+        self.duplicates = duplicates
+        return unique_results
+
+    def intern(self, alerts: List[dict]) -> List[dict]:
+        """Replace records identical to an already indexed one with that record, in place."""
+        if not self._records:
+            return alerts
+        for i, (key, a) in enumerate(zip(dedup_keys(alerts), alerts)):
+            if key is None:
+                continue
+            canon = self._records.get(key)
+            if canon is not None and canon is not a and canon == a:
+                alerts[i] = canon
+        return alerts
+
+    def feeds_for(self, record: dict) -> List[str]:
+        """Slugs of every feed carrying this (canonical) record, owner first."""
+        key = self._key_of.get(id(record))
+        return self._carriers.get(key, []) if key is not None else []
+
+    def carried_by(self, record: dict, feed_slugs: Iterable[str], owner: str | None = None) -> bool:
+        wanted = set(feed_slugs)
+        return owner in wanted or not wanted.isdisjoint(self.feeds_for(record))
+
+    def stats(self) -> Dict[str, int]:
+        return {'unique': len(self._records), 'duplicates': self.duplicates, 'mirrored': sum(1 for c in self._carriers.values() if len(c) > 1)}
+
+    def __len__(self) -> int:
+        return len(self._records)
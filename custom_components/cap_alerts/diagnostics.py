@@ -0,0 +1,28 @@
+from __future__ import annotations
+from typing import Any, Dict
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import DOMAIN, CONF_FEEDS, CONF_SCAN_INTERVALS
+from .util import slug_from_url
+
+# Feed URLs may carry API keys or tokens in their path or query; feeds are identified by slug instead
+TO_REDACT = {'url'}
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Diagnostics download: per-feed fetch/parse metrics, refresh timings and schedule."""
+    data = hass.data.get(DOMAIN, {})
+    coordinator = data.get('coordinators', {}).get(entry.entry_id)
+    options = dict(entry.options)
+    if isinstance(options.get(CONF_SCAN_INTERVALS), dict):
+        # Per-feed overrides are keyed by URL
+        options[CONF_SCAN_INTERVALS] = {slug_from_url(url): secs for url, secs in options[CONF_SCAN_INTERVALS].items()}
+    return async_redact_data({
+        'entry': {
+            'feeds': entry.data.get(CONF_FEEDS, []),
+            'options': options,
+        },
+        'loop_block': data.get('loop_block'),
+        'empty_alerts': data.get('empty_alerts'),
+        'coordinator': coordinator.diagnostics_data() if coordinator is not None else None,
+    }, TO_REDACT)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+
+AlertKey = Tuple[str, str, int]  # (identifier or sent|headline, areaDesc, n-th duplicate)
+
+# Fields carried in change events; geometry strings are left out to keep events small
+EVENT_FIELDS = ('identifier', 'sent', 'headline', 'event', 'severity', 'urgency', 'areaDesc', 'link')
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+def fingerprint(alert: dict) -> Tuple:
+    """Hashable snapshot of a record's content; two records are unchanged if these compare equal."""
+    return tuple(sorted((k, _freeze(v)) for k, v in alert.items()))
+
+def diff_keys(alerts: List[dict]) -> List[AlertKey]:
+    """Stable per-record keys: (identifier, areaDesc, n) for the n-th record with that pair."""
+    seen: Dict[Tuple[str, str], int] = {}
+    keys = []
+    for a in alerts:
+        ident = a.get('identifier') or f"{a.get('sent','')}|{a.get('headline','')}"
+        pair = (ident, a.get('areaDesc') or '')
+        n = seen.get(pair, 0)
+        seen[pair] = n + 1
+        keys.append((pair[0], pair[1], n))
+    return keys
+
+def compact(result: dict, alert: dict) -> Dict[str, Any]:
+    out = {'slug': result.get('slug'), 'feed_url': (result.get('feed') or {}).get('url')}
+    for k in EVENT_FIELDS:
+        out[k] = alert.get(k, '')
+    return out
+
+class AlertDelta:
+    """Records added, updated and removed by one refresh (compact event payloads)."""
+    __slots__ = ('added', 'updated', 'removed')
+
+    def __init__(self):
+        self.added: List[dict] = []
+        self.updated: List[dict] = []
+        self.removed: List[dict] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def counts(self) -> Dict[str, int]:
+        return {'added': len(self.added), 'updated': len(self.updated), 'removed': len(self.removed)}
+
+class AlertTracker:
+    """Keyed alert state across refreshes, used to compute per-refresh deltas.
+
+    Feeds are keyed by URL. A feed whose alert list is the same object as last time (not due,
+    304 or unchanged body) is skipped without looking at its records, so the work per refresh
+    follows the feeds that changed. A feed that failed arrives with the alerts AlertLifecycle
+    kept for it, so a network error is not reported as every alert being removed, while its
+    alerts still expire.
+    """
+
+    def __init__(self):
+        # feed url -> (alert list last seen, {key: (fingerprint, result, record)})
+        self._feeds: Dict[str, Tuple[List[dict], Dict[AlertKey, Tuple[Tuple, dict, dict]]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(state) for _, state in self._feeds.values())
+
+    def update(self, results: List[dict]) -> AlertDelta:
+        delta = AlertDelta()
+        live = set()
+        for r in results:
+            url = (r.get('feed') or {}).get('url') or r.get('slug')
+            live.add(url)
+            alerts = r.get('alerts')
+            if not isinstance(alerts, list):
+                continue
+            prev = self._feeds.get(url)
+            if prev is not None and prev[0] is alerts:
+                continue
+            old = prev[1] if prev is not None else {}
+            state = {}
+            for key, a in zip(diff_keys(alerts), alerts):
+                fp = fingerprint(a)
+                hit = old.get(key)
+                if hit is None:
+                    delta.added.append(compact(r, a))
+                elif hit[0] != fp:
+                    item = compact(r, a)
+                    item['changed'] = sorted(k for k in set(a) | set(hit[2]) if a.get(k) != hit[2].get(k))
+                    delta.updated.append(item)
+                state[key] = (fp, r, a)
+            for key in old.keys() - state.keys():
+                _, pr, pa = old[key]
+                delta.removed.append(compact(pr, pa))
+            self._feeds[url] = (alerts, state)
+        # Feeds no longer configured: everything they held is gone
+        for url in [u for u in self._feeds if u not in live]:
+            for _, pr, pa in self._feeds.pop(url)[1].values():
+                delta.removed.append(compact(pr, pa))
+        return delta
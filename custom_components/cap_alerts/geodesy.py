@@ -0,0 +1,88 @@
+from __future__ import annotations
+import math
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np  # optional; pure-Python fallback below
+except Exception:  # pragma: no cover
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088  # mean radius (IUGG)
+KM_PER_DEG = EARTH_RADIUS_KM * math.pi / 180.0
+_RAD = math.pi / 180.0
+
+# Below this many distances the NumPy call overhead outweighs the vectorised maths
+NUMPY_MIN_BATCH = 32
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance on the mean-radius sphere; exact at any latitude and span."""
+    p1 = lat1 * _RAD
+    p2 = lat2 * _RAD
+    s_lat = math.sin((p2 - p1) * 0.5)
+    s_lon = math.sin((lon2 - lon1) * _RAD * 0.5)
+    a = s_lat * s_lat + math.cos(p1) * math.cos(p2) * s_lon * s_lon
+    return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+def bearing_deg(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Initial great-circle bearing from point 1 to point 2, degrees clockwise from north [0, 360)."""
+    p1 = lat1 * _RAD
+    p2 = lat2 * _RAD
+    dl = (lon2 - lon1) * _RAD
+    y = math.sin(dl) * math.cos(p2)
+    x = math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dl)
+    return math.degrees(math.atan2(y, x)) % 360.0
+
+def search_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Smallest lat/lon box (min_lat, min_lon, max_lat, max_lon) holding every point within
+    `radius_km` of (lat, lon); spans all longitudes when the circle reaches a pole."""
+    ang = radius_km / EARTH_RADIUS_KM
+    dlat = ang / _RAD * 1.000001 + 1e-9
+    lo_lat, hi_lat = lat - dlat, lat + dlat
+    if lo_lat <= -90.0 or hi_lat >= 90.0 or ang >= math.pi / 2.0:
+        return (max(-90.0, lo_lat), -360.0, min(90.0, hi_lat), 360.0)
+    # Widest longitude reach of a spherical cap is asin(sin(ang) / cos(lat))
+    dlon = math.asin(min(1.0, math.sin(ang) / math.cos(lat * _RAD))) / _RAD * 1.000001 + 1e-9
+    return (lo_lat, lon - dlon, hi_lat, lon + dlon)
+
+def within_km(lat1: float, lon1: float, lat2: float, lon2: float, radius_km: float) -> bool:
+    """haversine_km(...) <= radius_km, rejecting on the latitude gap alone where it can."""
+    if abs(lat2 - lat1) * KM_PER_DEG > radius_km * 1.000001 + 1e-9:
+        return False
+    return haversine_km(lat1, lon1, lat2, lon2) <= radius_km
+
+def farthest_km(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> float:
+    """Largest haversine_km() from (lat, lon) to the given points (0.0 if there are none).
+
+    Distance grows with the haversine term, so the terms are compared and only the largest
+    goes through asin/sqrt.
+    """
+    if not lats:
+        return 0.0
+    if np is not None and len(lats) >= NUMPY_MIN_BATCH:
+        return float(_np_haversine_km(lat, lon, np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)).max())
+    p1 = lat * _RAD
+    c1 = math.cos(p1)
+    h = 0.0
+    for la, lo in zip(lats, lons):
+        p2 = la * _RAD
+        s_lat = math.sin((p2 - p1) * 0.5)
+        s_lon = math.sin((lo - lon) * _RAD * 0.5)
+        a = s_lat * s_lat + c1 * math.cos(p2) * s_lon * s_lon
+        if a > h:
+            h = a
+    return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+
+def distances_km(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> List[float]:
+    """haversine_km() from one point to many; vectorised with NumPy when available."""
+    if np is not None and len(lats) >= NUMPY_MIN_BATCH:
+        return _np_haversine_km(lat, lon, np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)).tolist()
+    return [haversine_km(lat, lon, la, lo) for la, lo in zip(lats, lons)]
+
+def _np_haversine_km(lat1, lon1, lat2, lon2):
+    # Broadcasting haversine_km(); arguments may be scalars or arrays
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    s_lat = np.sin((p2 - p1) * 0.5)
+    s_lon = np.sin(np.radians(np.subtract(lon2, lon1)) * 0.5)
+    a = s_lat * s_lat + np.cos(p1) * np.cos(p2) * s_lon * s_lon
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(1.0, a)))
@@ -0,0 +1,629 @@
+from __future__ import annotations
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from .geodesy import KM_PER_DEG, bearing_deg, farthest_km, haversine_km, search_box, within_km
+from .spatial import GridIndex
+
+# Great-circle distance (km); exact at all latitudes, see geodesy.py
+distance_km = haversine_km
+
+# Edges per bounding box in the proximity scans (Ring.within_km / Ring.nearest)
+_EDGE_BLOCK = 32
+
+def parse_polygon(poly: str):
+    pts = []
+    for pair in (poly or '').split():
+        if ',' in pair:
+            try:
+                lat, lon = pair.split(',',1)
+                pts.append((float(lat), float(lon)))
+            except Exception:
+                pass
+    return pts
+
+def parse_circle(circle: str):
+    try:
+        parts = (circle or '').replace(',', ' ').split()
+        if len(parts) >= 3:
+            lat = float(parts[0])
+            lon = float(parts[1])
+            radius_km = float(parts[2])
+            return lat, lon, radius_km
+    except Exception:
+        pass
+    return None
+
+def _segment_dist2(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    """Squared distance from (px, py) to segment a-b (planar)."""
+    dx = bx - ax
+    dy = by - ay
+    l2 = dx * dx + dy * dy
+    t = ((px - ax) * dx + (py - ay) * dy) / l2 if l2 > 0.0 else 0.0
+    t = 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
+    ex = ax + t * dx - px
+    ey = ay + t * dy - py
+    return ex * ex + ey * ey
+
+def simplify_coords(coords: array, tolerance: float, kx: float) -> array:
+    """Douglas–Peucker over a flat [lat, lon, ...] ring, iterative.
+
+    Distances are measured with longitude scaled by `kx` (cos of the ring's latitude), so
+    `tolerance` is in degrees of latitude. Every dropped vertex, and so every original edge,
+    stays within `tolerance` of the simplified ring.
+    """
+    n = len(coords) // 2
+    if n <= 4:
+        return coords
+    keep = bytearray(n)
+    keep[0] = keep[n - 1] = 1
+    # Split the ring at the vertex furthest from the first, so a closed ring is two open chains
+    y0, x0 = coords[0], coords[1] * kx
+    split = max(range(1, n - 1), key=lambda i: (coords[2 * i] - y0) ** 2 + (coords[2 * i + 1] * kx - x0) ** 2)
+    keep[split] = 1
+    tol2 = tolerance * tolerance
+    stack = [(0, split), (split, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        ay, ax = coords[2 * a], coords[2 * a + 1] * kx
+        by, bx = coords[2 * b], coords[2 * b + 1] * kx
+        worst, idx = -1.0, -1
+        for i in range(a + 1, b):
+            d = _segment_dist2(coords[2 * i + 1] * kx, coords[2 * i], ax, ay, bx, by)
+            if d > worst:
+                worst, idx = d, i
+        if worst > tol2:
+            keep[idx] = 1
+            stack.append((a, idx))
+            stack.append((idx, b))
+    out = array('d')
+    for i in range(n):
+        if keep[i]:
+            out.append(coords[2 * i])
+            out.append(coords[2 * i + 1])
+    return out
+
+class Ring:
+    """One polygon ring packed as a flat float array [lat0, lon0, lat1, lon1, ...].
+
+    Bounding box and vertex-average centroid are computed once when the ring is built; the
+    radius (km, centroid to furthest vertex) only when first read, as matching never needs it.
+
+    After simplify(), containment is tested against the reduced ring (`fast`) and the exact
+    ring is only walked when the point lies within the error band of the reduced boundary;
+    elsewhere both rings give the same answer. `checks`/`fallbacks` count those tests.
+    """
+    __slots__ = ('coords', 'min_lat', 'min_lon', 'max_lat', 'max_lon', 'clat', 'clon', '_radius_km',
+                 'fast', 'kx', 'band', 'checks', 'fallbacks', 'blocks')
+
+    def __init__(self, coords: array):
+        self.coords = coords
+        lats = coords[0::2]
+        lons = coords[1::2]
+        n = len(lats)
+        self.min_lat, self.max_lat = min(lats), max(lats)
+        self.min_lon, self.max_lon = min(lons), max(lons)
+        self.clat = sum(lats) / n
+        self.clon = sum(lons) / n
+        self._radius_km = None
+        self.fast = None
+        self.kx = 1.0
+        self.band = 0.0
+        self.checks = 0
+        self.fallbacks = 0
+        self.blocks = None
+
+    def __len__(self) -> int:
+        return len(self.coords) // 2
+
+    @property
+    def radius_km(self) -> float:
+        if self._radius_km is None:
+            self._radius_km = farthest_km(self.clat, self.clon, self.coords[0::2], self.coords[1::2])
+        return self._radius_km
+
+    @property
+    def fast_len(self) -> int:
+        return len(self.fast) // 2 if self.fast is not None else len(self)
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+        # States without the simplification fields (older pickles/snapshots): exact ring only
+        if len(state) < 13:
+            self.fast, self.kx, self.band, self.checks, self.fallbacks = None, 1.0, 0.0, 0, 0
+        if len(state) < len(self.__slots__):
+            self.blocks = None
+
+    def simplify(self, tolerance_m: float) -> None:
+        """Keep a Douglas–Peucker reduction within `tolerance_m` metres for matching.
+
+        Not kept when it would save less than a fifth of the vertices.
+        """
+        if tolerance_m <= 0 or len(self) <= 4:
+            return
+        # Longitude scale at the ring's most poleward latitude, so the band is never narrower than intended
+        kx = math.cos(math.radians(min(89.0, max(abs(self.min_lat), abs(self.max_lat)))))
+        tolerance = tolerance_m / 1000.0 / KM_PER_DEG
+        fast = simplify_coords(self.coords, tolerance, kx)
+        if len(fast) // 2 >= 3 and len(fast) * 5 <= len(self.coords) * 4:
+            self.fast = fast
+            self.kx = kx
+            # Slightly wider than the tolerance so rounding cannot misplace a point at the edge
+            self.band = tolerance * 1.000001 + 1e-12
+
+    def edge_blocks(self) -> array:
+        """Per-block edge bounding boxes for the proximity scans, built on first use."""
+        if self.blocks is None:
+            self.blocks = _edge_blocks(self.coords)
+        return self.blocks
+
+    def within_km(self, plat: float, plon: float, radius_km: float, kx: float | None = None) -> bool:
+        """True if the ring's boundary comes within `radius_km` of the point.
+
+        Distances are measured in a local projection around the point (longitude scaled by
+        `kx`, cos of its latitude). Rings whose box is further away are rejected outright, then
+        edges are scanned block by block (see _nearest_edge) and the scan stops at the first
+        edge within reach.
+        """
+        lim = radius_km / KM_PER_DEG
+        if plat < self.min_lat - lim or plat > self.max_lat + lim:
+            return False
+        if kx is None:
+            kx = _local_kx(plat)
+        if (self.min_lon - plon) * kx > lim or (plon - self.max_lon) * kx > lim:
+            return False
+        return _nearest_edge(self.coords, self.edge_blocks(), plat, plon, kx, lim, True) is not None
+
+    def nearest(self, plat: float, plon: float, kx: float | None = None) -> Tuple[float, float, float]:
+        """(distance_km, lat, lon) of the boundary point nearest to the point."""
+        if kx is None:
+            kx = _local_kx(plat)
+        dy, dx = _nearest_edge(self.coords, self.edge_blocks(), plat, plon, kx, float('inf'), False)
+        nlat, nlon = plat + dy, plon + dx / kx
+        return haversine_km(plat, plon, nlat, nlon), nlat, nlon
+
+    def contains(self, plat: float, plon: float) -> bool:
+        """Ray-casting point-in-polygon test with a bounding-box early exit."""
+        if plat < self.min_lat or plat > self.max_lat or plon < self.min_lon or plon > self.max_lon:
+            return False
+        if self.fast is None:
+            return _crossings(self.coords, plat, plon)
+        self.checks += 1
+        inside = _crossings_outside_band(self.fast, plat, plon, self.kx, self.band)
+        if inside is None:
+            self.fallbacks += 1
+            return _crossings(self.coords, plat, plon)
+        return inside
+
+def _local_kx(lat: float) -> float:
+    return max(1e-6, math.cos(math.radians(lat)))
+
+def _edge_blocks(c: array) -> array:
+    """Bounding boxes [min_lat, min_lon, max_lat, max_lon, ...] of consecutive runs of
+    _EDGE_BLOCK edges; edge i joins vertex i-1 to vertex i (vertex n-1 for i = 0)."""
+    n = len(c) // 2
+    lats = c[0::2]
+    lons = c[1::2]
+    out = array('d')
+    for s in range(0, n, _EDGE_BLOCK):
+        e = min(n, s + _EDGE_BLOCK)
+        p = s - 1 if s else n - 1
+        la = lats[s:e]
+        lo = lons[s:e]
+        out.extend((min(min(la), lats[p]), min(min(lo), lons[p]), max(max(la), lats[p]), max(max(lo), lons[p])))
+    return out
+
+def _nearest_edge(c: array, blocks: array, plat: float, plon: float, kx: float, lim: float, first: bool) -> Tuple[float, float] | None:
+    """Offset (dlat, dlon * kx) from the point to the nearest boundary point within `lim`
+    (degrees of latitude, local projection), or None. With `first`, any point within `lim`
+    is returned as soon as one is found.
+
+    Edge blocks are visited nearest box first and the scan stops once no remaining box can
+    hold a nearer edge; inside a block, edges with both ends beyond the current best on one
+    side are skipped.
+    """
+    n = len(c) // 2
+    best2 = lim * lim
+    order = []
+    for k in range(0, len(blocks), 4):
+        dy = max(blocks[k] - plat, plat - blocks[k + 2], 0.0)
+        dx = max(blocks[k + 1] - plon, plon - blocks[k + 3], 0.0) * kx
+        lb = dy * dy + dx * dx
+        if lb <= best2:
+            order.append((lb, k // 4 * _EDGE_BLOCK))
+    order.sort()
+    b = lim
+    found = None
+    for lb, start in order:
+        if lb > best2:
+            break
+        j = 2 * (start - 1 if start else n - 1)
+        yj = c[j] - plat
+        xj = (c[j + 1] - plon) * kx
+        for i in range(2 * start, 2 * min(n, start + _EDGE_BLOCK), 2):
+            yi = c[i] - plat
+            xi = (c[i + 1] - plon) * kx
+            # Both ends beyond the current best on one side: this edge cannot be nearer
+            if not ((yi > b and yj > b) or (yi < -b and yj < -b) or (xi > b and xj > b) or (xi < -b and xj < -b)):
+                dy = yi - yj
+                dx = xi - xj
+                l2 = dx * dx + dy * dy
+                t = -(xj * dx + yj * dy) / l2 if l2 > 0.0 else 0.0
+                t = 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
+                py = yj + t * dy
+                px = xj + t * dx
+                d2 = px * px + py * py
+                if d2 <= best2:
+                    found = (py, px)
+                    if first:
+                        return found
+                    best2 = d2
+                    b = d2 ** 0.5
+            yj = yi
+            xj = xi
+    return found
+
+def _crossings(c: array, plat: float, plon: float) -> bool:
+    n = len(c) // 2
+    if n < 3:
+        return False
+    inside = False
+    yj = c[2 * n - 2]
+    xj = c[2 * n - 1]
+    for i in range(0, 2 * n, 2):
+        yi = c[i]
+        xi = c[i + 1]
+        if (xi > plon) != (xj > plon):
+            dx = xj - xi
+            if plat < (yj - yi) * (plon - xi) / (dx if dx != 0 else 1e-12) + yi:
+                inside = not inside
+        yj = yi
+        xj = xi
+    return inside
+
+def _crossings_outside_band(c: array, plat: float, plon: float, kx: float, band: float) -> bool | None:
+    """_crossings() on a simplified ring, or None when the point is within `band` of its boundary."""
+    n = len(c) // 2
+    b2 = band * band
+    px = plon * kx
+    inside = False
+    yj = c[2 * n - 2]
+    xj = c[2 * n - 1]
+    for i in range(0, 2 * n, 2):
+        yi = c[i]
+        xi = c[i + 1]
+        # Cheap reject first: both ends on one side of the point, further than the band
+        if not ((yi - plat > band and yj - plat > band) or (plat - yi > band and plat - yj > band)):
+            if _segment_dist2(px, plat, xi * kx, yi, xj * kx, yj) <= b2:
+                return None
+        if (xi > plon) != (xj > plon):
+            dx = xj - xi
+            if plat < (yj - yi) * (plon - xi) / (dx if dx != 0 else 1e-12) + yi:
+                inside = not inside
+        yj = yi
+        xj = xi
+    return inside
+
+def _parse_coords(poly: str) -> array:
+    coords = array('d')
+    for pair in (poly or '').split():
+        if ',' in pair:
+            try:
+                lat, lon = pair.split(',', 1)
+                la = float(lat)
+                lo = float(lon)
+            except ValueError:
+                continue
+            coords.append(la)
+            coords.append(lo)
+    return coords
+
+def parse_ring(poly: str) -> Ring | None:
+    coords = _parse_coords(poly)
+    return Ring(coords) if coords else None
+
+def point_in_polygon(polygon: str, plat: float, plon: float) -> bool:
+    # One-off string test: no Ring (bbox, centroid) is built for a polygon tested once
+    coords = _parse_coords(polygon)
+    return bool(coords) and _crossings(coords, plat, plon)
+
+def centroid_and_radius(polygon: str):
+    ring = parse_ring(polygon)
+    if ring is None:
+        return (0.0, 0.0, 1000.0)
+    return (ring.clat, ring.clon, ring.radius_km*1000.0)
+
+class AreaGeometry:
+    """Geometry of one CAP <area>: any number of polygon rings and circles (lat, lon, radius_km)."""
+    __slots__ = ('rings', 'circles', 'min_lat', 'min_lon', 'max_lat', 'max_lon', 'clat', 'clon', '_radius_m')
+
+    def __init__(self, rings: Tuple[Ring, ...], circles: Tuple[Tuple[float, float, float], ...]):
+        self.rings = rings
+        self.circles = circles
+        boxes = [(r.min_lat, r.min_lon, r.max_lat, r.max_lon) for r in rings]
+        boxes.extend(search_box(la, lo, rk) for la, lo, rk in circles)
+        if boxes:
+            self.min_lat = min(b[0] for b in boxes)
+            self.min_lon = min(b[1] for b in boxes)
+            self.max_lat = max(b[2] for b in boxes)
+            self.max_lon = max(b[3] for b in boxes)
+        else:
+            self.min_lat = self.min_lon = self.max_lat = self.max_lon = 0.0
+        if rings:
+            # Zone-style summary of the first polygon, matching centroid_and_radius(); radius on first read
+            self.clat, self.clon, self._radius_m = rings[0].clat, rings[0].clon, None
+        elif circles:
+            self.clat, self.clon, self._radius_m = circles[0][0], circles[0][1], circles[0][2] * 1000.0
+        else:
+            self.clat, self.clon, self._radius_m = 0.0, 0.0, 1000.0
+
+    @property
+    def radius_m(self) -> float:
+        if self._radius_m is None:
+            self._radius_m = self.rings[0].radius_km * 1000.0
+        return self._radius_m
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+
+    @property
+    def vertex_count(self) -> int:
+        return sum(len(r) for r in self.rings)
+
+    @property
+    def fast_vertex_count(self) -> int:
+        return sum(r.fast_len for r in self.rings)
+
+    def matches(self, lat: float, lon: float, radius_km: float) -> bool:
+        """find_matches semantics: inside any polygon or within radius of its boundary; circles
+        only count when the area has no polygon."""
+        if self.rings:
+            for r in self.rings:
+                if r.contains(lat, lon):
+                    return True
+            lim = radius_km / KM_PER_DEG
+            if lat < self.min_lat - lim or lat > self.max_lat + lim:
+                return False
+            kx = _local_kx(lat)
+            for r in self.rings:
+                if r.within_km(lat, lon, radius_km, kx):
+                    return True
+            return False
+        for clat, clon, cr_km in self.circles:
+            if within_km(lat, lon, clat, clon, cr_km + radius_km):
+                return True
+        return False
+
+    def proximity(self, lat: float, lon: float) -> Tuple[bool, float, float | None]:
+        """(inside, distance_km, bearing): 0 km and no bearing inside the area; otherwise the
+        distance to the nearest polygon edge (circle edge when there is no polygon) and the
+        bearing from the point towards it."""
+        if self.rings:
+            if any(r.contains(lat, lon) for r in self.rings):
+                return True, 0.0, None
+            kx = _local_kx(lat)
+            dist, nlat, nlon = min(r.nearest(lat, lon, kx) for r in self.rings)
+            return False, dist, bearing_deg(lat, lon, nlat, nlon)
+        best = None
+        for clat, clon, cr_km in self.circles:
+            d = haversine_km(lat, lon, clat, clon) - cr_km
+            if best is None or d < best[0]:
+                best = (d, clat, clon)
+        if best is None:
+            return False, float('inf'), None
+        if best[0] <= 0.0:
+            return True, 0.0, None
+        return False, best[0], bearing_deg(lat, lon, best[1], best[2])
+
+def _record_geometry(record: dict) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    polys = record.get('polygons') or ([record['polygon']] if record.get('polygon') else [])
+    circs = record.get('circles') or ([record['circle']] if record.get('circle') else [])
+    return tuple(polys), tuple(circs)
+
+def build_area(polygons: Iterable[str], circles: Iterable[str], tolerance_m: float = 0.0) -> AreaGeometry | None:
+    rings = tuple(r for r in (parse_ring(p) for p in polygons) if r is not None)
+    circs = tuple(c for c in (parse_circle(c) for c in circles) if c is not None)
+    if not rings and not circs:
+        return None
+    for r in rings:
+        r.simplify(tolerance_m)
+    return AreaGeometry(rings, circs)
+
+def build_areas(pending: List[Tuple[Any, Tuple[str, ...], Tuple[str, ...]]], tolerance_m: float = 0.0) -> Dict[Any, AreaGeometry | None]:
+    """Build geometry for (key, polygons, circles) items; runs in the worker pool.
+
+    With `tolerance_m` > 0 rings also get a simplified copy for matching (Ring.simplify()).
+    """
+    return {key: build_area(polys, circs, tolerance_m) for key, polys, circs in pending}
+
+def alert_keys(alerts: List[dict]) -> List[Tuple[str, int]]:
+    """Stable cache keys: (identifier, n) for the n-th area record of that identifier."""
+    seen: Dict[str, int] = {}
+    keys = []
+    for a in alerts:
+        ident = a.get('identifier') or f"{a.get('sent','')}|{a.get('headline','')}"
+        n = seen.get(ident, 0)
+        seen[ident] = n + 1
+        keys.append((ident, n))
+    return keys
+
+def feed_url(result: dict) -> str:
+    """Key a feed result by URL (several feeds may share a host slug)."""
+    return (result.get('feed') or {}).get('url') or result.get('slug')
+
+class GeometryStore:
+    """Parsed geometry for all active alerts, shared by services and find_matches.
+
+    Geometry is cached by feed URL and alert key (identifier and area position) across
+    refreshes; an area is only re-parsed when its polygon/circle strings change. Keys are per
+    feed because unrelated feeds can reuse an identifier for different areas. A grid index over area bounding boxes is updated
+    incrementally, so point/radius queries only test nearby areas.
+
+    `tolerance_m` is the simplification error passed to build_areas(); changing it drops the
+    cache so every area is rebuilt once.
+    """
+
+    def __init__(self):
+        self.tolerance_m = 0.0
+        # (feed url, key) -> (source strings, geometry)
+        self._cache: Dict[Tuple[str, Tuple[str, int]], Tuple[Tuple[Tuple[str, ...], Tuple[str, ...]], AreaGeometry | None]] = {}
+        # feed url -> (feed result, [(record, geometry)])
+        self._feeds: Dict[str, Tuple[dict, List[Tuple[dict, AreaGeometry | None]]]] = {}
+        # feed url -> {key: geometry} as last indexed
+        self._feed_geoms: Dict[str, Dict[Tuple[str, int], AreaGeometry]] = {}
+        self._feed_keys: Dict[str, set] = {}
+        self._feed_order: Dict[str, int] = {}
+        # (url, key) -> (feed result, record, geometry, sort order)
+        self._entries: Dict[Tuple[str, Tuple[str, int]], Tuple[dict, dict, AreaGeometry, Tuple[int, int]]] = {}
+        self._index = GridIndex()
+
+    def set_tolerance(self, tolerance_m: float) -> None:
+        if tolerance_m != self.tolerance_m:
+            self.tolerance_m = tolerance_m
+            self._cache.clear()
+
+    def pending(self, results: List[dict]) -> List[Tuple[Tuple[str, Tuple[str, int]], Tuple[str, ...], Tuple[str, ...]]]:
+        """Areas whose geometry is not cached yet (or whose source strings changed), keyed by
+        (feed url, alert key)."""
+        out = []
+        queued = set()
+        for r in results:
+            url = feed_url(r)
+            alerts = r.get('alerts') or []
+            for key, a in zip(alert_keys(alerts), alerts):
+                key = (url, key)
+                src = _record_geometry(a)
+                hit = self._cache.get(key)
+                if (hit is not None and hit[0] == src) or key in queued:
+                    continue
+                queued.add(key)
+                out.append((key, src[0], src[1]))
+        return out
+
+    def update(self, results: List[dict], built: Dict[Tuple[str, Tuple[str, int]], AreaGeometry | None]) -> None:
+        """Install freshly built geometry and re-link the given feeds' records; feeds missing from
+        `results` and unused keys are dropped.
+
+        Only areas that appeared, disappeared or changed geometry touch the spatial index.
+        """
+        for r in results:
+            url = feed_url(r)
+            order = self._feed_order.setdefault(url, len(self._feed_order))
+            alerts = r.get('alerts') or []
+            keys = alert_keys(alerts)
+            entries = []
+            geoms: Dict[Tuple[str, int], AreaGeometry] = {}
+            for pos, (key, a) in enumerate(zip(keys, alerts)):
+                src = _record_geometry(a)
+                ref = (url, key)
+                if ref in built:
+                    self._cache[ref] = (src, built[ref])
+                hit = self._cache.get(ref)
+                geom = hit[1] if hit is not None and hit[0] == src else None
+                entries.append((a, geom))
+                if geom is not None:
+                    geoms[key] = geom
+                    self._entries[ref] = (r, a, geom, (order, pos))
+            old = self._feed_geoms.get(url, {})
+            for key in old.keys() - geoms.keys():
+                self._index.remove((url, key))
+                self._entries.pop((url, key), None)
+            for key, geom in geoms.items():
+                if old.get(key) is not geom:
+                    self._index.insert((url, key), (geom.min_lat, geom.min_lon, geom.max_lat, geom.max_lon))
+            self._feeds[url] = (r, entries)
+            self._feed_geoms[url] = geoms
+            self._feed_keys[url] = {(url, key) for key in keys}
+        # Feeds no longer in the results (removed from the options, or their entry unloaded)
+        current = {feed_url(r) for r in results}
+        for url in [u for u in self._feeds if u not in current]:
+            for key in self._feed_geoms.pop(url, {}):
+                self._index.remove((url, key))
+                self._entries.pop((url, key), None)
+            del self._feeds[url]
+            self._feed_keys.pop(url, None)
+        live = set().union(*self._feed_keys.values()) if self._feed_keys else set()
+        for key in [k for k in self._cache if k not in live]:
+            del self._cache[key]
+
+    def iter_entries(self, feed_slugs: Iterable[str] | None = None) -> Iterator[Tuple[dict, dict, AreaGeometry]]:
+        """Yield (feed result, alert record, geometry) for every alert that has geometry."""
+        wanted = set(feed_slugs or [])
+        for result, entries in self._feeds.values():
+            if wanted and result.get('slug') not in wanted:
+                continue
+            for record, geom in entries:
+                if geom is not None:
+                    yield result, record, geom
+
+    def query(self, lat: float, lon: float, radius_km: float = 0.0, feed_slugs: Iterable[str] | None = None) -> List[Tuple[dict, dict, AreaGeometry]]:
+        """Candidate (feed result, record, geometry) whose bounding box is within `radius_km`
+        of the point, in feed/alert order. Callers still run the exact test on each."""
+        return [(r, a, g) for _ref, r, a, g in self.query_keyed(lat, lon, radius_km, feed_slugs)]
+
+    def query_keyed(self, lat: float, lon: float, radius_km: float = 0.0, feed_slugs: Iterable[str] | None = None) -> List[Tuple[Tuple[str, Tuple[str, int]], dict, dict, AreaGeometry]]:
+        """As query(), with each candidate's (feed url, area key) first."""
+        return self.query_box(search_box(lat, lon, radius_km), feed_slugs)
+
+    def query_box(self, box: Tuple[float, float, float, float], feed_slugs: Iterable[str] | None = None) -> List[Tuple[Tuple[str, Tuple[str, int]], dict, dict, AreaGeometry]]:
+        """(feed url, area key), feed result, record and geometry of areas whose bounding box
+        overlaps `box` (min_lat, min_lon, max_lat, max_lon), in feed/alert order."""
+        wanted = set(feed_slugs or [])
+        hits = []
+        for item in self._index.query(box):
+            result, record, geom, order = self._entries[item]
+            if wanted and result.get('slug') not in wanted:
+                continue
+            hits.append((order, item, result, record, geom))
+        hits.sort(key=lambda h: h[0])
+        return [(ref, r, a, g) for _, ref, r, a, g in hits]
+
+    def areas(self, url: str) -> Dict[Tuple[str, int], AreaGeometry]:
+        """{area key: geometry} for one feed as last indexed (areas without geometry are absent)."""
+        return self._feed_geoms.get(url, {})
+
+    def simplify_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per feed url: vertex reduction and how containment tests were decided."""
+        out = {}
+        for url, geoms in self._feed_geoms.items():
+            vertices = fast = checks = fallbacks = scanned = 0
+            for geom in geoms.values():
+                for r in geom.rings:
+                    vertices += len(r)
+                    fast += r.fast_len
+                    checks += r.checks
+                    fallbacks += r.fallbacks
+                    # Vertices walked by those tests: the reduced ring each time, plus the exact ring on fallback
+                    scanned += r.checks * r.fast_len + r.fallbacks * len(r)
+            out[url] = {
+                'vertices': vertices,
+                'simplified_vertices': fast,
+                'reduction': round(1.0 - fast / vertices, 3) if vertices else 0.0,
+                'checks': checks,
+                'band_fallbacks': fallbacks,
+                'vertices_per_check': round(scanned / checks, 1) if checks else None,
+            }
+        return out
+
+    def cached(self) -> Iterator[Tuple[Tuple[str, Tuple[str, int]], Tuple[Tuple[str, ...], Tuple[str, ...]], AreaGeometry | None]]:
+        """Yield ((feed url, key), source strings, geometry) for every cached area, e.g. for a snapshot."""
+        for key, (src, geom) in self._cache.items():
+            yield key, src, geom
+
+    def preload(self, items: Iterable[Tuple[Tuple[str, Tuple[str, int]], Tuple[Tuple[str, ...], Tuple[str, ...]], AreaGeometry | None]]) -> None:
+        """Seed the cache with previously built geometry; update() then links it without parsing."""
+        for key, src, geom in items:
+            self._cache.setdefault(key, (src, geom))
+
+    def __len__(self) -> int:
+        return len(self._cache)
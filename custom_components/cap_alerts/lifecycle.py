@@ -0,0 +1,181 @@
+from __future__ import annotations
+import math
+from typing import Dict, Hashable, List, Set, Tuple
+from .const import FAILED_FEED_RETENTION
+from .summary import parse_time
+
+# CAP <msgType> values that act on earlier messages through <references>
+MSG_UPDATE = 'Update'
+MSG_CANCEL = 'Cancel'
+
+class TimerWheel:
+    """Hashed timing wheel for expiry deadlines.
+
+    Deadlines fall into `slots` buckets of `tick` seconds; a deadline further out than one turn
+    waits in its bucket for the extra turns. Scheduling and cancelling are O(1), and advancing
+    only visits the buckets for the ticks that passed (at most one full turn).
+    """
+
+    def __init__(self, tick: float = 30.0, slots: int = 256):
+        self._tick = tick
+        self._slots: List[Dict[Hashable, float]] = [{} for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._cursor: int | None = None  # last tick number processed
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def deadline(self, key: Hashable) -> float | None:
+        slot = self._where.get(key)
+        return self._slots[slot].get(key) if slot is not None else None
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        self.cancel(key)
+        slot = math.floor(deadline / self._tick) % len(self._slots)
+        self._slots[slot][key] = deadline
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self._slots[slot].pop(key, None)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Keys whose deadline is at or before `now`; they are removed from the wheel."""
+        current = math.floor(now / self._tick)
+        if self._cursor is None:
+            self._cursor = current - 1
+        n = len(self._slots)
+        # Also visit the current tick's bucket: deadlines earlier in this tick are due now
+        ticks = range(self._cursor + 1, current + 1) if current - self._cursor < n else range(current - n + 1, current + 1)
+        due = []
+        for t in ticks:
+            bucket = self._slots[t % n]
+            for key, deadline in list(bucket.items()):
+                if deadline <= now:
+                    del bucket[key]
+                    del self._where[key]
+                    due.append(key)
+        # Keep the cursor one behind so the current bucket is revisited on the next call
+        self._cursor = current - 1
+        return due
+
+# CAP <references> entry: (sender, identifier, sent)
+Reference = Tuple[str, str, str]
+
+def parse_references(text: str | None) -> List[Reference]:
+    """CAP <references>: whitespace-separated "sender,identifier,sent" triples."""
+    refs = []
+    for token in (text or '').split():
+        parts = token.split(',')
+        if len(parts) >= 2:
+            refs.append((parts[0].strip().lower(), parts[1].strip(), parts[2].strip() if len(parts) > 2 else ''))
+    return refs
+
+def _ref_key(sender: str, identifier: str) -> Tuple[str, str]:
+    return ((sender or '').strip().lower(), (identifier or '').strip())
+
+class AlertLifecycle:
+    """Active-set filter applying CAP message semantics across all feeds.
+
+    - An `Update` supersedes every alert it references; the update itself stays active.
+    - A `Cancel` removes the alerts it references and is not shown itself.
+    - Alerts past `expires` are dropped; future expiries sit in a TimerWheel so eviction
+      happens on the next tick without rescanning every alert.
+    - A feed whose fetch failed (or that is disabled) keeps its last alerts for up to
+      `retention` seconds, still subject to the rules above, so a transient error neither
+      drops its alerts nor keeps expired or cancelled ones alive.
+
+    The filtered lists are only rebuilt when a feed's alert list changes or a deadline passes;
+    otherwise the previous lists are returned as the same objects.
+    """
+
+    def __init__(self, tick: float = 30.0, retention: float = FAILED_FEED_RETENTION):
+        self._wheel = TimerWheel(tick)
+        self._retention = retention
+        # feed url -> time its fetches started failing
+        self._failing: Dict[str, float] = {}
+        # feed url -> (alert list seen, [expires POSIX time per record], filtered list handed out)
+        self._feeds: Dict[str, Tuple[List[dict], List[float | None], List[dict]]] = {}
+        self._inputs: List[dict] = []
+        self._last: List[dict] = []
+        self._stats = {'superseded': 0, 'cancelled': 0, 'expired': 0, 'carried_feeds': 0}
+
+    def update(self, results: List[dict], now: float) -> List[dict]:
+        """Results with superseded, cancelled and expired records removed."""
+        due = self._wheel.advance(now)
+        lapsed = any(now - since > self._retention for since in self._failing.values())
+        if not due and not lapsed and len(results) == len(self._inputs) and all(a is b for a, b in zip(results, self._inputs)):
+            return self._last
+        stats = {'superseded': 0, 'cancelled': 0, 'expired': 0, 'carried_feeds': 0}
+        failing = {}
+        inputs = []
+        for r in results:
+            url = _url(r)
+            alerts = r.get('alerts') if isinstance(r.get('alerts'), list) else []
+            prev = self._feeds.get(url)
+            if (r.get('features') or {}).get('error'):
+                since = failing[url] = self._failing.get(url, now)
+                if prev is not None and now - since <= self._retention:
+                    # Serve the last alerts seen; they still go through cancellation and expiry below
+                    alerts = prev[0]
+                    stats['carried_feeds'] += 1
+            inputs.append((r, url, alerts, prev))
+        superseded: Set[Tuple[str, str]] = set()
+        cancelled: Set[Tuple[str, str]] = set()
+        for _, _, alerts, _ in inputs:
+            for a in alerts:
+                msg_type = (a.get('msgType') or '').capitalize()
+                if msg_type in (MSG_UPDATE, MSG_CANCEL) and a.get('references'):
+                    target = cancelled if msg_type == MSG_CANCEL else superseded
+                    for sender, ident, _sent in parse_references(a['references']):
+                        target.add((sender, ident))
+        feeds = {}
+        out = []
+        live_keys: Set[Tuple[str, str]] = set()
+        for r, url, alerts, prev in inputs:
+            times = prev[1] if prev is not None and prev[0] is alerts else [parse_time(a.get('expires')) for a in alerts]
+            kept = []
+            for a, t_exp in zip(alerts, times):
+                key = _ref_key(a.get('sender'), a.get('identifier'))
+                if (a.get('msgType') or '').capitalize() == MSG_CANCEL or key in cancelled:
+                    stats['cancelled'] += 1
+                    continue
+                if key in superseded:
+                    stats['superseded'] += 1
+                    continue
+                if t_exp is not None and t_exp <= now:
+                    stats['expired'] += 1
+                    continue
+                if t_exp is not None:
+                    live_keys.add(key)
+                    # An Update re-issuing the alert may move its expiry either way
+                    if self._wheel.deadline(key) != t_exp:
+                        self._wheel.schedule(key, t_exp)
+                kept.append(a)
+            if len(kept) == len(alerts):
+                kept = alerts
+            elif prev is not None and len(prev[2]) == len(kept) and all(x is y for x, y in zip(prev[2], kept)):
+                kept = prev[2]
+            feeds[url] = (alerts, times, kept)
+            out.append(r if kept is r.get('alerts') else dict(r, alerts=kept))
+        for r in self._last:
+            for a in r.get('alerts') or []:
+                key = _ref_key(a.get('sender'), a.get('identifier'))
+                if key not in live_keys:
+                    self._wheel.cancel(key)
+        self._feeds = feeds
+        self._failing = failing
+        self._inputs = list(results)
+        self._last = out
+        self._stats = stats
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, 'scheduled_expiries': len(self._wheel)}
+
+def _url(r: dict) -> str:
+    return (r.get('feed') or {}).get('url') or r.get('slug')
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List
+
+# Samples kept per feed for latency percentiles
+METRICS_WINDOW = 50
+
+def percentile(values: Iterable[float], q: float) -> float | None:
+    """Nearest-rank percentile (q in 0..100); None when there are no samples."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = math.ceil(q / 100.0 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, k))]
+
+def count_vertices(alerts: List[dict]) -> int:
+    """Polygon vertices across all alert areas ("lat,lon" pairs in the polygon strings)."""
+    total = 0
+    for a in alerts:
+        for poly in a.get('polygons') or ([a['polygon']] if a.get('polygon') else []):
+            total += poly.count(',')
+    return total
+
+class FeedMetrics:
+    """Rolling fetch statistics for one feed URL.
+
+    Cheap to update on every fetch: a bounded latency window, a few counters and the
+    counts for the current alert list (recomputed only when that list changes).
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.latencies_ms: Deque[float] = deque(maxlen=window)
+        self.fetches = 0
+        self.not_modified = 0  # HTTP 304
+        self.unchanged = 0  # 200 with the same body hash
+        self.errors = 0
+        self.last_latency_ms: float | None = None
+        self.bytes = 0  # decoded body of the last 200 response
+        self.wire_bytes: int | None = None  # Content-Length as sent (compressed size when encoded)
+        self.compression: str | None = None
+        self.parse_ms: float | None = None
+        self.alert_count = 0
+        self.vertex_count = 0
+        self.last_fetch: float | None = None
+        self.last_change: float | None = None
+        self._alerts_ref: List[dict] | None = None
+
+    def record_fetch(self, latency_ms: float, status: str, *, body_bytes: int = 0, wire_bytes: int | None = None, compression: str | None = None, parse_ms: float | None = None) -> None:
+        """`status` is the feed's cache state: 'miss', 'not_modified' or 'unchanged'."""
+        now = time.time()
+        self.fetches += 1
+        self.last_fetch = now
+        self.last_latency_ms = latency_ms
+        self.latencies_ms.append(latency_ms)
+        if status == 'not_modified':
+            self.not_modified += 1
+            return
+        self.bytes = body_bytes
+        self.wire_bytes = wire_bytes
+        self.compression = compression
+        self.parse_ms = parse_ms
+        if status == 'unchanged':
+            self.unchanged += 1
+        else:
+            self.last_change = now
+
+    def record_error(self, latency_ms: float | None = None) -> None:
+        self.errors += 1
+        self.last_fetch = time.time()
+        if latency_ms is not None:
+            self.last_latency_ms = latency_ms
+
+    def record_alerts(self, alerts: List[dict]) -> None:
+        if alerts is self._alerts_ref:
+            return
+        self._alerts_ref = alerts
+        self.alert_count = len(alerts)
+        self.vertex_count = count_vertices(alerts)
+
+    def as_dict(self, now: float | None = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        served = self.fetches
+        return {
+            'fetches': self.fetches,
+            'errors': self.errors,
+            'last_latency_ms': self.last_latency_ms,
+            'p50_latency_ms': percentile(self.latencies_ms, 50),
+            'p95_latency_ms': percentile(self.latencies_ms, 95),
+            'bytes': self.bytes,
+            'wire_bytes': self.wire_bytes,
+            'compression': self.compression,
+            'parse_ms': self.parse_ms,
+            'alert_count': self.alert_count,
+            'vertex_count': self.vertex_count,
+            'not_modified_ratio': round(self.not_modified / served, 3) if served else None,
+            'cache_hit_ratio': round((self.not_modified + self.unchanged) / served, 3) if served else None,
+            'seconds_since_change': round(now - self.last_change) if self.last_change else None,
+            'seconds_since_fetch': round(now - self.last_fetch) if self.last_fetch else None,
+        }
+
+class RefreshMetrics:
+    """Per-feed metrics by URL plus whole-refresh wall time and event-loop block time."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._window = window
+        self.feeds: Dict[str, FeedMetrics] = {}
+        self.wall_ms: Deque[float] = deque(maxlen=window)
+        self.last_refresh: Dict[str, Any] = {}
+
+    def feed(self, url: str) -> FeedMetrics:
+        m = self.feeds.get(url)
+        if m is None:
+            m = self.feeds[url] = FeedMetrics(self._window)
+        return m
+
+    def record_refresh(self, wall_ms: float, loop_block_ms: float, loop_block_max_ms: float, fetched: int) -> None:
+        self.wall_ms.append(wall_ms)
+        self.last_refresh = {
+            'wall_ms': round(wall_ms, 1),
+            'loop_block_ms': round(loop_block_ms, 1),
+            'loop_block_max_ms': round(loop_block_max_ms, 1),
+            'feeds_fetched': fetched,
+            'at': time.time(),
+        }
+
+    def refresh_dict(self) -> Dict[str, Any]:
+        return {
+            **self.last_refresh,
+            'p50_wall_ms': percentile(self.wall_ms, 50),
+            'p95_wall_ms': percentile(self.wall_ms, 95),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        now = time.time()
+        return {'refresh': self.refresh_dict(), 'feeds': {url: m.as_dict(now) for url, m in self.feeds.items()}}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import json
-import xmltodict
+from xml.etree import ElementTree
 from typing import Any, Dict
 
 def parse_feed(text: str, fmt: str) -> Dict[str, Any]:
@@ -22,55 +22,114 @@ def parse_feed(text: str, fmt: str) -> Dict[str, Any]:
 def _norm_item(**kwargs):
     return {
         'identifier': kwargs.get('identifier',''),
+        'sender': kwargs.get('sender',''),
         'sent': kwargs.get('sent',''),
+        # CAP <msgType>: Alert, Update, Cancel, Ack or Error
+        'msgType': kwargs.get('msgType',''),
+        # CAP <references>: space-separated "sender,identifier,sent" of earlier messages
+        'references': kwargs.get('references',''),
         'headline': kwargs.get('headline',''),
         'event': kwargs.get('event',''),
         'severity': kwargs.get('severity',''),
         'urgency': kwargs.get('urgency',''),
+        'expires': kwargs.get('expires',''),
         'areaDesc': kwargs.get('areaDesc',''),
         'polygon': kwargs.get('polygon',''),
         'circle': kwargs.get('circle',''),
+        # Every polygon/circle of the area; `polygon`/`circle` hold the first for compatibility
+        'polygons': kwargs.get('polygons') or ([kwargs['polygon']] if kwargs.get('polygon') else []),
+        'circles': kwargs.get('circles') or ([kwargs['circle']] if kwargs.get('circle') else []),
         'link': kwargs.get('link','')
     }
 
+_CHUNK = 64 * 1024
+
+def _local(tag: str) -> str:
+    # '{urn:oasis:names:tc:emergency:cap:1.2}alert' -> 'alert'
+    return tag.rsplit('}', 1)[-1] if tag[:1] == '{' else tag
+
+def _iter_events(text: str):
+    """Yield (event, element, path) while feeding the document to a pull parser in chunks.
+
+    `path` is the list of local tag names from the root to the element (inclusive). Elements
+    are cleared by the callers once consumed, so memory stays bounded by one record.
+    """
+    parser = ElementTree.XMLPullParser(events=('start', 'end'))
+    path: list[str] = []
+    root = None
+
+    def drain():
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+                path.append(_local(elem.tag))
+                yield event, elem, path
+            else:
+                yield event, elem, path
+                path.pop()
+                if len(path) == 1:
+                    # Detach finished top-level children so the tree never holds the whole document
+                    root.clear()
+
+    for i in range(0, len(text), _CHUNK):
+        parser.feed(text[i:i + _CHUNK])
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+def _text(elem) -> str:
+    return (elem.text or '').strip()
+
 def parse_cap_xml(text: str) -> Dict[str, Any]:
-    doc = xmltodict.parse(text)
+    """Stream CAP documents (single <alert> or any wrapper holding <alert>s).
+
+    Records are emitted as each <alert> closes: one per <area> of the first <info> block.
+    """
     alerts = []
-    def ensure_list(x):
-        if x is None:
-            return []
-        return x if isinstance(x, list) else [x]
-    root = doc
-    if 'alert' in root:
-        alert_list = ensure_list(root['alert'])
-    else:
-        alert_list = []
-        for k,v in root.items():
-            if isinstance(v, dict) and 'alert' in v:
-                alert_list = ensure_list(v['alert'])
-                break
-    for a in alert_list:
-        identifier = (a.get('identifier') or '')
-        sent = (a.get('sent') or '')
-        info_list = ensure_list(a.get('info'))
-        if not info_list:
-            alerts.append(_norm_item(identifier=identifier, sent=sent))
+    alert = info = area = None
+    # The <info> being read; None outside it and for every <info> after the first
+    filling = None
+    info_seen = False
+    alert_depth = 0
+    for event, elem, path in _iter_events(text):
+        name = path[-1]
+        if event == 'start':
+            if name == 'alert' and alert is None:
+                alert = {'identifier': '', 'sender': '', 'sent': '', 'msgType': '', 'references': ''}
+                alert_depth = len(path)
+                info_seen = False
+                info = filling = None
+            elif alert is not None and name == 'info' and len(path) == alert_depth + 1 and not info_seen:
+                info = filling = {'fields': {}, 'areas': []}
+            elif filling is not None and name == 'area' and len(path) == alert_depth + 2:
+                area = {}
             continue
-        info = info_list[0]
-        headline = info.get('headline') or ''
-        event = info.get('event') or ''
-        severity = info.get('severity') or ''
-        urgency = info.get('urgency') or ''
-        web = info.get('web') or ''
-        area_list = ensure_list(info.get('area'))
-        if not area_list:
-            alerts.append(_norm_item(identifier=identifier, sent=sent, headline=headline, event=event, severity=severity, urgency=urgency, link=web))
+        if alert is None:
             continue
-        for area in area_list:
-            areaDesc = area.get('areaDesc') or ''
-            polygon = area.get('polygon') or ''
-            circle = area.get('circle') or ''
-            alerts.append(_norm_item(identifier=identifier, sent=sent, headline=headline, event=event, severity=severity, urgency=urgency, areaDesc=areaDesc, polygon=polygon, circle=circle, link=web))
+        depth = len(path) - alert_depth
+        if depth == 1 and name in ('identifier', 'sender', 'sent', 'msgType', 'references'):
+            alert[name] = _text(elem)
+        elif filling is not None and depth == 2 and name in ('headline', 'event', 'severity', 'urgency', 'expires', 'web'):
+            info['fields'].setdefault(name, _text(elem))
+        elif area is not None and depth == 3 and name == 'areaDesc':
+            area.setdefault(name, _text(elem))
+        elif area is not None and depth == 3 and name in ('polygon', 'circle'):
+            # An area may carry several polygons/circles
+            value = _text(elem)
+            if value:
+                area.setdefault(name + 's', []).append(value)
+        elif area is not None and depth == 2 and name == 'area':
+            filling['areas'].append(area)
+            area = None
+        elif depth == 1 and name == 'info':
+            info_seen = True
+            filling = None
+        elif depth == 0 and name == 'alert':
+            alerts.extend(_cap_records(alert, info))
+            alert = info = area = filling = None
+        elem.clear()
     features = {
         'has_polygons': any(it.get('polygon') for it in alerts),
         'has_circles': any(it.get('circle') for it in alerts),
@@ -78,27 +137,71 @@ def parse_cap_xml(text: str) -> Dict[str, Any]:
     }
     return {'alerts': alerts, 'features': features}
 
+def _cap_records(alert: dict, info: dict | None) -> list[dict]:
+    header = dict(
+        identifier=alert.get('identifier') or '',
+        sender=alert.get('sender') or '',
+        sent=alert.get('sent') or '',
+        msgType=alert.get('msgType') or '',
+        references=alert.get('references') or '',
+    )
+    if info is None:
+        return [_norm_item(**header)]
+    fields = info['fields']
+    common = dict(
+        **header,
+        headline=fields.get('headline') or '',
+        event=fields.get('event') or '',
+        severity=fields.get('severity') or '',
+        urgency=fields.get('urgency') or '',
+        expires=fields.get('expires') or '',
+        link=fields.get('web') or '',
+    )
+    if not info['areas']:
+        return [_norm_item(**common)]
+    return [
+        _norm_item(
+            areaDesc=ar.get('areaDesc') or '',
+            polygon=(ar.get('polygons') or [''])[0],
+            circle=(ar.get('circles') or [''])[0],
+            polygons=ar.get('polygons') or [],
+            circles=ar.get('circles') or [],
+            **common,
+        )
+        for ar in info['areas']
+    ]
+
 def parse_atom_xml(text: str) -> Dict[str, Any]:
-    doc = xmltodict.parse(text)
-    feed = doc.get('feed') or {}
-    entries = feed.get('entry') or []
-    if not isinstance(entries, list):
-        entries = [entries]
+    """Stream Atom feeds; one record per <entry>, emitted as each entry closes."""
     alerts = []
-    for e in entries:
-        identifier = e.get('id') or ''
-        sent = e.get('updated') or e.get('published') or ''
-        headline = (e.get('title') or {}).get('#text') if isinstance(e.get('title'), dict) else (e.get('title') or '')
-        link = ''
-        l = e.get('link')
-        if isinstance(l, list) and l:
-            link = l[0].get('@href') or ''
-        elif isinstance(l, dict):
-            link = l.get('@href') or ''
-        polygon = e.get('georss:polygon') or ''
-        point = e.get('georss:point') or ''
-        areaDesc = e.get('summary') or ''
-        alerts.append(_norm_item(identifier=identifier, sent=sent, headline=headline, areaDesc=areaDesc, polygon=polygon, link=link))
+    entry = None
+    entry_depth = 0
+    for event, elem, path in _iter_events(text):
+        name = path[-1]
+        if event == 'start':
+            if name == 'entry' and entry is None and len(path) == 2:
+                entry = {}
+                entry_depth = len(path)
+            elif entry is not None and name == 'link' and len(path) == entry_depth + 1 and 'link' not in entry:
+                entry['link'] = elem.get('href') or ''
+            continue
+        if entry is None:
+            continue
+        depth = len(path) - entry_depth
+        if depth == 1 and name in ('id', 'updated', 'published', 'title', 'summary', 'polygon', 'expires'):
+            entry.setdefault(name, _text(elem))
+        elif depth == 0:
+            alerts.append(_norm_item(
+                identifier=entry.get('id') or '',
+                sent=entry.get('updated') or entry.get('published') or '',
+                headline=entry.get('title') or '',
+                expires=entry.get('expires') or '',
+                areaDesc=entry.get('summary') or '',
+                polygon=entry.get('polygon') or '',
+                link=entry.get('link') or '',
+            ))
+            entry = None
+        elem.clear()
     features = {
         'has_polygons': any(it.get('polygon') for it in alerts),
         'has_circles': any(it.get('circle') for it in alerts),
@@ -121,11 +224,17 @@ def parse_json(text: str) -> Dict[str, Any]:
     alerts = []
     for obj in (items or []):
         identifier = str(obj.get('id') or obj.get('identifier') or '')
+        sender = obj.get('sender') or ''
+        msg_type = obj.get('msgType') or obj.get('messageType') or ''
+        references = obj.get('references') or ''
+        if isinstance(references, list):
+            references = ' '.join(str(r) for r in references)
         sent = obj.get('sent') or obj.get('updated') or obj.get('published') or ''
         headline = obj.get('headline') or obj.get('title') or ''
         event = obj.get('event') or ''
         severity = obj.get('severity') or ''
         urgency = obj.get('urgency') or ''
+        expires = obj.get('expires') or ''
         areaDesc = obj.get('areaDesc') or obj.get('area') or obj.get('location') or ''
         link = obj.get('link') or obj.get('url') or ''
         polygon = obj.get('polygon') or ''
@@ -139,7 +248,7 @@ def parse_json(text: str) -> Dict[str, Any]:
                 lat = geom['coordinates'][1]
                 lon = geom['coordinates'][0]
                 areaDesc = f"point {lat},{lon}"
-        alerts.append(_norm_item(identifier=identifier, sent=sent, headline=headline, event=event, severity=severity, urgency=urgency, areaDesc=areaDesc, polygon=polygon, circle=circle, link=link))
+        alerts.append(_norm_item(identifier=identifier, sender=sender, sent=sent, msgType=msg_type, references=references, headline=headline, event=event, severity=severity, urgency=urgency, expires=expires, areaDesc=areaDesc, polygon=polygon, circle=circle, link=link))
     features = {
         'has_polygons': any(it.get('polygon') for it in alerts),
         'has_circles': any(it.get('circle') for it in alerts),
@@ -0,0 +1,92 @@
+from __future__ import annotations
+import random
+import re
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping
+from .const import DEFAULT_SCAN_INTERVAL, MIN_SCAN_INTERVAL, MAX_SCAN_INTERVAL, URGENT_SCAN_INTERVAL
+
+URGENT_SEVERITIES = {'severe', 'extreme'}
+_MAX_AGE_RE = re.compile(r'(?:^|[,\s])(?:s-maxage|max-age)\s*=\s*"?(\d+)', re.I)
+
+def freshness_lifetime(headers: Mapping[str, str]) -> float | None:
+    """Seconds the server says the response stays fresh (Cache-Control max-age, else Expires - Date)."""
+    cc = headers.get('Cache-Control') or ''
+    if 'no-cache' in cc.lower() or 'no-store' in cc.lower():
+        return None
+    m = _MAX_AGE_RE.search(cc)
+    if m:
+        return float(m.group(1))
+    expires = headers.get('Expires')
+    if not expires:
+        return None
+    try:
+        exp = parsedate_to_datetime(expires)
+        date_hdr = headers.get('Date')
+        ref = parsedate_to_datetime(date_hdr) if date_hdr else datetime.now(timezone.utc)
+        return max(0.0, (exp - ref).total_seconds())
+    except Exception:
+        # Invalid Expires (e.g. "0") means already stale
+        return None
+
+def has_urgent_alerts(alerts: list[dict]) -> bool:
+    return any((a.get('severity') or '').lower() in URGENT_SEVERITIES for a in alerts or [])
+
+def _phase(key: str) -> float:
+    # Stable per-feed offset in [0, 1) so feeds keep distinct slots across restarts
+    return (zlib.crc32(key.encode('utf-8')) % 1000) / 1000.0
+
+class FeedScheduler:
+    """Per-feed adaptive polling.
+
+    Each feed gets its own next-due time. The interval starts at the per-feed override or the
+    default, drops to `URGENT_SCAN_INTERVAL` while Severe/Extreme alerts are active, doubles for
+    every consecutive unchanged poll (up to `MAX_SCAN_INTERVAL`) and is never shorter than the
+    server's freshness lifetime. Due times are jittered so feeds do not fire together.
+    """
+
+    def __init__(self, overrides: Mapping[str, int] | None = None):
+        self._overrides = {k: max(MIN_SCAN_INTERVAL, int(v)) for k, v in (overrides or {}).items() if v}
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+    def is_due(self, key: str, now: float) -> bool:
+        st = self._state.get(key)
+        return st is None or now >= st['next_due']
+
+    def next_due(self, key: str) -> float | None:
+        st = self._state.get(key)
+        return st['next_due'] if st else None
+
+    def interval(self, key: str) -> float:
+        st = self._state.get(key)
+        return st['interval'] if st else float(self._overrides.get(key, DEFAULT_SCAN_INTERVAL))
+
+    def record(self, key: str, now: float, *, changed: bool, urgent: bool, max_age: float | None = None, failed: bool = False) -> float:
+        """Record a poll result and schedule the next poll; returns the chosen interval in seconds."""
+        first = key not in self._state
+        st = self._state.setdefault(key, {'unchanged': 0})
+        override = self._overrides.get(key)
+        if failed or changed:
+            st['unchanged'] = 0
+        else:
+            st['unchanged'] += 1
+        if override:
+            interval = float(override)
+        elif failed:
+            interval = float(DEFAULT_SCAN_INTERVAL)
+        elif urgent:
+            interval = float(URGENT_SCAN_INTERVAL)
+        else:
+            interval = float(min(MAX_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL * (2 ** min(st['unchanged'], 8))))
+        if max_age and not failed:
+            # Polling before the server's copy goes stale only returns the same content
+            interval = max(interval, min(float(MAX_SCAN_INTERVAL), max_age))
+        if first:
+            # Spread feeds across the interval after the initial fetch
+            delay = interval * (0.5 + _phase(key))
+        else:
+            delay = interval * random.uniform(0.9, 1.1)
+        st['interval'] = interval
+        st['next_due'] = now + delay
+        return interval
@@ -1,85 +1,435 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+import time
 import aiohttp
+from urllib.parse import urlparse
 from datetime import timedelta
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from .const import DOMAIN, CONF_FEEDS, MAX_FEED_FAILURES, ISSUE_FEED_DISABLED_PREFIX
-from .parser import parse_feed
+from .const import ISSUE_FEED_NO_GEOMETRY_PREFIX, ISSUE_FEED_NO_CONTENT_PREFIX, EMPTY_ALERTS_THRESHOLD
+from .const import FETCH_TIMEOUT, MAX_CONCURRENT_FETCHES, MAX_FETCHES_PER_HOST
+from .const import CONF_SCAN_INTERVALS, SCHEDULER_TICK, CONF_PARSE_EXECUTOR, PARSE_EXECUTOR_THREAD, CONF_DIAGNOSTIC_SENSORS, CONF_SIMPLIFY_TOLERANCE
+from .const import EVENT_ALERT_ADDED, EVENT_ALERT_UPDATED, EVENT_ALERT_REMOVED
+from .const import SNAPSHOT_STORE_VERSION, SNAPSHOT_STORE_KEY, SNAPSHOT_SAVE_DELAY
+from .alert_store import AlertStore
+from .dedup import DedupIndex
+from .lifecycle import AlertLifecycle
+from .watch import WatchDelta, WatchEngine, watch_events
+from .diff import AlertDelta, AlertTracker
+from .metrics import RefreshMetrics
+from .geometry import GeometryStore, build_areas
+from .snapshot import build_snapshot, restore_snapshot
+from .scheduler import FeedScheduler, freshness_lifetime, has_urgent_alerts
 from .util import slug_from_url, raise_issue
+from .workers import LoopBlockMonitor, ParseExecutor, decode_and_parse
 
-SCAN_INTERVAL = timedelta(minutes=5)
+_LOGGER = logging.getLogger(__name__)
+
+# The coordinator ticks often; FeedScheduler decides which feeds are actually due each tick
+SCAN_INTERVAL = timedelta(seconds=SCHEDULER_TICK)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     feeds = entry.data.get(CONF_FEEDS, []) + entry.options.get(CONF_FEEDS, [])
-    coordinator = CAPCoordinator(hass, feeds)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = CAPCoordinator(
+        hass,
+        feeds,
+        entry.options.get(CONF_SCAN_INTERVALS, {}),
+        parse_mode=entry.options.get(CONF_PARSE_EXECUTOR, PARSE_EXECUTOR_THREAD),
+        snapshot_key=f"{SNAPSHOT_STORE_KEY}_{entry.entry_id}",
+        simplify_m=float(entry.options.get(CONF_SIMPLIFY_TOLERANCE, 0)),
+    )
+    entry.async_on_unload(coordinator.async_shutdown_parser)
+    # Read by diagnostics.py for the config entry download
+    coordinators = hass.data[DOMAIN].setdefault('coordinators', {})
+    coordinators[entry.entry_id] = coordinator
+    entry.async_on_unload(lambda: coordinators.pop(entry.entry_id, None))
+    if await coordinator.async_restore_snapshot():
+        # Entities start from the last good (stale) results; the network refresh runs in the background
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh")
+    else:
+        await coordinator.async_config_entry_first_refresh()
     entities = []
     for f in feeds:
         slug = slug_from_url(f.get('url',''))
         entities.append(CAPFeedSensor(hass, coordinator, slug, f))
     entities.append(CAPGlobalSensor(hass, coordinator))
+    if entry.options.get(CONF_DIAGNOSTIC_SENSORS, False):
+        for f in feeds:
+            if f.get('url'):
+                entities.append(CAPFeedLatencySensor(coordinator, slug_from_url(f['url']), f['url']))
+        entities.append(CAPRefreshTimeSensor(coordinator))
     async_add_entities(entities)
 
 class CAPCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass: HomeAssistant, feeds: list[dict]):
-        super().__init__(hass, hass.logger, name=DOMAIN, update_interval=SCAN_INTERVAL)
+    def __init__(self, hass: HomeAssistant, feeds: list[dict], scan_overrides: dict[str, int] | None = None, parse_mode: str = PARSE_EXECUTOR_THREAD, snapshot_key: str = SNAPSHOT_STORE_KEY, simplify_m: float = 0.0):
+        # scan_overrides: {feed url: seconds}
+        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=SCAN_INTERVAL)
         self._feeds = feeds
+        # Set by a tick where no feed was due and nothing expired; its listener update is skipped
+        self._idle = False
+        # Live results handed out by the last refresh or restore, to spot idle ticks
+        self._live: list[dict] | None = None
+        self._parser = ParseExecutor(hass, parse_mode)
+        self._scheduler = FeedScheduler(scan_overrides)
+        self._tracker = AlertTracker()
         self.data = []
+        # Changes made by the latest refresh; empty on the first refresh, which only seeds state
+        self.last_delta = AlertDelta()
+        # Per-feed latency/bytes/parse/cache statistics and whole-refresh timings
+        self.metrics = RefreshMetrics()
+        self._fetch_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        # Per-feed HTTP validators and last parse, keyed by URL since feeds on one host share a slug:
+        # {url: {etag, last_modified, body_hash, max_age, parsed}}
+        self._http_cache: dict[str, dict] = {}
+        # Last successful result per feed URL, persisted for warm starts
+        self._good: dict[str, dict] = {}
+        self._snapshot = Store(hass, SNAPSHOT_STORE_VERSION, snapshot_key)
         hass.data.setdefault(DOMAIN, {})
         hass.data[DOMAIN].setdefault('failures', {})
         hass.data[DOMAIN].setdefault('empty_alerts', {})
+        # Rings get a Douglas–Peucker copy within simplify_m metres for matching (0 = exact only)
+        hass.data[DOMAIN].setdefault('geometry', GeometryStore()).set_tolerance(simplify_m)
+        self.alerts: AlertStore = hass.data[DOMAIN].setdefault('alerts', AlertStore())
+        # Mirrored alerts (same identifier/sender/sent in several feeds) are kept once
+        self.dedup: DedupIndex = hass.data[DOMAIN].setdefault('dedup', DedupIndex())
+        # Drops superseded (Update), cancelled and expired alerts; expiries run on a timer wheel
+        # ticking with the coordinator, so they are evicted between fetches too
+        self.lifecycle = AlertLifecycle(tick=SCHEDULER_TICK)
+        # Registered watchpoints; only changed alert areas are re-tested each refresh
+        self.watch: WatchEngine = hass.data[DOMAIN].setdefault('watch', WatchEngine())
+
+    @callback
+    def async_shutdown_parser(self) -> None:
+        self._parser.shutdown()
+
+    async def async_restore_snapshot(self) -> bool:
+        """Fill data, validators and geometry from the last snapshot; False if there is none.
+
+        Restored feed results carry `features.stale` until their first successful fetch.
+        """
+        try:
+            data = await self._snapshot.async_load()
+        except Exception:  # corrupt or unreadable snapshot: fall back to a cold start
+            self.logger.warning("Ignoring unreadable alert snapshot")
+            return False
+        urls = [f.get('url') for f in self._feeds if f.get('url')]
+        restored, http_cache, areas = restore_snapshot(data, urls, self.hass.data[DOMAIN]['geometry'].tolerance_m)
+        if not restored:
+            return False
+        by_url = {r['feed']['url']: r for r in restored}
+        results = [by_url[u] for u in urls if u in by_url]
+        self._http_cache.update(http_cache)
+        self._good.update(by_url)
+        self.hass.data[DOMAIN]['geometry'].preload(areas)
+        self._live = self.lifecycle.update(results, time.time())
+        # Seeds the diff (no data yet, so no events) so the first live refresh reports what changed while HA was down
+        await self._async_publish()
+        self.data = results
+        return True
+
+    async def _async_publish(self, quiet: bool = False) -> None:
+        """Index the live results of every config entry into the shared stores.
+
+        Entries poll their own feeds, but dedup, geometry, the AlertStore and watchpoints span all
+        of them, so each refresh re-indexes the other entries' last results along with its own
+        instead of replacing them. Each entry's tracker sees its own share of the unique results.
+        `quiet` updates the trackers and watchpoints without firing events.
+        """
+        async with self.hass.data[DOMAIN].setdefault('publish_lock', asyncio.Lock()):
+            coordinators = list(self.hass.data[DOMAIN].get('coordinators', {}).values())
+            if self not in coordinators:
+                coordinators.append(self)
+            live = []
+            shares = []
+            for c in coordinators:
+                shares.append((c, len(live), len(c._live or [])))
+                live.extend(c._live or [])
+            # Each mirrored alert is geometry-indexed, matched and announced once, under its first feed
+            unique = self.dedup.update(live)
+            # Parse geometry for new/changed alert areas only (off the loop), then re-link all feeds
+            store: GeometryStore = self.hass.data[DOMAIN]['geometry']
+            pending = store.pending(unique)
+            built = await self._parser.async_run(build_areas, pending, store.tolerance_m) if pending else {}
+            store.update(unique, built)
+            # Index once per refresh; sensors and services read the indexes instead of scanning results
+            self.alerts.update(live, unique)
+            self.hass.data[DOMAIN]['last_data'] = live
+            for c, start, n in shares:
+                c._fire_delta(c._tracker.update(unique[start:start + n]), seeded=not quiet and bool(c.data))
+            self._fire_watch(self.watch.update(unique, store), seeded=not quiet and bool(self.data))
+        # The other entries' global sensors show totals across all entries
+        for c in coordinators:
+            if c is not self and c.data:
+                c.async_update_listeners()
+
+    async def async_republish(self) -> None:
+        """Re-index the shared stores without firing events, e.g. after another entry unloaded."""
+        await self._async_publish(quiet=True)
+
+    @callback
+    def _snapshot_data(self) -> dict:
+        good = [self._good[u] for u in (f.get('url') for f in self._feeds) if u in self._good]
+        return build_snapshot(good, self._http_cache, self.hass.data[DOMAIN]['geometry'], time.time())
+
+    @callback
+    def diagnostics_data(self) -> dict:
+        """Per-feed metrics, schedule and validators for the config entry diagnostics download."""
+        metrics = self.metrics.as_dict()
+        simplification = self.hass.data[DOMAIN]['geometry'].simplify_stats()
+        feeds = []
+        for f in self._feeds:
+            url = f.get('url') or ''
+            slug = slug_from_url(url)
+            http = self._http_cache.get(url) or {}
+            feeds.append({
+                'slug': slug,
+                'url': url,
+                'format': f.get('format'),
+                'poll_interval': int(self._scheduler.interval(url)),
+                'failures': self.hass.data[DOMAIN]['failures'].get(slug, 0),
+                'http': {k: http.get(k) for k in ('etag', 'last_modified', 'max_age')},
+                'metrics': metrics['feeds'].get(url),
+                'simplification': simplification.get(url),
+            })
+        return {
+            'parse_executor': self._parser.mode,
+            'refresh': metrics['refresh'],
+            'last_delta': self.last_delta.counts(),
+            'alerts': len(self.alerts),
+            'dedup': self.dedup.stats(),
+            'lifecycle': self.lifecycle.stats(),
+            'watch': self.watch.stats(),
+            'geometry_areas': len(self.hass.data[DOMAIN]['geometry']),
+            'simplify_tolerance_m': self.hass.data[DOMAIN]['geometry'].tolerance_m,
+            'feeds': feeds,
+        }
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = (urlparse(url).hostname or '').lower()
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = self._host_limits[host] = asyncio.Semaphore(MAX_FETCHES_PER_HOST)
+        return sem
+
+    async def _async_get_parsed(self, sess: aiohttp.ClientSession, slug: str, url: str, fmt: str) -> dict:
+        """Fetch and parse one feed, reusing the cached parse when the feed has not changed.
+
+        Sends the stored ETag/Last-Modified validators; on 304 the previous parse is reused.
+        Servers without validators fall back to a SHA-256 of the body to skip re-parsing.
+        """
+        cache = self._http_cache.get(url) or {}
+        headers = {}
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache['last_modified']
+        # Per-host cap first so feeds queued behind a busy host do not hold global slots
+        metrics = self.metrics.feed(url)
+        async with self._host_semaphore(url or ''), self._fetch_limit:
+            # Latency excludes time queued behind the concurrency limits
+            t0 = time.perf_counter()
+            async with sess.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT)) as resp:
+                max_age = freshness_lifetime(resp.headers)
+                if resp.status == 304 and cache.get('parsed') is not None:
+                    cache['max_age'] = max_age
+                    fetch_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+                    metrics.record_fetch(fetch_ms, 'not_modified')
+                    parsed = _reuse_parsed(cache['parsed'], 'not_modified')
+                    parsed['features']['fetch_ms'] = fetch_ms
+                    return parsed
+                resp.raise_for_status()
+                body = await resp.read()
+                fetch_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+                encoding = resp.get_encoding()
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+                # aiohttp has already decompressed `body`; Content-Length is the size on the wire
+                wire = resp.headers.get('Content-Length')
+                compression = resp.headers.get('Content-Encoding')
+        # Hashing, decoding and parsing run in the worker pool so large feeds never block the loop
+        previous_hash = cache.get('body_hash') if cache.get('parsed') is not None else None
+        job = await self._parser.async_run(decode_and_parse, body, encoding, fmt, previous_hash)
+        body_hash = job['body_hash']
+        if job['parsed'] is None:
+            parsed = _reuse_parsed(cache['parsed'], 'unchanged')
+        else:
+            parsed = job['parsed']
+            parsed.setdefault('features', {})['cache'] = 'miss'
+            # Records already held for another feed are shared rather than stored twice
+            self.dedup.intern(parsed.setdefault('alerts', []))
+        parsed['features']['parse_ms'] = round(job['parse_s'] * 1000.0, 1)
+        parsed['features']['fetch_ms'] = fetch_ms
+        metrics.record_fetch(
+            fetch_ms,
+            parsed['features']['cache'],
+            body_bytes=len(body),
+            wire_bytes=int(wire) if wire and wire.isdigit() else None,
+            compression=compression,
+            parse_ms=parsed['features']['parse_ms'],
+        )
+        self._http_cache[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'max_age': max_age,
+            # Keep a pristine copy; callers annotate the returned features dict
+            'parsed': {'alerts': parsed.get('alerts', []), 'features': dict(parsed.get('features', {}))},
+        }
+        return parsed
+
+    async def _async_fetch_feed(self, sess: aiohttp.ClientSession, f: dict) -> dict:
+        url = f.get('url')
+        fmt = (f.get('format') or 'cap').lower()
+        slug = slug_from_url(url or '')
+        failures = self.hass.data[DOMAIN]['failures'].get(slug, 0)
+        if failures >= MAX_FEED_FAILURES:
+            # Disabled due to repeated failures
+            return {'feed': f, 'slug': slug, 'alerts': [], 'features': {'error': 'feed_disabled_due_to_failures'}}
+        try:
+            parsed = await self._async_get_parsed(sess, slug, url, fmt)
+            alerts = parsed.get('alerts', [])
+            features = parsed.get('features', {})
+            warn = not (features.get('has_polygons') or features.get('has_circles') or features.get('has_points'))
+            if warn:
+                features['warning'] = 'Feed appears to lack geometry (polygons/circles/points)'
+                # Raise Repairs issue to inform the user explicitly
+                raise_issue(self.hass, f"{ISSUE_FEED_NO_GEOMETRY_PREFIX}{slug}", translation_key="feed_no_geometry", placeholders={"slug": slug, "url": url}, fixable=False)
+            # Track empty alerts and raise Repairs issue if persistently empty (usefulness impacted)
+            if isinstance(alerts, list) and not alerts and not features.get('error'):
+                empties = self.hass.data[DOMAIN]['empty_alerts'].get(slug, 0) + 1
+                self.hass.data[DOMAIN]['empty_alerts'][slug] = empties
+                if empties >= EMPTY_ALERTS_THRESHOLD:
+                    raise_issue(self.hass, f"{ISSUE_FEED_NO_CONTENT_PREFIX}{slug}", translation_key="feed_no_content", placeholders={"slug": slug, "url": url}, fixable=False)
+            else:
+                # Reset when we have content or an error handled elsewhere
+                self.hass.data[DOMAIN]['empty_alerts'][slug] = 0
+            return {'feed': f, 'slug': slug, 'alerts': alerts, 'features': features}
+        except Exception:
+            self.metrics.feed(url).record_error()
+            # Re-read the counter: other feeds on the same host may have been fetched concurrently
+            failures = self.hass.data[DOMAIN]['failures'].get(slug, 0) + 1
+            self.hass.data[DOMAIN]['failures'][slug] = failures
+            features = {'error': 'fetch_failed', 'failures': failures}
+            if failures >= MAX_FEED_FAILURES:
+                # Raise Repairs issue once feed is disabled
+                raise_issue(self.hass, f"{ISSUE_FEED_DISABLED_PREFIX}{slug}", translation_key="feed_disabled", placeholders={"slug": slug, "url": url}, fixable=True)
+                features['error'] = 'feed_disabled_due_to_failures'
+            return {'feed': f, 'slug': slug, 'alerts': [], 'features': features}
 
     async def _async_update_data(self):
-        results = []
-        async with aiohttp.ClientSession() as sess:
-            for f in self._feeds:
-                url = f.get('url')
-                fmt = (f.get('format') or 'cap').lower()
-                slug = slug_from_url(url or '')
-                failures = self.hass.data[DOMAIN]['failures'].get(slug, 0)
-                if failures >= MAX_FEED_FAILURES:
-                    # Disabled due to repeated failures
-                    results.append({'feed': f, 'slug': slug, 'alerts': [], 'features': {'error': 'feed_disabled_due_to_failures'}})
-                    continue
-                try:
-                    async with sess.get(url, timeout=20) as resp:
-                        text = await resp.text()
-                        parsed = parse_feed(text, fmt)
-                        alerts = parsed.get('alerts', [])
-                        features = parsed.get('features', {})
-                        warn = not (features.get('has_polygons') or features.get('has_circles') or features.get('has_points'))
-                        if warn:
-                            features['warning'] = 'Feed appears to lack geometry (polygons/circles/points)'
-                            # Raise Repairs issue to inform the user explicitly
-                            raise_issue(self.hass, f"{ISSUE_FEED_NO_GEOMETRY_PREFIX}{slug}", translation_key="feed_no_geometry", placeholders={"slug": slug, "url": url}, fixable=False)
-                        # Track empty alerts and raise Repairs issue if persistently empty (usefulness impacted)
-                        if isinstance(alerts, list) and not alerts and not features.get('error'):
-                            empties = self.hass.data[DOMAIN]['empty_alerts'].get(slug, 0) + 1
-                            self.hass.data[DOMAIN]['empty_alerts'][slug] = empties
-                            if empties >= EMPTY_ALERTS_THRESHOLD:
-                                raise_issue(self.hass, f"{ISSUE_FEED_NO_CONTENT_PREFIX}{slug}", translation_key="feed_no_content", placeholders={"slug": slug, "url": url}, fixable=False)
-                        else:
-                            # Reset when we have content or an error handled elsewhere
-                            self.hass.data[DOMAIN]['empty_alerts'][slug] = 0
-                        results.append({'feed': f, 'slug': slug, 'alerts': alerts, 'features': features})
-                except Exception:
-                    failures += 1
-                    self.hass.data[DOMAIN]['failures'][slug] = failures
-                    features = {'error': 'fetch_failed', 'failures': failures}
-                    if failures >= MAX_FEED_FAILURES:
-                        # Raise Repairs issue once feed is disabled
-                        raise_issue(self.hass, f"{ISSUE_FEED_DISABLED_PREFIX}{slug}", translation_key="feed_disabled", placeholders={"slug": slug, "url": url}, fixable=True)
-                        features['error'] = 'feed_disabled_due_to_failures'
-                    results.append({'feed': f, 'slug': slug, 'alerts': [], 'features': features})
-        self.hass.data[DOMAIN]['last_data'] = results
+        # HA's shared session keeps keep-alive connections, DNS cache and TLS sessions across refreshes
+        sess = async_get_clientsession(self.hass)
+        previous = {(r.get('feed') or {}).get('url'): r for r in (self.data or [])}
+        now = time.monotonic()
+        t_start = time.perf_counter()
+        fetched = 0
+
+        async def refresh(f: dict) -> dict:
+            nonlocal fetched
+            url = f.get('url') or ''
+            if url in previous and not self._scheduler.is_due(url, now):
+                return previous[url]
+            fetched += 1
+            result = await self._async_fetch_feed(sess, f)
+            features = result.get('features') or {}
+            kept = previous.get(url)
+            if features.get('error') and kept is not None and (kept.get('features') or {}).get('stale'):
+                # Keep serving restored alerts (still stale) while the feed is unreachable
+                features = dict(kept['features'], **features)
+                result = dict(kept, features=features)
+            self._scheduler.record(
+                url,
+                time.monotonic(),
+                changed=features.get('cache') == 'miss',
+                urgent=has_urgent_alerts(result.get('alerts') or []),
+                max_age=(self._http_cache.get(url) or {}).get('max_age'),
+                failed=bool(features.get('error')),
+            )
+            features['poll_interval'] = int(self._scheduler.interval(url))
+            if not features.get('error'):
+                self.metrics.feed(url).record_alerts(result.get('alerts') or [])
+            return result
+
+        # Fetch all due feeds concurrently; refresh time follows the slowest feed rather than the sum.
+        # gather() keeps results in configured feed order. The loop-block monitor also covers the
+        # on-loop post-processing below, not just the fetches.
+        async with LoopBlockMonitor() as loop_block:
+            results = list(await asyncio.gather(*(refresh(f) for f in self._feeds)))
+            # Only live alerts go further: superseded, cancelled and expired records leave the working set
+            live = self.lifecycle.update(results, time.time())
+            # Nothing polled and nothing expired: entities would only rewrite identical state. A tick
+            # after a failed refresh still updates them, so they become available again.
+            self._idle = not fetched and self.last_update_success and live is self._live
+            if live is not self._live:
+                self._live = live
+                await self._async_publish()
+        wall_ms = (time.perf_counter() - t_start) * 1000.0
+        self.metrics.record_refresh(wall_ms, loop_block.total_ms, loop_block.max_ms, fetched)
+        self.hass.data[DOMAIN]['loop_block'] = {
+            'parse_executor': self._parser.mode,
+            'total_ms': round(loop_block.total_ms, 1),
+            'max_ms': round(loop_block.max_ms, 1),
+            'refresh_ms': round(wall_ms, 1),
+        }
+        changed = False
+        for r in results:
+            features = r.get('features') or {}
+            url = (r.get('feed') or {}).get('url')
+            if url and not features.get('error') and self._good.get(url) is not r:
+                changed = changed or features.get('cache') == 'miss' or url not in self._good or (self._good[url].get('features') or {}).get('stale')
+                self._good[url] = r
+        if changed:
+            # Coalesced write; Store also flushes pending saves when HA stops
+            self._snapshot.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
         return results
 
-class CAPFeedSensor(SensorEntity):
+    @callback
+    def async_update_listeners(self) -> None:
+        # Most ticks poll no feed (SCAN_INTERVAL is the scheduler tick); skip their state writes
+        if self._idle:
+            self._idle = False
+            return
+        super().async_update_listeners()
+
+    def _fire_delta(self, delta: AlertDelta, seeded: bool) -> None:
+        # The first refresh seeds the tracker; announcing every active alert after a restart is noise
+        if not seeded:
+            self.last_delta = AlertDelta()
+            return
+        self.last_delta = delta
+        for event_type, records in ((EVENT_ALERT_ADDED, delta.added), (EVENT_ALERT_UPDATED, delta.updated), (EVENT_ALERT_REMOVED, delta.removed)):
+            for record in records:
+                self.hass.bus.async_fire(event_type, record)
+        self.hass.data[DOMAIN]['last_delta'] = delta.counts()
+
+    def _fire_watch(self, delta: WatchDelta, seeded: bool) -> None:
+        # Same as _fire_delta: after a restart, watchpoints only pick up their current matches
+        if not seeded:
+            return
+        for event_type, data in watch_events(self.watch, delta):
+            self.hass.bus.async_fire(event_type, data)
+
+def _reuse_parsed(parsed: dict, cache_state: str) -> dict:
+    features = dict(parsed.get('features', {}))
+    features['cache'] = cache_state
+    return {'alerts': parsed.get('alerts', []), 'features': features}
+
+class CAPFeedSensor(CoordinatorEntity, SensorEntity):
+    # Feed metadata and per-refresh diagnostics change often and are not useful history
+    _unrecorded_attributes = frozenset({'feed', 'features'})
+
     def __init__(self, hass: HomeAssistant, coordinator: CAPCoordinator, slug: str, feed: dict):
+        super().__init__(coordinator)
         self.hass = hass
-        self.coordinator = coordinator
         self._slug = slug
         self._feed = feed
         self._attr_name = f"CAP {slug} Alert Count"
@@ -87,19 +437,24 @@ class CAPFeedSensor(SensorEntity):
 
     @property
     def native_value(self):
-        data = next((r for r in (self.coordinator.data or []) if r.get('slug') == self._slug), None)
-        alerts = data.get('alerts') if data else []
-        return len(alerts) if isinstance(alerts, list) else 0
+        summary = self.coordinator.alerts.summary_for_slug(self._slug)
+        return summary['count'] if summary else 0
 
     @property
     def extra_state_attributes(self):
-        data = next((r for r in (self.coordinator.data or []) if r.get('slug') == self._slug), None)
+        data = self.coordinator.alerts.result_for_slug(self._slug)
         if not data:
             return {}
+        # Bounded summary only; full records come from the cap_alerts.get_alerts service
+        summary = self.coordinator.alerts.summary_for_slug(self._slug)
         return {
             'feed': data.get('feed'),
             'features': data.get('features'),
-            'alerts': data.get('alerts')
+            # True while showing alerts restored from the snapshot, before the first live fetch
+            'stale': bool((data.get('features') or {}).get('stale')),
+            'severity_counts': summary['severity_counts'],
+            'highest_severity': summary['highest_severity'],
+            'newest_headline': summary['newest_headline'],
         }
 
     @property
@@ -107,25 +462,82 @@ class CAPFeedSensor(SensorEntity):
         failures = self.hass.data[DOMAIN].get('failures', {}).get(self._slug, 0)
         return failures < MAX_FEED_FAILURES
 
-class CAPGlobalSensor(SensorEntity):
+class CAPGlobalSensor(CoordinatorEntity, SensorEntity):
     _attr_name = "CAP All Alert Count"
     _attr_unique_id = "cap_all_alert_count"
+    _unrecorded_attributes = frozenset({'feed_counts'})
+
     def __init__(self, hass: HomeAssistant, coordinator: CAPCoordinator):
+        super().__init__(coordinator)
         self.hass = hass
-        self.coordinator = coordinator
 
     @property
     def native_value(self):
-        total = 0
-        for r in self.coordinator.data or []:
-            a = r.get('alerts')
-            if isinstance(a, list):
-                total += len(a)
-        return total
+        return self.coordinator.alerts.total['count']
 
     @property
     def extra_state_attributes(self):
+        results = self.coordinator.alerts.results
+        summary = self.coordinator.alerts.total
         return {
-            'feeds': [r.get('feed') for r in (self.coordinator.data or [])],
-            'raw': self.coordinator.data or []
+            'feed_count': len(results),
+            'feed_counts': {r.get('slug'): len(r.get('alerts') or []) for r in results},
+            'stale': any((r.get('features') or {}).get('stale') for r in results),
+            'severity_counts': summary['severity_counts'],
+            'highest_severity': summary['highest_severity'],
+            'newest_headline': summary['newest_headline'],
         }
+
+class CAPFeedLatencySensor(CoordinatorEntity, SensorEntity):
+    """Opt-in diagnostic: last fetch latency of one feed, with its other fetch metrics as attributes."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({
+        'p50_latency_ms', 'p95_latency_ms', 'bytes', 'wire_bytes', 'compression', 'parse_ms', 'alert_count',
+        'vertex_count', 'not_modified_ratio', 'cache_hit_ratio', 'seconds_since_change', 'seconds_since_fetch',
+        'fetches', 'errors',
+    })
+
+    def __init__(self, coordinator: CAPCoordinator, slug: str, url: str):
+        super().__init__(coordinator)
+        self._url = url
+        self._attr_name = f"CAP {slug} Fetch Latency"
+        # Keyed by URL hash: feeds on one host share a slug
+        self._attr_unique_id = f"cap_{slug}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}_fetch_latency"
+
+    @property
+    def native_value(self):
+        m = self.coordinator.metrics.feeds.get(self._url)
+        return m.last_latency_ms if m else None
+
+    @property
+    def extra_state_attributes(self):
+        m = self.coordinator.metrics.feeds.get(self._url)
+        if m is None:
+            return {}
+        attrs = m.as_dict()
+        attrs.pop('last_latency_ms', None)
+        return attrs
+
+class CAPRefreshTimeSensor(CoordinatorEntity, SensorEntity):
+    """Opt-in diagnostic: wall time of the last refresh and how long it blocked the event loop."""
+    _attr_name = "CAP Refresh Time"
+    _attr_unique_id = "cap_refresh_time"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({'loop_block_ms', 'loop_block_max_ms', 'feeds_fetched', 'p50_wall_ms', 'p95_wall_ms', 'at'})
+
+    def __init__(self, coordinator: CAPCoordinator):
+        super().__init__(coordinator)
+
+    @property
+    def native_value(self):
+        return self.coordinator.metrics.last_refresh.get('wall_ms')
+
+    @property
+    def extra_state_attributes(self):
+        attrs = self.coordinator.metrics.refresh_dict()
+        attrs.pop('wall_ms', None)
+        return attrs
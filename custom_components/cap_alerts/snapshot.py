@@ -0,0 +1,117 @@
+from __future__ import annotations
+import base64
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+from .geometry import AreaGeometry, GeometryStore, Ring, _record_geometry, alert_keys, feed_url
+
+# Bump when the layout below changes; older snapshots are then ignored (one cold start)
+SNAPSHOT_FORMAT = 3
+
+# Validator fields kept from the coordinator's per-feed HTTP cache
+_HTTP_FIELDS = ('etag', 'last_modified', 'body_hash', 'max_age')
+
+def _pack(coords: array) -> str:
+    if sys.byteorder != 'little':
+        coords = array('d', coords)
+        coords.byteswap()
+    return base64.b64encode(coords.tobytes()).decode('ascii')
+
+def _unpack(text: str) -> array:
+    coords = array('d')
+    coords.frombytes(base64.b64decode(text))
+    if sys.byteorder != 'little':
+        coords.byteswap()
+    return coords
+
+def encode_area(geom: AreaGeometry | None) -> Dict[str, Any] | None:
+    """Compact JSON-safe form: ring coordinates as base64 little-endian doubles with their
+    precomputed bbox/centroid/radius (null if never computed) and simplified ring, so restoring
+    does no parsing or geometry work."""
+    if geom is None:
+        return None
+    return {
+        'r': [
+            [_pack(r.coords), r.min_lat, r.min_lon, r.max_lat, r.max_lon, r.clat, r.clon, r._radius_km,
+             _pack(r.fast) if r.fast is not None else None, r.kx, r.band]
+            for r in geom.rings
+        ],
+        'c': [list(c) for c in geom.circles],
+        's': [geom.min_lat, geom.min_lon, geom.max_lat, geom.max_lon, geom.clat, geom.clon, geom._radius_m],
+    }
+
+def decode_area(data: Dict[str, Any] | None) -> AreaGeometry | None:
+    if not data:
+        return None
+    rings = []
+    for coords, *scalars, fast, kx, band in data['r']:
+        ring = Ring.__new__(Ring)
+        ring.__setstate__((_unpack(coords), *scalars, _unpack(fast) if fast is not None else None, kx, band, 0, 0))
+        rings.append(ring)
+    geom = AreaGeometry.__new__(AreaGeometry)
+    geom.__setstate__((tuple(rings), tuple(tuple(c) for c in data['c']), *data['s']))
+    return geom
+
+def build_snapshot(results: Iterable[dict], http_cache: Dict[str, dict], geometry: GeometryStore, saved_at: float) -> Dict[str, Any]:
+    """JSON-serialisable snapshot of the last good results, validators and parsed geometry.
+
+    `results` should only hold successful feed results; only geometry still in use is kept.
+    """
+    feeds = []
+    for r in results:
+        url = (r.get('feed') or {}).get('url')
+        if not url:
+            continue
+        http = http_cache.get(url) or {}
+        feeds.append({
+            'feed': r.get('feed'),
+            'slug': r.get('slug'),
+            'alerts': r.get('alerts') or [],
+            'features': r.get('features') or {},
+            'http': {k: http.get(k) for k in _HTTP_FIELDS},
+        })
+    # Source strings are not stored: they are the alerts' own polygon/circle fields
+    areas = [[url, key[0], key[1], encode_area(geom)] for (url, key), _src, geom in geometry.cached()]
+    return {'format': SNAPSHOT_FORMAT, 'saved_at': saved_at, 'tolerance_m': geometry.tolerance_m, 'feeds': feeds, 'areas': areas}
+
+def restore_snapshot(data: Dict[str, Any] | None, urls: Iterable[str], tolerance_m: float = 0.0) -> Tuple[List[dict], Dict[str, dict], List[Tuple[Tuple[str, Tuple[str, int]], Tuple[Tuple[str, ...], Tuple[str, ...]], AreaGeometry | None]]]:
+    """Decode a snapshot for the currently configured feed `urls`.
+
+    Returns (results, http cache, geometry items for GeometryStore.preload()). Restored results
+    are marked stale. Each feed's cached parse shares its alert list with the restored result,
+    as after a live fetch, so a 304 on the first refresh is recognised as unchanged. Geometry
+    simplified with a different tolerance is not restored; it is rebuilt on the first refresh.
+    """
+    if not isinstance(data, dict) or data.get('format') != SNAPSHOT_FORMAT:
+        return [], {}, []
+    wanted = set(urls)
+    saved_at = data.get('saved_at')
+    results: List[dict] = []
+    http_cache: Dict[str, dict] = {}
+    for item in data.get('feeds') or []:
+        url = (item.get('feed') or {}).get('url')
+        if url not in wanted:
+            continue
+        alerts = item.get('alerts') or []
+        features = dict(item.get('features') or {})
+        http = dict(item.get('http') or {})
+        http['parsed'] = {'alerts': alerts, 'features': dict(features)}
+        http_cache[url] = http
+        features['stale'] = True
+        features['restored_from'] = saved_at
+        results.append({'feed': item.get('feed'), 'slug': item.get('slug'), 'alerts': alerts, 'features': features})
+    sources = {}
+    for r in results:
+        url = feed_url(r)
+        alerts = r['alerts']
+        for key, a in zip(alert_keys(alerts), alerts):
+            sources[(url, key)] = _record_geometry(a)
+    areas = []
+    if data.get('tolerance_m', 0.0) != tolerance_m:
+        return results, http_cache, areas
+    for url, ident, n, geom in data.get('areas') or []:
+        ref = (url, (ident, n))
+        src = sources.get(ref)
+        if src is not None:
+            areas.append((ref, src, decode_area(geom)))
+    return results, http_cache, areas
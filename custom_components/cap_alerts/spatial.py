@@ -0,0 +1,81 @@
+from __future__ import annotations
+import math
+from typing import Dict, Hashable, Iterator, List, Set, Tuple
+
+Box = Tuple[float, float, float, float]  # (min_lat, min_lon, max_lat, max_lon)
+
+class GridIndex:
+    """Uniform lat/lon grid over bounding boxes.
+
+    Each item is registered in every cell its box touches. Items spanning more than
+    `max_cells` cells (national warnings, large circles) go to a small always-checked list
+    instead, so one huge polygon cannot bloat the grid. Longitude wrap-around at ±180° is not
+    handled; boxes are expected not to straddle the antimeridian.
+    """
+
+    def __init__(self, cell_deg: float = 0.5, max_cells: int = 1024):
+        self._cell = cell_deg
+        self._max_cells = max_cells
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._boxes: Dict[Hashable, Box] = {}
+        self._item_cells: Dict[Hashable, List[Tuple[int, int]]] = {}
+        self._large: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._boxes
+
+    def _span(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Tuple[int, int, int, int]:
+        c = self._cell
+        return (
+            math.floor((max(-90.0, min_lat) + 90.0) / c),
+            math.floor((max(-180.0, min_lon) + 180.0) / c),
+            math.floor((min(90.0, max_lat) + 90.0) / c),
+            math.floor((min(180.0, max_lon) + 180.0) / c),
+        )
+
+    def insert(self, item: Hashable, box: Box) -> None:
+        if item in self._boxes:
+            self.remove(item)
+        self._boxes[item] = box
+        r0, c0, r1, c1 = self._span(*box)
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > self._max_cells:
+            self._large.add(item)
+            self._item_cells[item] = []
+            return
+        cells = [(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(item)
+        self._item_cells[item] = cells
+
+    def remove(self, item: Hashable) -> None:
+        if self._boxes.pop(item, None) is None:
+            return
+        self._large.discard(item)
+        for cell in self._item_cells.pop(item, []):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self._cells[cell]
+
+    def query(self, box: Box) -> Iterator[Hashable]:
+        """Items whose box overlaps `box` (e.g. geometry.search_box() around a point)."""
+        s_min_lat, s_min_lon, s_max_lat, s_max_lon = box
+        r0, c0, r1, c1 = self._span(s_min_lat, s_min_lon, s_max_lat, s_max_lon)
+        seen: Set[Hashable] = set()
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > self._max_cells:
+            candidates = self._boxes.keys()
+        else:
+            candidates = [it for r in range(r0, r1 + 1) for c in range(c0, c1 + 1) for it in self._cells.get((r, c), ())]
+            candidates.extend(self._large)
+        for item in candidates:
+            if item in seen:
+                continue
+            seen.add(item)
+            b0, b1, b2, b3 = self._boxes[item]
+            # Box overlap test between the item box and the search box
+            if b0 <= s_max_lat and b2 >= s_min_lat and b1 <= s_max_lon and b3 >= s_min_lon:
+                yield item
@@ -0,0 +1,69 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+# CAP <severity> values, most severe first
+SEVERITIES = ('Extreme', 'Severe', 'Moderate', 'Minor', 'Unknown')
+SEVERITY_RANK = {s: n for n, s in enumerate(SEVERITIES)}
+
+# Alert record fields holding raw geometry strings; left out of responses unless asked for
+GEOMETRY_FIELDS = ('polygon', 'circle', 'polygons', 'circles')
+
+def parse_time(value: str | None) -> float | None:
+    """CAP/Atom timestamp (ISO 8601, 'Z' or offset) -> POSIX seconds; None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+def normalize_severity(value: str | None) -> str:
+    v = (value or '').strip().capitalize()
+    return v if v in SEVERITY_RANK else 'Unknown'
+
+def summarize_alerts(alerts: Iterable[dict]) -> Dict[str, Any]:
+    """Bounded summary for entity attributes: count, counts by severity, highest severity and
+    the newest headline (by `sent`)."""
+    counts = {s: 0 for s in SEVERITIES}
+    total = 0
+    newest = None
+    newest_t = None
+    for a in alerts:
+        total += 1
+        counts[normalize_severity(a.get('severity'))] += 1
+        t = parse_time(a.get('sent'))
+        if newest is None or (t is not None and (newest_t is None or t > newest_t)):
+            newest, newest_t = a, t
+    highest = next((s for s in SEVERITIES if counts[s]), None)
+    return {
+        'count': total,
+        'severity_counts': counts,
+        'highest_severity': highest,
+        'newest_headline': (newest or {}).get('headline') or None,
+        'newest_sent': (newest or {}).get('sent') or None,
+    }
+
+def merge_summaries(summaries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-feed summaries without revisiting the alerts."""
+    counts = {s: 0 for s in SEVERITIES}
+    total = 0
+    newest: Dict[str, Any] = {}
+    newest_t = None
+    for s in summaries:
+        total += s['count']
+        for k, v in s['severity_counts'].items():
+            counts[k] += v
+        t = parse_time(s.get('newest_sent'))
+        if s.get('newest_headline') and (not newest or (t is not None and (newest_t is None or t > newest_t))):
+            newest, newest_t = s, t
+    return {
+        'count': total,
+        'severity_counts': counts,
+        'highest_severity': next((s for s in SEVERITIES if counts[s]), None),
+        'newest_headline': newest.get('newest_headline'),
+        'newest_sent': newest.get('newest_sent'),
+    }
+
+def strip_geometry(alert: dict) -> dict:
+    return {k: v for k, v in alert.items() if k not in GEOMETRY_FIELDS}
@@ -0,0 +1,286 @@
+from __future__ import annotations
+import math
+from typing import Any, Dict, List, Set, Tuple
+from .const import DEFAULT_WATCH_RADIUS_KM, EVENT_WATCHPOINT_MATCH, EVENT_WATCHPOINT_UNMATCH
+from .const import WATCH_MIN_MOVE_KM, WATCH_HYSTERESIS_KM, WATCH_CELL_DEG
+from .diff import compact
+from .geometry import AreaGeometry, GeometryStore, alert_keys, distance_km, search_box
+from .spatial import GridIndex
+
+AreaRef = Tuple[str, Tuple[str, int]]  # (feed url, geometry.alert_keys() key)
+
+class Watchpoint:
+    """A registered location: fixed lat/lon, or an entity (`zone.*`, `person.*`, `device_tracker.*`)
+    whose position is followed. `lat`/`lon` are None until an entity reports a location."""
+    __slots__ = ('id', 'lat', 'lon', 'radius_km', 'entity_id')
+
+    def __init__(self, wp_id: str, lat: float | None = None, lon: float | None = None, radius_km: float = DEFAULT_WATCH_RADIUS_KM, entity_id: str | None = None):
+        self.id = wp_id
+        self.lat = lat
+        self.lon = lon
+        self.radius_km = radius_km
+        self.entity_id = entity_id
+
+    @property
+    def located(self) -> bool:
+        return self.lat is not None and self.lon is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'id': self.id, 'lat': self.lat, 'lon': self.lon, 'radius_km': self.radius_km, 'entity_id': self.entity_id}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Watchpoint':
+        lat, lon = data.get('lat'), data.get('lon')
+        return cls(
+            str(data['id']),
+            float(lat) if lat is not None else None,
+            float(lon) if lon is not None else None,
+            float(data.get('radius_km', DEFAULT_WATCH_RADIUS_KM)),
+            data.get('entity_id') or None,
+        )
+
+class WatchDelta:
+    """Alerts that started or stopped matching, per watchpoint id (compact event payloads)."""
+    __slots__ = ('matched', 'unmatched')
+
+    def __init__(self):
+        self.matched: Dict[str, List[dict]] = {}
+        self.unmatched: Dict[str, List[dict]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.matched or self.unmatched)
+
+    def counts(self) -> Dict[str, int]:
+        return {'matched': sum(map(len, self.matched.values())), 'unmatched': sum(map(len, self.unmatched.values()))}
+
+class WatchEngine:
+    """Standing match state between registered watchpoints and alert areas.
+
+    Watchpoints sit in a grid index by their search box (point ± radius). On each refresh only
+    areas that are new or whose geometry changed are tested, against the watchpoints near them,
+    so the work follows the changed alerts rather than alerts × watchpoints. Feeds whose alert
+    list is the same object as last time are skipped; feeds missing from the results are
+    dropped, as in diff.AlertTracker.
+
+    Moving watchpoints go through move(): small movements are ignored, the areas it already
+    matches are checked first with a hysteresis margin (no flapping at polygon edges), and the
+    candidate areas are looked up once per coarse cell and reused until the alerts change, so a
+    location update costs about the same however many alerts are active.
+    """
+
+    def __init__(self, min_move_km: float = WATCH_MIN_MOVE_KM, hysteresis_km: float = WATCH_HYSTERESIS_KM, cell_deg: float = WATCH_CELL_DEG):
+        self._min_move_km = min_move_km
+        self._hysteresis_km = hysteresis_km
+        self._cell_deg = cell_deg
+        self._points: Dict[str, Watchpoint] = {}
+        self._index = GridIndex()
+        # feed url -> (alert list last seen, {key: (feed result, record, geometry)})
+        self._feeds: Dict[str, Tuple[List[dict], Dict[Tuple[str, int], Tuple[dict, dict, AreaGeometry | None]]]] = {}
+        # area -> ids of the watchpoints it currently matches, and the reverse
+        self._hits: Dict[AreaRef, Set[str]] = {}
+        self._matches: Dict[str, Set[AreaRef]] = {}
+        # Bumped whenever update() re-links a feed; invalidates the per-watchpoint candidate cache
+        self._generation = 0
+        # watchpoint id -> (generation, cell, radius_km, {area: geometry} near that cell)
+        self._candidates: Dict[str, Tuple[int, Tuple[int, int], float, Dict[AreaRef, AreaGeometry]]] = {}
+        self._moves = {'moves': 0, 'skipped': 0, 'cell_hits': 0, 'tests': 0}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, wp_id: str) -> bool:
+        return wp_id in self._points
+
+    def watchpoints(self) -> List[Watchpoint]:
+        return list(self._points.values())
+
+    def get(self, wp_id: str) -> Watchpoint | None:
+        return self._points.get(wp_id)
+
+    def match_count(self, wp_id: str) -> int:
+        return len(self._matches.get(wp_id, ()))
+
+    def matches(self, wp_id: str) -> List[dict]:
+        """Compact payloads of the alerts a watchpoint currently matches, in feed order."""
+        refs = self._matches.get(wp_id)
+        if not refs:
+            return []
+        return [compact(r, a) for url, (_alerts, state) in self._feeds.items() for key, (r, a, _g) in state.items() if (url, key) in refs]
+
+    def update(self, results: List[dict], store: GeometryStore) -> WatchDelta:
+        """Re-test the areas of changed feeds; `store` must already hold this refresh's geometry.
+
+        Feeds missing from `results` are dropped and their matches end. A failed feed arrives with the alerts AlertLifecycle kept for it, so its matches stand
+        until those alerts expire.
+        """
+        delta = WatchDelta()
+        for r in results:
+            url = (r.get('feed') or {}).get('url') or r.get('slug')
+            alerts = r.get('alerts')
+            if not isinstance(alerts, list):
+                continue
+            prev = self._feeds.get(url)
+            if prev is not None and prev[0] is alerts:
+                continue
+            old = prev[1] if prev is not None else {}
+            self._generation += 1
+            geoms = store.areas(url)
+            state = {}
+            for key, a in zip(alert_keys(alerts), alerts):
+                geom = geoms.get(key)
+                state[key] = (r, a, geom)
+                hit = old.get(key)
+                # Geometry is cached by source strings, so the same object means the same area
+                if hit is None or hit[2] is not geom:
+                    self._retest_area((url, key), r, a, geom, delta)
+            self._feeds[url] = (alerts, state)
+            for key in old.keys() - state.keys():
+                _r, _a, _g = old[key]
+                self._retest_area((url, key), _r, _a, None, delta)
+        current = {(r.get('feed') or {}).get('url') or r.get('slug') for r in results}
+        for url in [u for u in self._feeds if u not in current]:
+            self._generation += 1
+            for key, (_r, _a, _g) in self._feeds.pop(url)[1].items():
+                self._retest_area((url, key), _r, _a, None, delta)
+        return delta
+
+    def place(self, wp: Watchpoint, store: GeometryStore) -> WatchDelta:
+        """Add, replace or move a watchpoint and re-test it against the alerts near it."""
+        delta = WatchDelta()
+        self._points[wp.id] = wp
+        self._index.remove(wp.id)
+        self._candidates.pop(wp.id, None)
+        now: Set[AreaRef] = set()
+        if wp.located:
+            self._index.insert(wp.id, search_box(wp.lat, wp.lon, wp.radius_km))
+            for ref, _r, _a, geom in store.query_keyed(wp.lat, wp.lon, wp.radius_km):
+                if ref[0] in self._feeds and ref[1] in self._feeds[ref[0]][1] and geom.matches(wp.lat, wp.lon, wp.radius_km):
+                    now.add(ref)
+        before = self._matches.get(wp.id, set())
+        for ref in now - before:
+            self._hits.setdefault(ref, set()).add(wp.id)
+            delta.matched.setdefault(wp.id, []).append(self._payload(ref))
+        for ref in before - now:
+            self._unhit(ref, wp.id)
+            delta.unmatched.setdefault(wp.id, []).append(self._payload(ref))
+        self._matches[wp.id] = now
+        return delta
+
+    def move(self, wp_id: str, lat: float, lon: float, store: GeometryStore) -> WatchDelta:
+        """Location update for a tracked watchpoint; cheap enough to call on every GPS fix."""
+        wp = self._points.get(wp_id)
+        if wp is None:
+            return WatchDelta()
+        if not wp.located:
+            wp.lat, wp.lon = lat, lon
+            return self.place(wp, store)
+        self._moves['moves'] += 1
+        if distance_km(wp.lat, wp.lon, lat, lon) < self._min_move_km:
+            self._moves['skipped'] += 1
+            return WatchDelta()
+        wp.lat, wp.lon = lat, lon
+        self._index.insert(wp.id, search_box(lat, lon, wp.radius_km))
+        candidates = self._near(wp, store)
+        before = self._matches.get(wp.id, set())
+        now: Set[AreaRef] = set()
+        tests = 0
+        # Areas it was already in first, with the wider radius: it must clearly leave to unmatch
+        for ref in before:
+            geom = candidates.get(ref)
+            tests += 1
+            if geom is not None and geom.matches(lat, lon, wp.radius_km + self._hysteresis_km):
+                now.add(ref)
+        box = search_box(lat, lon, wp.radius_km)
+        for ref, geom in candidates.items():
+            if ref in before or geom.min_lat > box[2] or geom.max_lat < box[0] or geom.min_lon > box[3] or geom.max_lon < box[1]:
+                continue
+            tests += 1
+            if geom.matches(lat, lon, wp.radius_km):
+                now.add(ref)
+        self._moves['tests'] += tests
+        delta = WatchDelta()
+        for ref in now - before:
+            self._hits.setdefault(ref, set()).add(wp.id)
+            delta.matched.setdefault(wp.id, []).append(self._payload(ref))
+        for ref in before - now:
+            self._unhit(ref, wp.id)
+            delta.unmatched.setdefault(wp.id, []).append(self._payload(ref))
+        self._matches[wp.id] = now
+        return delta
+
+    def _near(self, wp: Watchpoint, store: GeometryStore) -> Dict[AreaRef, AreaGeometry]:
+        """Areas that can match anywhere in the watchpoint's current cell, cached per cell."""
+        c = self._cell_deg
+        cell = (math.floor(wp.lat / c), math.floor(wp.lon / c))
+        hit = self._candidates.get(wp.id)
+        if hit is not None and hit[0] == self._generation and hit[1] == cell and hit[2] == wp.radius_km:
+            self._moves['cell_hits'] += 1
+            return hit[3]
+        reach = wp.radius_km + self._hysteresis_km
+        lo = search_box(cell[0] * c, cell[1] * c, reach)
+        hi = search_box((cell[0] + 1) * c, (cell[1] + 1) * c, reach)
+        box = (lo[0], min(lo[1], hi[1]), hi[2], max(lo[3], hi[3]))
+        near = {
+            ref: geom for ref, _r, _a, geom in store.query_box(box)
+            if ref[0] in self._feeds and ref[1] in self._feeds[ref[0]][1]
+        }
+        self._candidates[wp.id] = (self._generation, cell, wp.radius_km, near)
+        return near
+
+    def stats(self) -> Dict[str, int]:
+        return {'watchpoints': len(self._points), 'matches': sum(map(len, self._matches.values())), **self._moves}
+
+    def remove(self, wp_id: str) -> bool:
+        if self._points.pop(wp_id, None) is None:
+            return False
+        self._index.remove(wp_id)
+        self._candidates.pop(wp_id, None)
+        for ref in self._matches.pop(wp_id, set()):
+            self._unhit(ref, wp_id)
+        return True
+
+    def entity_ids(self) -> Set[str]:
+        return {wp.entity_id for wp in self._points.values() if wp.entity_id}
+
+    def _retest_area(self, ref: AreaRef, r: dict, a: dict, geom: AreaGeometry | None, delta: WatchDelta) -> None:
+        now: Set[str] = set()
+        if geom is not None:
+            for wp_id in self._index.query((geom.min_lat, geom.min_lon, geom.max_lat, geom.max_lon)):
+                wp = self._points[wp_id]
+                if geom.matches(wp.lat, wp.lon, wp.radius_km):
+                    now.add(wp_id)
+        before = self._hits.get(ref, set())
+        for wp_id in now - before:
+            self._matches.setdefault(wp_id, set()).add(ref)
+            delta.matched.setdefault(wp_id, []).append(compact(r, a))
+        for wp_id in before - now:
+            self._matches[wp_id].discard(ref)
+            delta.unmatched.setdefault(wp_id, []).append(compact(r, a))
+        if now:
+            self._hits[ref] = now
+        else:
+            self._hits.pop(ref, None)
+
+    def _unhit(self, ref: AreaRef, wp_id: str) -> None:
+        ids = self._hits.get(ref)
+        if ids is not None:
+            ids.discard(wp_id)
+            if not ids:
+                del self._hits[ref]
+
+    def _payload(self, ref: AreaRef) -> dict:
+        r, a, _g = self._feeds[ref[0]][1][ref[1]]
+        return compact(r, a)
+
+def watch_events(engine: WatchEngine, delta: WatchDelta) -> List[Tuple[str, Dict[str, Any]]]:
+    """(event type, data) pairs: one match and/or one unmatch event per watchpoint that changed."""
+    events = []
+    for event_type, per_point in ((EVENT_WATCHPOINT_MATCH, delta.matched), (EVENT_WATCHPOINT_UNMATCH, delta.unmatched)):
+        for wp_id, alerts in per_point.items():
+            wp = engine.get(wp_id)
+            data = wp.as_dict() if wp is not None else {'id': wp_id}
+            data['watchpoint'] = data.pop('id')
+            data['count'] = engine.match_count(wp_id)
+            data['alerts'] = alerts
+            events.append((event_type, data))
+    return events
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict
+from .const import PARSE_EXECUTOR_PROCESS
+from .parser import parse_feed
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+def decode_and_parse(body: bytes, encoding: str, fmt: str, previous_hash: str | None = None) -> Dict[str, Any]:
+    """Hash, decode and parse a feed body; runs in a worker thread or process.
+
+    Returns {'body_hash', 'parsed', 'parse_s'}; `parsed` is None when the body hash matches
+    `previous_hash` so the caller can reuse its cached parse.
+    """
+    t0 = time.perf_counter()
+    body_hash = hashlib.sha256(body).hexdigest()
+    if previous_hash and body_hash == previous_hash:
+        return {'body_hash': body_hash, 'parsed': None, 'parse_s': time.perf_counter() - t0}
+    parsed = parse_feed(body.decode(encoding or 'utf-8', errors='replace'), fmt)
+    return {'body_hash': body_hash, 'parsed': parsed, 'parse_s': time.perf_counter() - t0}
+
+class ParseExecutor:
+    """Run parsing jobs off the event loop.
+
+    Thread mode uses Home Assistant's shared executor. Process mode uses a small spawn-based
+    process pool so several large feeds can be parsed on separate cores; it is created lazily.
+    """
+
+    def __init__(self, hass: HomeAssistant, mode: str):
+        self._hass = hass
+        self._mode = mode
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    async def async_run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._mode == PARSE_EXECUTOR_PROCESS:
+            if self._pool is None:
+                # spawn, not fork: forking a threaded HA process can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return await self._hass.loop.run_in_executor(self._pool, func, *args)
+        return await self._hass.async_add_executor_job(func, *args)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+class LoopBlockMonitor:
+    """Measure how long the event loop is blocked while a block of work runs.
+
+    A probe task sleeps for `interval` seconds at a time; any extra delay before it wakes
+    is time the loop spent running something else without yielding.
+
+        async with LoopBlockMonitor() as mon:
+            ...
+        mon.total_ms, mon.max_ms
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self._interval)
+            lag = (loop.time() - t0 - self._interval) * 1000.0
+            if lag > 1.0:
+                # Sub-millisecond lag is scheduler noise
+                self.total_ms += lag
+                self.max_ms = max(self.max_ms, lag)
+
+    async def __aenter__(self) -> LoopBlockMonitor:
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        # Let the probe take its first timestamp before the monitored work starts
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        if self._task is not None:
+            # Give the probe one more wake-up so a block at the very end is still counted
+            await asyncio.sleep(self._interval)
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
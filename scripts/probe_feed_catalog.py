@@ -0,0 +1,214 @@
+"""
+Probe every feed in data/feed_catalog.json and record its health in the catalogue.
+
+What this does:
+- Fetches each catalogue URL with bounded asyncio concurrency (global and per host).
+- Records, under each feed's `health` key:
+    * `status`, `ok`, `error` (timeout / connection error / HTTP status)
+    * `responseMs` (time to full body), `bytes` (decoded body), `wireBytes` (Content-Length, if sent)
+    * `compression` (Content-Encoding, e.g. gzip/br), `contentType`
+    * `sniffedFormat` from the body: cap / atom / rss / json / html / unknown
+    * `alertCount`, `hasPolygons`, `hasCircles`, `hasPoints` — parsed with the integration's own
+      parser, so these are the same checks as the `features` the sensors report
+    * `checkedAt` (UTC ISO timestamp)
+- Sets `lastChecked` only for feeds that were actually contacted.
+- Writes the catalogue back and refreshes the bundled index used by the Config Flow.
+
+Run:
+    python scripts/probe_feed_catalog.py                    # probe and write data/feed_catalog.json
+    python scripts/probe_feed_catalog.py --dry-run --limit 20
+    python scripts/probe_feed_catalog.py --stub             # offline: probe the local stub server
+
+Requires:
+    pip install aiohttp
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import types
+from collections import Counter
+from datetime import date, datetime, timezone
+from urllib.parse import urlparse
+
+import aiohttp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+INTEGRATION_DIR = os.path.join(ROOT, "custom_components", "cap_alerts")
+
+def _load_parser():
+    # Import cap_alerts.parser without the HA-dependent package __init__
+    if "cap_alerts" not in sys.modules:
+        pkg = types.ModuleType("cap_alerts")
+        pkg.__path__ = [INTEGRATION_DIR]
+        sys.modules["cap_alerts"] = pkg
+    from cap_alerts import parser
+    return parser
+
+parser = _load_parser()
+
+USER_AGENT = "CAP-au-for-home-assistant catalogue prober"
+_RSS_ITEM = re.compile(rb"<item[\s>]", re.I)
+
+def sniff_format(body: bytes) -> str:
+    """Best guess at the document type from its first bytes, ignoring Content-Type."""
+    head = body[:4096].lstrip().lower()
+    if head.startswith(b"\xef\xbb\xbf"):
+        head = head[3:].lstrip()
+    if head[:1] in (b"{", b"["):
+        return "json"
+    if b"<html" in head or head.startswith(b"<!doctype html"):
+        return "html"
+    if b"<rss" in head or b"<rdf:rdf" in head:
+        return "rss"
+    if b"<feed" in head and b"http://www.w3.org/2005/atom" in head:
+        return "atom"
+    if b"urn:oasis:names:tc:emergency:cap" in head or b"<alert" in head:
+        return "cap"
+    return "unknown"
+
+def content_metrics(body: bytes, sniffed: str) -> dict:
+    """Alert count and geometry presence, using parser.parse_feed like the coordinator does."""
+    if sniffed == "rss":
+        # RSS indexes link to CAP documents; count items, geometry is not inline
+        return {"alertCount": len(_RSS_ITEM.findall(body)), "hasPolygons": False, "hasCircles": False, "hasPoints": False}
+    if sniffed not in ("cap", "atom", "json"):
+        return {"alertCount": 0, "hasPolygons": False, "hasCircles": False, "hasPoints": False}
+    try:
+        parsed = parser.parse_feed(body.decode("utf-8", errors="replace"), sniffed)
+    except Exception:
+        return {"alertCount": 0, "hasPolygons": False, "hasCircles": False, "hasPoints": False, "parseError": True}
+    features = parsed.get("features") or {}
+    return {
+        "alertCount": len(parsed.get("alerts") or []),
+        "hasPolygons": bool(features.get("has_polygons")),
+        "hasCircles": bool(features.get("has_circles")),
+        "hasPoints": bool(features.get("has_points")),
+    }
+
+async def probe_one(sess: aiohttp.ClientSession, url: str, timeout: float) -> dict:
+    health: dict = {"checkedAt": datetime.now(timezone.utc).replace(microsecond=0).isoformat()}
+    t0 = time.perf_counter()
+    try:
+        async with sess.get(url, timeout=aiohttp.ClientTimeout(total=timeout), allow_redirects=True) as resp:
+            body = await resp.read()
+            health["responseMs"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            health["status"] = resp.status
+            health["ok"] = 200 <= resp.status < 300
+            health["bytes"] = len(body)
+            wire = resp.headers.get("Content-Length")
+            health["wireBytes"] = int(wire) if wire and wire.isdigit() else None
+            health["compression"] = resp.headers.get("Content-Encoding") or None
+            health["contentType"] = (resp.headers.get("Content-Type") or "").split(";")[0] or None
+    except asyncio.TimeoutError:
+        health.update({"ok": False, "status": None, "error": "timeout", "responseMs": round((time.perf_counter() - t0) * 1000.0, 1)})
+        return health
+    except aiohttp.ClientError as exc:
+        health.update({"ok": False, "status": None, "error": type(exc).__name__})
+        return health
+    if not health["ok"]:
+        health["error"] = f"http_{health['status']}"
+        return health
+    sniffed = sniff_format(body)
+    health["sniffedFormat"] = sniffed
+    # Parsing large feeds is CPU-bound; keep the event loop free for the other probes
+    health.update(await asyncio.to_thread(content_metrics, body, sniffed))
+    return health
+
+async def probe_all(feeds: list[dict], concurrency: int, per_host: int, timeout: float) -> dict[str, dict]:
+    """url -> health for every feed URL (each URL probed once)."""
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    urls = list(dict.fromkeys(f["url"] for f in feeds if f.get("url")))
+    results: dict[str, dict] = {}
+    done = 0
+
+    async def run(sess: aiohttp.ClientSession, url: str) -> None:
+        nonlocal done
+        host = (urlparse(url).hostname or "").lower()
+        async with host_limits.setdefault(host, asyncio.Semaphore(per_host)), global_limit:
+            results[url] = await probe_one(sess, url, timeout)
+        done += 1
+        if done % 50 == 0:
+            print(f"  probed {done}/{len(urls)}", file=sys.stderr)
+
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT}) as sess:
+        await asyncio.gather(*(run(sess, u) for u in urls))
+    return results
+
+def apply_health(catalog: dict, results: dict[str, dict]) -> None:
+    today = date.today().isoformat()
+    for feed in catalog.get("feeds") or []:
+        health = results.get(feed.get("url"))
+        if health is None:
+            continue
+        feed["health"] = health
+        feed["lastChecked"] = today
+
+def summarise(results: dict[str, dict]) -> dict:
+    ok = [h for h in results.values() if h.get("ok")]
+    times = sorted(h["responseMs"] for h in ok if h.get("responseMs") is not None)
+    return {
+        "probed": len(results),
+        "ok": len(ok),
+        "errors": dict(Counter(h.get("error") for h in results.values() if not h.get("ok"))),
+        "formats": dict(Counter(h.get("sniffedFormat") for h in ok)),
+        "with_geometry": sum(1 for h in ok if h.get("hasPolygons") or h.get("hasCircles") or h.get("hasPoints")),
+        "median_ms": times[len(times) // 2] if times else None,
+    }
+
+async def run_stub(args: argparse.Namespace) -> int:
+    import stub_feed_server
+    runner, base = await stub_feed_server.start(slow_seconds=args.timeout + 1.0)
+    try:
+        catalog, expected = stub_feed_server.fixture_catalog(base)
+        results = await probe_all(catalog["feeds"], args.concurrency, args.per_host, args.timeout)
+    finally:
+        await runner.cleanup()
+    failures = 0
+    for url, fmt in expected.items():
+        h = results[url]
+        good = (h.get("sniffedFormat") == fmt) if fmt else not h.get("ok")
+        failures += not good
+        print(json.dumps({"url": url[len(base):], "expected": fmt, "pass": good, **h}))
+    print(json.dumps(summarise(results)))
+    return 1 if failures else 0
+
+async def main_async(args: argparse.Namespace) -> int:
+    if args.stub:
+        return await run_stub(args)
+    from update_feed_catalog import load_catalog, save_catalog, write_catalog_index
+    catalog = load_catalog()
+    feeds = catalog.get("feeds") or []
+    if args.limit:
+        feeds = feeds[: args.limit]
+    results = await probe_all(feeds, args.concurrency, args.per_host, args.timeout)
+    print(json.dumps(summarise(results)))
+    if args.dry_run:
+        return 0
+    apply_health(catalog, results)
+    save_catalog(catalog)
+    write_catalog_index(catalog)
+    return 0
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Probe catalogue feeds and record health metrics")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--per-host", type=int, default=4, help="many catalogue feeds share cap-sources.s3.amazonaws.com")
+    ap.add_argument("--timeout", type=float, default=20.0)
+    ap.add_argument("--limit", type=int, default=0, help="probe only the first N feeds")
+    ap.add_argument("--dry-run", action="store_true", help="print the summary without writing the catalogue")
+    ap.add_argument("--stub", action="store_true", help="probe the local stub server instead of the catalogue")
+    args = ap.parse_args()
+    if args.stub:
+        args.timeout = min(args.timeout, 2.0)
+    sys.exit(asyncio.run(main_async(args)))
+
+if __name__ == "__main__":
+    main()
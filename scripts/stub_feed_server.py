@@ -0,0 +1,170 @@
+"""
+Local stub feed server for exercising scripts/probe_feed_catalog.py offline.
+
+What this does:
+- Serves a fixed set of feeds on 127.0.0.1 covering the cases the prober records:
+  CAP with polygons, CAP with circles (gzip), Atom with georss polygons, JSON, an RSS index,
+  an HTML page, a 404, a 500 and a slow feed (for timeouts).
+- `fixture_catalog(base_url)` returns a feed_catalog.json-shaped dict pointing at those paths,
+  together with the expected sniffed format per URL.
+
+Run standalone (Ctrl+C to stop):
+    python scripts/stub_feed_server.py --port 8767
+
+Or from the prober:
+    python scripts/probe_feed_catalog.py --stub
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import gzip
+import json
+
+from aiohttp import web
+
+CAP_POLYGON = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">'
+    '<identifier>stub-1</identifier><sender>stub@example.org</sender><sent>2026-01-27T00:00:00+10:00</sent>'
+    '<status>Actual</status><msgType>Alert</msgType><scope>Public</scope>'
+    '<info><event>Bushfire</event><urgency>Immediate</urgency><severity>Severe</severity><certainty>Likely</certainty>'
+    '<headline>Stub bushfire</headline>'
+    '<area><areaDesc>Stub area</areaDesc><polygon>-33.0,151.0 -33.1,151.1 -33.2,151.0 -33.0,151.0</polygon></area>'
+    '</info></alert>'
+)
+
+CAP_CIRCLES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<feed><alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">'
+    '<identifier>stub-2</identifier><sent>2026-01-27T00:00:00+10:00</sent>'
+    '<info><event>Flood</event><severity>Moderate</severity><headline>Stub flood</headline>'
+    '<area><areaDesc>Stub river</areaDesc><circle>-27.4,153.0 5</circle></area></info></alert>'
+    '<alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">'
+    '<identifier>stub-3</identifier><sent>2026-01-27T01:00:00+10:00</sent>'
+    '<info><event>Flood</event><severity>Minor</severity><headline>Stub flood 2</headline>'
+    '<area><areaDesc>Stub creek</areaDesc><circle>-27.5,153.1 2</circle></area></info></alert></feed>'
+)
+
+ATOM = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:georss="http://www.georss.org/georss">'
+    '<title>Stub Atom</title>'
+    '<entry><id>urn:stub:atom:1</id><updated>2026-01-27T00:00:00Z</updated><title>Quake</title>'
+    '<link href="https://example.org/1"/><summary>Stub region</summary>'
+    '<georss:polygon>-30.0,150.0 -30.1,150.1 -30.2,150.0 -30.0,150.0</georss:polygon></entry>'
+    '</feed>'
+)
+
+JSON_FEED = json.dumps({"alerts": [
+    {"id": "j1", "headline": "Stub JSON", "severity": "Minor", "geometry": {"type": "Point", "coordinates": [151.2, -33.9]}},
+]})
+
+RSS = (
+    '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Stub RSS</title>'
+    '<item><title>Alert A</title><link>https://example.org/a.xml</link></item>'
+    '<item><title>Alert B</title><link>https://example.org/b.xml</link></item>'
+    '</channel></rss>'
+)
+
+HTML = "<!DOCTYPE html><html><head><title>Not a feed</title></head><body>Moved</body></html>"
+
+# path -> format the prober should sniff (None: the request fails)
+ROUTES = {
+    "/cap/polygon.xml": "cap",
+    "/cap/circles.xml": "cap",
+    "/atom.xml": "atom",
+    "/alerts.json": "json",
+    "/rss.xml": "rss",
+    "/page.html": "html",
+    "/missing.xml": None,
+    "/error.xml": None,
+    "/slow.xml": None,
+}
+
+def fixture_catalog(base_url: str) -> tuple[dict, dict[str, str | None]]:
+    """Catalogue pointing at the stub server, and the expected sniffed format per URL."""
+    feeds = []
+    expected = {}
+    for path, fmt in ROUTES.items():
+        url = base_url.rstrip("/") + path
+        feeds.append({
+            "country": "Stubland",
+            "countryCode": "ZZ",
+            "region": "Fixtures",
+            "name": path.strip("/"),
+            "format": fmt if fmt in ("cap", "atom", "json") else "cap",
+            "url": url,
+            "language": "en",
+            "provenance": "stub",
+        })
+        expected[url] = fmt
+    return {"feeds": feeds}, expected
+
+def make_app(slow_seconds: float = 5.0) -> web.Application:
+    async def cap_polygon(request: web.Request) -> web.Response:
+        return web.Response(text=CAP_POLYGON, content_type="application/xml")
+
+    async def cap_circles(request: web.Request) -> web.Response:
+        body = gzip.compress(CAP_CIRCLES.encode("utf-8"))
+        return web.Response(body=body, content_type="application/xml", headers={"Content-Encoding": "gzip"})
+
+    async def atom(request: web.Request) -> web.Response:
+        return web.Response(text=ATOM, content_type="application/atom+xml")
+
+    async def alerts_json(request: web.Request) -> web.Response:
+        return web.Response(text=JSON_FEED, content_type="application/json")
+
+    async def rss(request: web.Request) -> web.Response:
+        # Served as text/xml on purpose: the prober sniffs the body, not the header
+        return web.Response(text=RSS, content_type="text/xml")
+
+    async def page(request: web.Request) -> web.Response:
+        return web.Response(text=HTML, content_type="text/html")
+
+    async def missing(request: web.Request) -> web.Response:
+        return web.Response(status=404, text="not found")
+
+    async def error(request: web.Request) -> web.Response:
+        return web.Response(status=500, text="boom")
+
+    async def slow(request: web.Request) -> web.Response:
+        await asyncio.sleep(slow_seconds)
+        return web.Response(text=CAP_POLYGON, content_type="application/xml")
+
+    app = web.Application()
+    for path, handler in (
+        ("/cap/polygon.xml", cap_polygon), ("/cap/circles.xml", cap_circles), ("/atom.xml", atom),
+        ("/alerts.json", alerts_json), ("/rss.xml", rss), ("/page.html", page),
+        ("/missing.xml", missing), ("/error.xml", error), ("/slow.xml", slow),
+    ):
+        app.router.add_get(path, handler)
+    return app
+
+async def start(port: int = 0, slow_seconds: float = 5.0) -> tuple[web.AppRunner, str]:
+    """Start the stub server; returns (runner, base URL). Port 0 picks a free port."""
+    runner = web.AppRunner(make_app(slow_seconds))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    bound = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{bound}"
+
+async def _serve(port: int) -> None:
+    runner, base = await start(port)
+    print(f"Stub feeds at {base}: " + ", ".join(ROUTES))
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local stub feed server")
+    ap.add_argument("--port", type=int, default=8767)
+    try:
+        asyncio.run(_serve(ap.parse_args().port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
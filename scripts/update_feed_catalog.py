@@ -3,27 +3,38 @@ Update and enrich data/feed_catalog.json, then synchronise feeds_directory.json/
 
 What this does:
 - Ensures every feed has `language` (ISO 639-1) and `countryCode` (ISO 3166-1 alpha-2).
-- Adds provenance metadata: `provenance`, `firstAdded`, `lastChecked` (ISO dates).
+- Adds provenance metadata: `provenance`, `firstAdded` (ISO dates). `lastChecked` and the
+  per-feed `health` block are written by scripts/probe_feed_catalog.py, which contacts each feed.
 - Ingests new CAP sources from:
     * https://alert-hub.s3.amazonaws.com/cap-sources.html
     * https://cap.alert-hub.org/
     * https://alertingauthority.wmo.int/rss.xml (CAP-only links if present)
+- Fetches the three sources in parallel and dedupes on a normalised URL (scheme, trailing
+  slashes and case are ignored), so http/https or slash variants of a known feed are not re-added.
 - Rebuilds data/feeds_directory.json and data/feeds_directory.yaml from the catalogue.
+- Rebuilds the catalogue index bundled with the integration
+  (custom_components/cap_alerts/catalog_index.json) used by the Config Flow.
+- Each output is only rewritten when its content hash changes, so unchanged runs touch nothing.
 
 Parsing:
 - Uses BeautifulSoup (bs4) when available for robust HTML parsing; falls back to regex scanning if bs4 is not installed.
 
 Run:
     python scripts/update_feed_catalog.py
+    python scripts/update_feed_catalog.py --dry-run    # report what would change, write nothing
 
 Install optional parser dependency:
     pip install beautifulsoup4 lxml
 """
 from __future__ import annotations
+import argparse
+import copy
+import hashlib
 import json
 import os
 import re
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 import tempfile
 from typing import Dict
@@ -107,41 +118,71 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CATALOG_PATH = os.path.join(ROOT, "data", "feed_catalog.json")
 DIR_JSON_PATH = os.path.join(ROOT, "data", "feeds_directory.json")
 DIR_YAML_PATH = os.path.join(ROOT, "data", "feeds_directory.yaml")
+CATALOG_INDEX_PATH = os.path.join(ROOT, "custom_components", "cap_alerts", "catalog_index.json")
+
+ALERT_HUB_S3_URL = "https://alert-hub.s3.amazonaws.com/cap-sources.html"
+ALERT_HUB_INDEX_URL = "https://cap.alert-hub.org/"
+WMO_RSS_URL = "https://alertingauthority.wmo.int/rss.xml"
+SOURCE_URLS = (ALERT_HUB_S3_URL, ALERT_HUB_INDEX_URL, WMO_RSS_URL)
 
 def load_catalog() -> dict:
     with open(CATALOG_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def save_catalog(data: dict) -> None:
-    os.makedirs(os.path.dirname(CATALOG_PATH), exist_ok=True)
-    tmp_path = CATALOG_PATH + ".tmp"
+def render_catalog(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def file_hash(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def write_text_atomic(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
     try:
         with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        os.replace(tmp_path, CATALOG_PATH)
+            f.write(text)
+        os.replace(tmp_path, path)
     except (FileNotFoundError, PermissionError, OSError) as exc:
         # Fallback to system temp to distinguish environment write issues
-        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json", encoding="utf-8") as tf:
-            json.dump(data, tf, ensure_ascii=False, indent=2)
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=os.path.splitext(path)[1], encoding="utf-8") as tf:
+            tf.write(text)
             temp_out = tf.name
         try:
-            os.replace(temp_out, CATALOG_PATH)
+            os.replace(temp_out, path)
         except Exception as exc2:
             print(
-                "ERROR: Unable to write catalogue to target path.\n"
-                f"Target: {CATALOG_PATH}\n"
+                "ERROR: Unable to write output to target path.\n"
+                f"Target: {path}\n"
                 f"Original error: {exc!r}\n"
                 f"Replace-from-temp failed: {exc2!r}\n"
                 "Suggestion: Move the repo to a non-OneDrive folder or adjust permissions, then rerun.\n"
-                f"Catalogue content was written to temporary file: {temp_out}"
+                f"Content was written to temporary file: {temp_out}"
             )
 
+def write_if_changed(path: str, text: str) -> bool:
+    """Write `text` to `path` only when its content hash differs from the file on disk."""
+    if file_hash(path) == content_hash(text):
+        return False
+    write_text_atomic(path, text)
+    return True
+
+def save_catalog(data: dict) -> bool:
+    return write_if_changed(CATALOG_PATH, render_catalog(data))
+
 def ensure_defaults(feed: dict) -> dict:
     """Normalise fields and migrate legacy keys.
 
     - language: ISO 639-1, defaults to 'en'
     - countryCode: ISO 3166-1 alpha-2 inferred from country when missing
-    - provenance/firstAdded/lastChecked: ensure present; migrate older 'source'/'added'
+    - provenance/firstAdded: ensure present; migrate older 'source'/'added'
+    - lastChecked is left alone: only the prober sets it, after contacting the feed
     """
     # Default/derive language
     if not feed.get("language"):
@@ -207,8 +248,6 @@ def ensure_defaults(feed: dict) -> dict:
         feed["provenance"] = "package developer"
     if not feed.get("firstAdded"):
         feed["firstAdded"] = today
-    # Always bump lastChecked
-    feed["lastChecked"] = today
     return feed
 
 def guess_country_code(country: str) -> str | None:
@@ -230,15 +269,22 @@ def try_fetch(url: str) -> str:
     except Exception:
         return ""
 
-def ingest_alert_hub_sources(catalog: dict) -> None:
+def fetch_sources(urls=SOURCE_URLS) -> dict[str, str]:
+    """Fetch all discovery sources in parallel; url -> body ("" on failure)."""
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        return dict(zip(urls, pool.map(try_fetch, urls)))
+
+def ingest_alert_hub_sources(catalog: dict, html_s3: str | None = None, html_idx: str | None = None) -> None:
     """Parse alert-hub S3 and cap.alert-hub.org to discover CAP feed URLs.
 
     Strategy:
     - Parse tables for rows; capture language, source name, and any http links.
     - When only an identifier like "us-noaa-nws-en" is present, attempt to find a matching link
       on cap.alert-hub.org and retain http(s) URLs ending with .xml or containing '/cap'.
+    Page bodies may be passed in when already fetched (see fetch_sources).
     """
-    html_s3 = try_fetch("https://alert-hub.s3.amazonaws.com/cap-sources.html")
+    if html_s3 is None:
+        html_s3 = try_fetch(ALERT_HUB_S3_URL)
     if not html_s3:
         return
     discovered: list[dict] = []
@@ -279,7 +325,8 @@ def ingest_alert_hub_sources(catalog: dict) -> None:
     merge_discovered(catalog, discovered, source_label="alert-hub")
 
     # cap.alert-hub.org index page for additional links
-    html_idx = try_fetch("https://cap.alert-hub.org/")
+    if html_idx is None:
+        html_idx = try_fetch(ALERT_HUB_INDEX_URL)
     if html_idx:
         disc2: list[dict] = []
         if BeautifulSoup:
@@ -321,7 +368,7 @@ def ingest_alert_hub_sources(catalog: dict) -> None:
                 disc2.append(make_feed_from_url(url, "Authority feed", "en"))
         merge_discovered(catalog, disc2, source_label="cap.alert-hub.org")
 
-def ingest_wmo_rss(catalog: dict) -> None:
+def ingest_wmo_rss(catalog: dict, rss: str | None = None) -> None:
     """Parse WMO Alerting Authority RSS to discover CAP feed URLs.
 
     Strategy:
@@ -329,7 +376,8 @@ def ingest_wmo_rss(catalog: dict) -> None:
       (end with .xml or contain '/cap').
     - Use entry titles when present as feed name.
     """
-    rss = try_fetch("https://alertingauthority.wmo.int/rss.xml")
+    if rss is None:
+        rss = try_fetch(WMO_RSS_URL)
     if not rss:
         return
     discovered: list[dict] = []
@@ -439,7 +487,6 @@ def make_feed_from_url(url: str, name: str, language: str, *, country_override:
         "language": language or "en",
         "provenance": "discovered",
         "firstAdded": date.today().isoformat(),
-        "lastChecked": date.today().isoformat(),
     }
 
 def country_name_from_code(cc: str | None) -> str:
@@ -449,17 +496,31 @@ def country_name_from_code(cc: str | None) -> str:
 def is_iso2(val: str | None) -> bool:
     return bool(val) and bool(re.fullmatch(r"[A-Z]{2}", str(val)))
 
+def normalize_url(url: str | None) -> str:
+    """Dedupe key: case-folded, without scheme or trailing slashes."""
+    key = (url or "").strip().lower()
+    key = re.sub(r"^[a-z][a-z0-9+.-]*://", "", key)
+    return key.rstrip("/")
+
+def url_index(catalog: dict) -> set[str]:
+    """Normalised URLs already in the catalogue."""
+    index = {normalize_url(f.get("url")) for f in (catalog.get("feeds") or [])}
+    index.discard("")
+    return index
+
 def merge_discovered(catalog: dict, discovered: list[dict], source_label: str) -> None:
     if not discovered:
         return
-    existing_urls = { (f.get("url") or "").strip() for f in (catalog.get("feeds") or []) }
+    existing = url_index(catalog)
     for feed in discovered:
         url = (feed.get("url") or "").strip()
-        if not url or url in existing_urls:
+        key = normalize_url(url)
+        if not key or key in existing:
             continue
+        feed["url"] = url
         feed["provenance"] = source_label
         catalog.setdefault("feeds", []).append(feed)
-        existing_urls.add(url)
+        existing.add(key)
 
 def build_directories(catalog: dict) -> tuple[dict, str]:
     # Build a nested dict by country -> region -> {name: url}
@@ -494,6 +555,24 @@ def build_directories(catalog: dict) -> tuple[dict, str]:
     yaml_text = "\n".join(lines) + "\n"
     return dj, yaml_text
 
+def build_catalog_index(catalog: dict) -> dict:
+    """Country -> region -> [feed] index bundled with the integration (see catalog.index_from_catalog)."""
+    tree: dict = {}
+    for feed in catalog.get("feeds") or []:
+        if not feed.get("url"):
+            continue
+        # Probe health stays in the catalogue; the flow only needs the feed itself
+        entry = {k: v for k, v in feed.items() if k != "health"}
+        tree.setdefault(feed.get("country") or "Unknown", {}).setdefault(feed.get("region") or "General", []).append(entry)
+    return {"countries": {c: {r: tree[c][r] for r in sorted(tree[c])} for c in sorted(tree)}}
+
+def render_catalog_index(catalog: dict) -> str:
+    # Compact: shipped with the integration and loaded by Home Assistant
+    return json.dumps(build_catalog_index(catalog), ensure_ascii=False, separators=(",", ":"))
+
+def write_catalog_index(catalog: dict) -> bool:
+    return write_if_changed(CATALOG_INDEX_PATH, render_catalog_index(catalog))
+
 def language_native_name(code: str) -> str:
     mapping = {
         "en": "English",
@@ -531,49 +610,55 @@ def localize_country_name(cc: str, lang_code: str, fallback: str) -> str:
     # Default: English name
     return en_name
 
+def render_outputs(catalog: dict) -> dict[str, str]:
+    """path -> text for every generated file."""
+    dj, yaml_text = build_directories(catalog)
+    return {
+        CATALOG_PATH: render_catalog(catalog),
+        DIR_JSON_PATH: json.dumps(dj, ensure_ascii=False, indent=2),
+        DIR_YAML_PATH: yaml_text,
+        CATALOG_INDEX_PATH: render_catalog_index(catalog),
+    }
+
+def diff_report(before: dict, after: dict, outputs: dict[str, str]) -> list[str]:
+    """Human-readable summary of feed and file changes between two catalogue states."""
+    old = {normalize_url(f.get("url")): f for f in before.get("feeds") or []}
+    new = {normalize_url(f.get("url")): f for f in after.get("feeds") or []}
+    lines = []
+    for key in new.keys() - old.keys():
+        f = new[key]
+        lines.append(f"+ {f.get('url')}  [{f.get('country')} / {f.get('region')}] via {f.get('provenance')}")
+    for key in old.keys() - new.keys():
+        lines.append(f"- {old[key].get('url')}")
+    for key in new.keys() & old.keys():
+        fields = sorted(k for k in set(old[key]) | set(new[key]) if old[key].get(k) != new[key].get(k))
+        if fields:
+            lines.append(f"~ {new[key].get('url')}: {', '.join(fields)}")
+    lines.sort(key=lambda line: (line[0] != "+", line))
+    for path, text in outputs.items():
+        state = "unchanged" if file_hash(path) == content_hash(text) else "would rewrite"
+        lines.append(f"{os.path.relpath(path, ROOT)}: {state}")
+    return lines
+
 def main() -> None:
+    ap = argparse.ArgumentParser(description="Update the feed catalogue and generated directories")
+    ap.add_argument("--dry-run", action="store_true", help="print a diff report and write nothing")
+    args = ap.parse_args()
     catalog = load_catalog()
+    before = copy.deepcopy(catalog)
     # Ensure defaults for all existing feeds
     catalog["feeds"] = [ensure_defaults(f) for f in (catalog.get("feeds") or [])]
-    # Attempt ingestion from external sources (non-destructive)
-    ingest_alert_hub_sources(catalog)
-    ingest_wmo_rss(catalog)
-    # Save catalog back
-    save_catalog(catalog)
-    # Rebuild directories
-    dj, yaml_text = build_directories(catalog)
-    # Write atomically to avoid sync interference, with robust fallbacks
-    tmp_json = DIR_JSON_PATH + ".tmp"
-    tmp_yaml = DIR_YAML_PATH + ".tmp"
-    try:
-        with open(tmp_json, "w", encoding="utf-8") as f:
-            json.dump(dj, f, ensure_ascii=False, indent=2)
-        with open(tmp_yaml, "w", encoding="utf-8") as f:
-            f.write(yaml_text)
-        os.replace(tmp_json, DIR_JSON_PATH)
-        os.replace(tmp_yaml, DIR_YAML_PATH)
-    except (FileNotFoundError, PermissionError, OSError) as exc:
-        # Fallback via system temp and report clearly
-        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json", encoding="utf-8") as tfj:
-            json.dump(dj, tfj, ensure_ascii=False, indent=2)
-            temp_json_out = tfj.name
-        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".yaml", encoding="utf-8") as tfy:
-            tfy.write(yaml_text)
-            temp_yaml_out = tfy.name
-        try:
-            os.replace(temp_json_out, DIR_JSON_PATH)
-            os.replace(temp_yaml_out, DIR_YAML_PATH)
-        except Exception as exc2:
-            print(
-                "ERROR: Unable to write feeds_directory outputs to target path.\n"
-                f"JSON Target: {DIR_JSON_PATH}\nYAML Target: {DIR_YAML_PATH}\n"
-                f"Original error: {exc!r}\n"
-                f"Replace-from-temp failed: {exc2!r}\n"
-                "Suggestion: Move the repo to a non-OneDrive folder or adjust permissions, then rerun.\n"
-                f"Directory JSON written to temporary file: {temp_json_out}\n"
-                f"Directory YAML written to temporary file: {temp_yaml_out}"
-            )
-    print("Updated feed_catalog.json and synchronised feeds_directory.{json,yaml}.")
+    # Attempt ingestion from external sources (non-destructive); the fetches run in parallel
+    bodies = fetch_sources()
+    ingest_alert_hub_sources(catalog, bodies[ALERT_HUB_S3_URL], bodies[ALERT_HUB_INDEX_URL])
+    ingest_wmo_rss(catalog, bodies[WMO_RSS_URL])
+    outputs = render_outputs(catalog)
+    if args.dry_run:
+        print("\n".join(diff_report(before, catalog, outputs)))
+        return
+    # Only outputs whose content hash changed are rewritten (atomically, with fallbacks)
+    written = [os.path.relpath(path, ROOT) for path, text in outputs.items() if write_if_changed(path, text)]
+    print(f"Updated: {', '.join(written)}." if written else "No changes.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+"""CAPCoordinator warm start and idle ticks (needs pytest-homeassistant-custom-component)."""
+from __future__ import annotations
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.cap_alerts.const import DOMAIN, SNAPSHOT_STORE_KEY, SNAPSHOT_STORE_VERSION  # noqa: E402
+from custom_components.cap_alerts.geometry import GeometryStore  # noqa: E402
+from custom_components.cap_alerts.sensor import CAPCoordinator  # noqa: E402
+from custom_components.cap_alerts.snapshot import build_snapshot  # noqa: E402
+
+URL = "https://alerts.example.org/cap.xml"
+FEED = {"url": URL, "format": "cap"}
+ALERT = {
+    "identifier": "A1",
+    "sender": "warnings@example.org",
+    "sent": "2026-01-01T00:00:00+00:00",
+    "severity": "Severe",
+    "headline": "Flood warning",
+    "polygon": "-33.0,151.0 -33.0,151.2 -33.2,151.2 -33.2,151.0 -33.0,151.0",
+}
+KEY = f"{SNAPSHOT_STORE_KEY}_test"
+
+pytestmark = pytest.mark.asyncio
+
+def _parsed(identifier: str = "A1") -> dict:
+    return {"alerts": [dict(ALERT, identifier=identifier)], "features": {"cache": "miss", "has_polygons": True}}
+
+async def test_restore_snapshot(hass, hass_storage):
+    result = {"feed": FEED, "slug": "alerts_example_org", **_parsed()}
+    snapshot = build_snapshot([result], {URL: {"etag": '"v1"'}}, GeometryStore(), 0.0)
+    hass_storage[KEY] = {"version": SNAPSHOT_STORE_VERSION, "minor_version": 1, "key": KEY, "data": snapshot}
+    coordinator = CAPCoordinator(hass, [FEED], snapshot_key=KEY)
+    try:
+        assert await coordinator.async_restore_snapshot()
+        assert coordinator.data[0]["features"]["stale"]
+        assert coordinator.alerts.summary_for_slug(coordinator.data[0]["slug"])["count"] == 1
+        # Restoring never marks the coordinator idle: the first refresh must reach the entities
+        assert not coordinator._idle
+    finally:
+        coordinator.async_shutdown_parser()
+
+async def test_idle_tick_skips_listeners(hass, hass_storage):
+    coordinator = CAPCoordinator(hass, [FEED], snapshot_key=KEY)
+    listener = Mock()
+    unsub = coordinator.async_add_listener(listener)
+    try:
+        with patch.object(CAPCoordinator, "_async_get_parsed", return_value=_parsed()) as fetch:
+            await coordinator.async_refresh()
+            assert fetch.call_count == 1
+            assert listener.call_count == 1
+            # The feed is not due again and nothing expired: no fetch and no state write
+            await coordinator.async_refresh()
+            assert fetch.call_count == 1
+        assert listener.call_count == 1
+    finally:
+        unsub()
+        coordinator.async_shutdown_parser()
+
+async def test_entries_share_stores_without_replacing(hass, hass_storage):
+    other = {"url": "https://warnings.example.net/cap.xml", "format": "cap"}
+    first = CAPCoordinator(hass, [FEED], snapshot_key=f"{KEY}_1")
+    second = CAPCoordinator(hass, [other], snapshot_key=f"{KEY}_2")
+    hass.data[DOMAIN]["coordinators"] = {"entry_1": first, "entry_2": second}
+    try:
+        with patch.object(CAPCoordinator, "_async_get_parsed", side_effect=lambda _sess, _slug, url, _fmt: _parsed(url)):
+            await first.async_refresh()
+            await second.async_refresh()
+        for coordinator in (first, second):
+            slug = coordinator.data[0]["slug"]
+            assert coordinator.alerts.summary_for_slug(slug)["count"] == 1
+        assert {r["slug"] for r, _a, _g in hass.data[DOMAIN]["geometry"].iter_entries()} == {
+            first.data[0]["slug"], second.data[0]["slug"]}
+        # Unloading one entry leaves only the other's alerts
+        del hass.data[DOMAIN]["coordinators"]["entry_2"]
+        await first.async_republish()
+        assert first.alerts.summary_for_slug(second.data[0]["slug"]) is None
+    finally:
+        first.async_shutdown_parser()
+        second.async_shutdown_parser()